@@ -0,0 +1,363 @@
+"""
+Cliniko MCP Server - Availability
+Per-practitioner interval index over booked appointments, used to find free
+slots (and conflicts) without the agent doing the scheduling maths.
+"""
+
+import asyncio
+import time
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from config.constants import (
+    APPOINTMENT_DURATIONS, BUSINESS_HOURS, DEFAULT_TIMEZONE, SLOT_INTERVAL_MINUTES,
+)
+from config.settings import env
+
+MAX_RANGE_DAYS = 31
+MAX_SLOTS = 100
+
+# create_appointment checks the practitioner's schedule for overlaps before booking
+BOOKING_CONFLICT_CHECK = env("BOOKING_CONFLICT_CHECK", "false").lower() == "true"
+
+Interval = Tuple[datetime, datetime, str]
+
+def parse_datetime(value: str) -> datetime:
+    """Cliniko timestamps are ISO 8601 with a Z suffix"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+def format_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def parse_date_range(date_range: str) -> Tuple[date, date]:
+    """'YYYY-MM-DD' or 'YYYY-MM-DD/YYYY-MM-DD' (inclusive) -> (first_day, last_day)"""
+    first, _, last = date_range.strip().partition("/")
+    try:
+        first_day = date.fromisoformat(first.strip())
+        last_day = date.fromisoformat(last.strip()) if last else first_day
+    except ValueError:
+        raise ValueError("date_range must be YYYY-MM-DD or YYYY-MM-DD/YYYY-MM-DD") from None
+    if last_day < first_day:
+        raise ValueError("date_range end is before its start")
+    if (last_day - first_day).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"date_range can span at most {MAX_RANGE_DAYS} days")
+    return first_day, last_day
+
+def parse_duration(duration: str) -> timedelta:
+    """A name from APPOINTMENT_DURATIONS (hours) or a number of minutes"""
+    duration = str(duration).strip()
+    if duration in APPOINTMENT_DURATIONS:
+        return timedelta(hours=APPOINTMENT_DURATIONS[duration])
+    try:
+        minutes = int(duration)
+    except ValueError:
+        raise ValueError(
+            f"duration must be one of {', '.join(APPOINTMENT_DURATIONS)} or a number of minutes"
+        ) from None
+    if minutes <= 0:
+        raise ValueError("duration must be positive")
+    return timedelta(minutes=minutes)
+
+def appointment_interval(appointment: dict) -> Optional[Interval]:
+    """(start, end, id) for a booked appointment; None if cancelled or unparseable"""
+    if appointment.get("cancelled_at") or appointment.get("deleted_at") or appointment.get("archived_at"):
+        return None
+    starts_at = appointment.get("starts_at") or appointment.get("appointment_start")
+    ends_at = appointment.get("ends_at") or appointment.get("appointment_end")
+    if not starts_at or not ends_at:
+        return None
+    return parse_datetime(starts_at), parse_datetime(ends_at), str(appointment.get("id", ""))
+
+def spanned_days(interval: Interval, zone: ZoneInfo) -> List[date]:
+    """Local days an interval touches, each a key of ScheduleCache"""
+    day, last_day = interval[0].astimezone(zone).date(), interval[1].astimezone(zone).date()
+    days = []
+    while day <= last_day:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+class BookingConflict(ValueError):
+    """A new appointment overlaps ones already booked with the practitioner"""
+
+    def __init__(self, conflicts: List[Interval]):
+        self.conflicts = conflicts
+        super().__init__("Slot overlaps existing appointment(s): " + ", ".join(
+            f"{appointment_id} ({format_datetime(start)} to {format_datetime(end)})"
+            for start, end, appointment_id in conflicts
+        ))
+
+    def details(self) -> List[dict]:
+        return [{"appointment_id": appointment_id, "starts_at": format_datetime(start), "ends_at": format_datetime(end)}
+                for start, end, appointment_id in self.conflicts]
+
+class IntervalIndex:
+    """
+    Intervals sorted by start with a running maximum of their ends.
+
+    That makes "does [start, end) overlap anything?" two bisects, and listing
+    the overlaps O(log n + k), which is all an interval tree would buy us for
+    a single practitioner's day.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self._intervals: List[Interval] = sorted(intervals)
+        self._rebuild()
+
+    def _rebuild(self):
+        self._starts = [interval[0] for interval in self._intervals]
+        self._max_ends = list(accumulate((interval[1] for interval in self._intervals), max))
+        self.ids = {interval[2] for interval in self._intervals}
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def add(self, interval: Interval):
+        insort(self._intervals, interval)
+        self._rebuild()
+
+    def remove(self, interval_id: str) -> bool:
+        kept = [interval for interval in self._intervals if interval[2] != interval_id]
+        removed = len(kept) != len(self._intervals)
+        self._intervals = kept
+        self._rebuild()
+        return removed
+
+    def has_overlap(self, start: datetime, end: datetime) -> bool:
+        i = bisect_left(self._starts, end)
+        return i > 0 and self._max_ends[i - 1] > start
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Interval]:
+        stop = bisect_left(self._starts, end)
+        first = bisect_right(self._max_ends, start, 0, stop)
+        return [interval for interval in self._intervals[first:stop] if interval[1] > start]
+
+    def free_slots(self, window_start: datetime, window_end: datetime, duration: timedelta,
+                   step: timedelta, limit: int = MAX_SLOTS) -> List[Tuple[datetime, datetime]]:
+        """Slots of `duration` starting on `step` boundaries from window_start"""
+        slots = []
+        cursor = window_start
+        for busy_start, busy_end, _ in self.overlapping(window_start, window_end) + [(window_end, window_end, "")]:
+            while cursor + duration <= min(busy_start, window_end) and len(slots) < limit:
+                slots.append((cursor, cursor + duration))
+                cursor += step
+            if busy_end > cursor:
+                # Next step boundary at or after the end of this booking
+                steps = -((window_start - busy_end) // step)
+                cursor = max(cursor, window_start + steps * step)
+        return slots
+
+class ScheduleCache:
+    """
+    Per (practitioner, day) IntervalIndex of booked appointments, at every
+    business: a practitioner booked at one location is busy at all of them.
+
+    Days are fetched in one list call per request (or seeded by CacheWarmer)
+    and kept for `ttl` seconds so bookings made outside this server are
+    picked up; appointments created, updated or deleted here, or changed
+    upstream and seen by delta sync, are applied to the cached days in place.
+    """
+
+    def __init__(self, ttl: float = 60, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.zone = ZoneInfo(DEFAULT_TIMEZONE)
+        self._days: Dict[tuple, Tuple[float, IntervalIndex]] = {}
+        # Check-then-book is serialized per practitioner so two bookings can't both pass.
+        # A lock lives only while a booking holds or waits for it.
+        self._booking_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.conflict_checks = 0
+        self.conflicts_found = 0
+        # Overlaps seen in cached days that a fresh fetch showed were gone
+        self.conflicts_cleared = 0
+
+    def _fresh(self, key: tuple) -> Optional[IntervalIndex]:
+        entry = self._days.get(key)
+        if entry is None or entry[0] <= self.clock():
+            return None
+        return entry[1]
+
+    def cached_day(self, practitioner_id, day: date) -> Optional[IntervalIndex]:
+        return self._fresh((str(practitioner_id), day))
+
+    def put_days(self, practitioner_id, days: Iterable[date], intervals: Iterable[Interval],
+                 ttl: float = None) -> Dict[date, IntervalIndex]:
+        """Cache `days` of a practitioner's schedule from everything booked on them, at any business"""
+        practitioner_id = str(practitioner_id)
+        per_day: Dict[date, List[Interval]] = {day: [] for day in days}
+        for interval in intervals:
+            for day in spanned_days(interval, self.zone):
+                if day in per_day:
+                    per_day[day].append(interval)
+        expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        indexes = {}
+        for day, booked in per_day.items():
+            index = IntervalIndex(booked)
+            self._days[(practitioner_id, day)] = (expires_at, index)
+            indexes[day] = index
+        return indexes
+
+    async def day_indexes(self, client, practitioner_id, first_day: date, last_day: date,
+                          refresh: bool = False) -> Dict[date, IntervalIndex]:
+        """Index per day from first_day to last_day; refresh=True refetches days even if cached"""
+        practitioner_id = str(practitioner_id)
+        days = [first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1)]
+        indexes = {}
+        missing = []
+        for day in days:
+            index = None if refresh else self._fresh((practitioner_id, day))
+            if index is None:
+                missing.append(day)
+            else:
+                indexes[day] = index
+        self.hits += len(indexes)
+        self.misses += len(missing)
+        if not missing:
+            return indexes
+
+        fetch_start = datetime.combine(missing[0], dt_time.min, self.zone)
+        fetch_end = datetime.combine(missing[-1] + timedelta(days=1), dt_time.min, self.zone)
+        filters = [
+            f"practitioner_id:={practitioner_id}",
+            f"ends_at:>{format_datetime(fetch_start)}",
+            f"starts_at:<{format_datetime(fetch_end)}",
+        ]
+        intervals = []
+        async for appointment in client.iter_appointments(filters, prefetch=True):
+            interval = appointment_interval(appointment)
+            if interval is not None:
+                intervals.append(interval)
+        indexes.update(self.put_days(practitioner_id, missing, intervals))
+        return indexes
+
+    async def conflicts(self, client, practitioner_id, appointment: dict) -> List[Interval]:
+        """
+        Appointments already booked with the practitioner, at any business, that
+        overlap `appointment` (a create payload or record), checked against the
+        cached days. An overlap found there is confirmed against freshly fetched
+        days before it is reported, so a stale cache can delay a booking but
+        never refuse it; a free slot costs no request while its days are cached.
+        """
+        try:
+            interval = appointment_interval(appointment)
+        except ValueError:
+            interval = None
+        if interval is None or not practitioner_id:
+            return []
+        self.conflict_checks += 1
+        days = spanned_days(interval, self.zone)
+        cached = all(self.cached_day(practitioner_id, day) is not None for day in days)
+        found = await self._overlapping(client, practitioner_id, interval, days)
+        if found and cached:
+            found = await self._overlapping(client, practitioner_id, interval, days, refresh=True)
+            if not found:
+                self.conflicts_cleared += 1
+        if found:
+            self.conflicts_found += 1
+        return found
+
+    async def _overlapping(self, client, practitioner_id, interval: Interval, days: List[date],
+                           refresh: bool = False) -> List[Interval]:
+        start, end, appointment_id = interval
+        indexes = await self.day_indexes(client, practitioner_id, days[0], days[-1], refresh)
+        found = {}
+        for index in indexes.values():
+            if index.has_overlap(start, end):
+                found.update((booked[2], booked) for booked in index.overlapping(start, end)
+                             if booked[2] != appointment_id)
+        return sorted(found.values())
+
+    def booking_lock(self, practitioner_id) -> asyncio.Lock:
+        # Holders and waiters keep the lock alive; once they are done it is collected
+        lock = self._booking_locks.get(str(practitioner_id))
+        if lock is None:
+            lock = self._booking_locks[str(practitioner_id)] = asyncio.Lock()
+        return lock
+
+    def discard(self, appointment_id):
+        """Drop an appointment from every cached day it is in"""
+        appointment_id = str(appointment_id)
+        for _, index in self._days.values():
+            if appointment_id in index.ids:
+                index.remove(appointment_id)
+
+    def record(self, appointment: dict, practitioner_id) -> bool:
+        """
+        Apply a created, updated or synced appointment to the cached days in
+        place (a cancelled one is just removed). False if it could not be
+        placed, in which case the caller should invalidate instead.
+        """
+        if appointment.get("id") is None:
+            return False
+        self.discard(appointment["id"])
+        try:
+            interval = appointment_interval(appointment)
+        except ValueError:
+            return False
+        if interval is None:
+            # Cancelled appointments just leave the schedule
+            return bool(appointment.get("cancelled_at") or appointment.get("deleted_at")
+                        or appointment.get("archived_at"))
+        if not practitioner_id:
+            return False
+        for day in spanned_days(interval, self.zone):
+            index = self._fresh((str(practitioner_id), day))
+            if index is not None:
+                index.add(interval)
+        return True
+
+    def invalidate_practitioner(self, practitioner_id):
+        if practitioner_id is None:
+            return
+        practitioner_id = str(practitioner_id)
+        for key in [key for key in self._days if key[0] == practitioner_id]:
+            del self._days[key]
+
+    def invalidate_appointment(self, appointment_id):
+        appointment_id = str(appointment_id)
+        for key in [key for key, (_, index) in self._days.items() if appointment_id in index.ids]:
+            del self._days[key]
+
+    def clear(self):
+        self._days.clear()
+
+    def stats(self) -> dict:
+        return {"days_cached": len(self._days), "hits": self.hits, "misses": self.misses,
+                "conflict_checks": self.conflict_checks, "conflicts_found": self.conflicts_found,
+                "conflicts_cleared": self.conflicts_cleared, "booking_locks": len(self._booking_locks)}
+
+async def find_available_slots(client, practitioner_id, date_range: str, duration: str,
+                               now: datetime = None) -> List[dict]:
+    """
+    Free slots inside BUSINESS_HOURS for each day of date_range, at most
+    MAX_SLOTS, none starting before `now`. The practitioner's bookings at
+    every business count as busy.
+    """
+    first_day, last_day = parse_date_range(date_range)
+    length = parse_duration(duration)
+    step = timedelta(minutes=SLOT_INTERVAL_MINUTES)
+    zone = ZoneInfo(DEFAULT_TIMEZONE)
+    now = now or datetime.now(timezone.utc)
+    opens = dt_time.fromisoformat(BUSINESS_HOURS["start"])
+    closes = dt_time.fromisoformat(BUSINESS_HOURS["end"])
+    indexes = await client.schedules.day_indexes(client, practitioner_id, first_day, last_day)
+    slots = []
+    for day in sorted(indexes):
+        if day.weekday() not in BUSINESS_HOURS["weekdays"]:
+            continue
+        window_start = datetime.combine(day, opens, zone)
+        window_end = datetime.combine(day, closes, zone)
+        if now > window_start:
+            # First grid slot at or after now
+            window_start += -((window_start - now) // step) * step
+        for start, end in indexes[day].free_slots(window_start, window_end, length, step, MAX_SLOTS - len(slots)):
+            slots.append({"start": format_datetime(start), "end": format_datetime(end)})
+        if len(slots) >= MAX_SLOTS:
+            break
+    return slots
@@ -0,0 +1,94 @@
+"""
+Cliniko MCP Server - Batch Execution
+Fans a list of items out through ClinikoClient with bounded concurrency and
+returns one result or error per item, in input order.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+from typing_extensions import Required, TypedDict
+
+from tools.validators import PAYLOAD_SCHEMAS, Id, id_error, list_schema, validate_many
+from tracing import tracer
+from config.settings import env
+
+BATCH_CONCURRENCY = int(env("BATCH_CONCURRENCY", "5"))
+MAX_BATCH_SIZE = int(env("MAX_BATCH_SIZE", "200"))
+
+Validator = Callable[[Any], Optional[dict]]
+
+async def run_batch(items: List[Any], worker: Callable[[Any], Awaitable[Any]],
+                    validate: Validator = None, concurrency: int = BATCH_CONCURRENCY) -> dict:
+    """
+    Run worker(item) for each item with at most `concurrency` calls in flight.
+
+    Items that fail validate(item) are reported without being sent. Results
+    look like {"index": i, "ok": True, "result": ...} or
+    {"index": i, "ok": False, "error": ...}.
+    """
+    if not isinstance(items, list):
+        return {"error": "Expected a list of items", "results": []}
+    if len(items) > MAX_BATCH_SIZE:
+        return {"error": f"At most {MAX_BATCH_SIZE} items per batch", "results": []}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    with tracer.span("validate", items=len(items)) as span:
+        if validate is None:
+            errors = [None] * len(items)
+        elif isinstance(validate, ItemValidator):
+            errors = validate.many(items)
+        else:
+            errors = [validate(item) for item in items]
+        span.set_attribute("invalid", sum(1 for error in errors if error))
+
+    async def run_one(index: int, item: Any) -> dict:
+        if errors[index]:
+            return {"index": index, "ok": False, "error": errors[index]}
+        async with semaphore:
+            try:
+                return {"index": index, "ok": True, "result": await worker(item)}
+            except Exception as e:
+                return {"index": index, "ok": False, "error": str(e)}
+
+    results = await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items)))
+    succeeded = sum(1 for result in results if result["ok"])
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+class ItemValidator:
+    """
+    A per-item validator plus, when the payload has a schema, the compiled
+    list schema that lets run_batch screen the whole batch in one pass.
+    """
+
+    def __init__(self, check: Validator, schema=None):
+        self.check = check
+        self.schema = list_schema(schema) if schema is not None else None
+
+    def __call__(self, item) -> Optional[dict]:
+        return self.check(item)
+
+    def many(self, items: List[Any]) -> List[Optional[dict]]:
+        return validate_many(items, self.check, self.schema)
+
+def update_item_validator(id_field: str, payload_field: str, payload_error: Validator) -> ItemValidator:
+    """Validator for {"<id_field>": "...", "<payload_field>": {...}} batch items"""
+    def validate(item) -> Optional[dict]:
+        if not isinstance(item, dict) or not isinstance(item.get(payload_field), dict):
+            return {"error": f"Each item needs {id_field} and an object in {payload_field}"}
+        return id_error(id_field, item.get(id_field)) or payload_error(item[payload_field])
+
+    payload_schema = PAYLOAD_SCHEMAS.get(payload_error)
+    schema = None
+    if payload_schema is not None:
+        schema = TypedDict(f"{payload_field}_update_item", {id_field: Required[Id],
+                                                            payload_field: Required[payload_schema]})
+    return ItemValidator(validate, schema)
+
+def payload_validator(payload_error: Validator) -> ItemValidator:
+    """Validator for batch items that are themselves create payloads"""
+    def validate(item) -> Optional[dict]:
+        if not isinstance(item, dict):
+            return {"error": "Each item must be an object"}
+        return payload_error(item)
+
+    return ItemValidator(validate, PAYLOAD_SCHEMAS.get(payload_error))
@@ -0,0 +1 @@
+# Benchmarks for Cliniko MCP Server (run against a local mock, never the real API)
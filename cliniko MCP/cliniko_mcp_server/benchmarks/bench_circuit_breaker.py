@@ -0,0 +1,83 @@
+"""
+Circuit breaker under an injected Cliniko outage: latency of get_patient with
+and without the breaker, stale cache fallback while it is open, and how long
+half-open probing takes to restore traffic once the fake recovers.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_circuit_breaker --calls 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.bench_transport import percentile
+from benchmarks.mock_cliniko import create_app, serve_in_background
+from cache import STALE_MARKER, RecordCache
+from circuit_breaker import CLOSED, CircuitBreakers
+from cliniko_client import ClinikoClient
+from rate_limiter import TokenBucket
+
+async def outage_calls(client: ClinikoClient, calls: int, patients: int) -> dict:
+    latencies, stale, failed = [], 0, 0
+    for i in range(calls):
+        started = time.perf_counter()
+        try:
+            record = await client.get_patient(i % patients + 1)
+            stale += bool(record.get(STALE_MARKER))
+        except Exception:
+            failed += 1
+        latencies.append(time.perf_counter() - started)
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000, "p99_ms": percentile(latencies, 99) * 1000,
+        "total_s": sum(latencies), "stale": stale, "failed": failed,
+    }
+
+async def run(base_url: str, app, args, breaker_enabled: bool):
+    breakers = CircuitBreakers(min_calls=args.min_calls, open_seconds=args.open_seconds,
+                               **({} if breaker_enabled else {"failure_rate": 2.0, "slow_call_rate": 2.0}))
+    cache = RecordCache({"patients": args.ttl})
+    limiter = TokenBucket(rate=10_000, capacity=10_000)
+    async with ClinikoClient(base_url=base_url, cache=cache, limiter=limiter, breakers=breakers) as client:
+        app.state.faults["error_rate"] = 0.0
+        for i in range(args.patients):
+            await client.get_patient(i + 1)
+        await asyncio.sleep(args.ttl)  # let every cached copy expire
+
+        app.state.faults["error_rate"] = 1.0
+        before = app.state.stats["requests"]
+        outage = await outage_calls(client, args.calls, args.patients)
+        outage["upstream"] = app.state.stats["requests"] - before
+
+        app.state.faults["error_rate"] = 0.0
+        recovered_in = None
+        if breaker_enabled:
+            started = time.perf_counter()
+            while breakers.get("patients").state != CLOSED:
+                try:
+                    await client.get_patient(1)
+                except Exception:
+                    pass
+                await asyncio.sleep(0.05)
+            recovered_in = time.perf_counter() - started
+    return outage, recovered_in
+
+async def main(args):
+    app = create_app(patient_count=args.patients)
+    with serve_in_background(app, port=args.port) as base_url:
+        print(f"{'breaker':<9}{'p50 ms':>9}{'p99 ms':>10}{'total s':>9}{'stale':>7}{'failed':>8}{'upstream':>10}{'recovered s':>13}")
+        for enabled in (False, True):
+            outage, recovered_in = await run(base_url, app, args, enabled)
+            print(f"{'on' if enabled else 'off':<9}{outage['p50_ms']:>9.1f}{outage['p99_ms']:>10.1f}"
+                  f"{outage['total_s']:>9.2f}{outage['stale']:>7}{outage['failed']:>8}{outage['upstream']:>10}"
+                  f"{recovered_in if recovered_in is not None else float('nan'):>13.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50, help="get_patient calls during the outage")
+    parser.add_argument("--patients", type=int, default=20, help="patients cached before the outage")
+    parser.add_argument("--ttl", type=float, default=0.5, help="patient cache TTL in seconds")
+    parser.add_argument("--min-calls", type=int, default=5)
+    parser.add_argument("--open-seconds", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8770)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""
+Booking conflict checks: an agent booking random 30-minute slots for today
+(more attempts than free slots, so most collide with an existing or earlier
+booking), with no check (every booking is POSTed), with the check on cold
+schedule days (fetched on first use) and with the days warmed by CacheWarmer.
+
+Reports POSTs, appointment list calls, bookings refused, double bookings
+left behind and p50 create latency, then the cost of one check for a free
+slot on cached days. A free slot costs no list call; each refusal costs one,
+as the overlap is confirmed against a fresh fetch of the day.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_conflicts --bookings 200 --practitioners 5 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from availability import BookingConflict, appointment_interval, format_datetime
+from benchmarks.bench_transport import percentile
+from benchmarks.mock_cliniko import FakeCliniko, create_app, serve_in_background
+from cliniko_client import ClinikoClient, linked_id
+from rate_limiter import TokenBucket
+from warmer import CacheWarmer
+
+def double_bookings(fake: FakeCliniko, created: list) -> int:
+    """Created appointments that overlap another booking with the same practitioner"""
+    booked = {}
+    for appointment in fake.records["appointments"].values():
+        interval = appointment_interval(appointment)
+        if interval is not None:
+            booked.setdefault(linked_id(appointment, "practitioner"), []).append(interval)
+    count = 0
+    for appointment_id in created:
+        appointment = fake.records["appointments"][appointment_id]
+        start, end, _ = appointment_interval(appointment)
+        count += any(other_id != appointment_id and other_start < end and other_end > start
+                     for other_start, other_end, other_id in booked[linked_id(appointment, "practitioner")])
+    return count
+
+def requests_for(fake: FakeCliniko, count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    # The fake books from 09:00 UTC on a 30-minute grid
+    opens = datetime.now(timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0)
+    payloads = []
+    for i in range(count):
+        start = opens + timedelta(minutes=30 * rng.randrange(16))
+        payloads.append({
+            "patient_id": "1", "practitioner_id": rng.choice(fake.practitioner_ids), "business_id": fake.business_id,
+            "appointment_type_id": "1", "appointment_start": format_datetime(start),
+            "appointment_end": format_datetime(start + timedelta(minutes=30)), "notes": f"booking {i}",
+        })
+    return payloads
+
+async def run(mode: str, base_url: str, app, payloads: list, args) -> dict:
+    fake, stats = app.state.fake, app.state.stats
+    original = dict(fake.records["appointments"])
+    limiter = TokenBucket(rate=args.rpm / 60, capacity=args.burst)
+    async with ClinikoClient(base_url=base_url, limiter=limiter) as client:
+        if mode == "warm check":
+            await CacheWarmer(client, days=1, business_ids=[], ttl=None).warm()
+        before = dict(stats["calls"])
+        created, refused, latencies = [], 0, []
+        for payload in payloads:
+            started = time.perf_counter()
+            try:
+                record = await client.create_appointment(payload, check_conflicts=mode != "no check")
+                created.append(record["id"])
+            except BookingConflict:
+                refused += 1
+            latencies.append(time.perf_counter() - started)
+        result = {
+            "posts": stats["calls"]["POST /appointments"] - before.get("POST /appointments", 0),
+            "lists": stats["calls"]["GET /appointments"] - before.get("GET /appointments", 0),
+            "refused": refused,
+            "double": double_bookings(fake, created),
+            "p50_ms": percentile(latencies, 50) * 1000,
+        }
+        if mode == "warm check":
+            result["check_us"] = await check_cost(client, payloads, args.repeat)
+    fake.records["appointments"] = original
+    return result
+
+async def check_cost(client: ClinikoClient, payloads: list, repeat: int) -> float:
+    """Microseconds per ScheduleCache.conflicts() call for a free slot on a cached day"""
+    # The fake books nothing after 17:00 UTC
+    evening = [{**payload, "appointment_start": payload["appointment_start"][:11] + "20:00:00Z",
+                "appointment_end": payload["appointment_start"][:11] + "20:30:00Z"} for payload in payloads]
+    schedules = client.schedules
+    started = time.perf_counter()
+    for i in range(repeat):
+        payload = evening[i % len(evening)]
+        await schedules.conflicts(client, payload["practitioner_id"], payload)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+async def main(args):
+    fake = FakeCliniko(patient_count=10, appointment_count=args.booked, practitioner_count=args.practitioners, days=1,
+                       seed=args.seed)
+    app = create_app(fake=fake, latency=args.latency)
+    payloads = requests_for(fake, args.bookings, args.seed)
+    with serve_in_background(app, port=args.port) as base_url:
+        print(f"{'mode':<12}{'bookings':>10}{'POSTs':>7}{'lists':>7}{'refused':>9}{'double':>8}{'p50 ms':>9}")
+        for mode in ("no check", "cold check", "warm check"):
+            result = await run(mode, base_url, app, payloads, args)
+            print(f"{mode:<12}{args.bookings:>10}{result['posts']:>7}{result['lists']:>7}{result['refused']:>9}"
+                  f"{result['double']:>8}{result['p50_ms']:>9.1f}")
+        print(f"conflict check on cached days: {result['check_us']:.1f} us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=200, help="booking attempts")
+    parser.add_argument("--practitioners", type=int, default=5)
+    parser.add_argument("--booked", type=int, default=25, help="appointments already booked today")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake Cliniko response")
+    parser.add_argument("--repeat", type=int, default=10000, help="timed conflict checks on cached days")
+    parser.add_argument("--rpm", type=float, default=60000)
+    parser.add_argument("--burst", type=float, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8777)
+    asyncio.run(main(parser.parse_args()))
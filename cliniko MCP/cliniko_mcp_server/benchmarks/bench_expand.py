@@ -0,0 +1,77 @@
+"""
+Server-side joins: a day's appointments with their patients and practitioners,
+fetched the way an agent does without `expand` (list_appointments, then
+get_patient and get_practitioner per appointment, one MCP tool call each)
+versus a single list_appointments call with expand="patient,practitioner".
+
+Drives the tools in main.py in-process against the fake Cliniko and reports
+MCP tool calls, upstream requests and wall time. Each mode starts with an
+empty read cache.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_expand --appointments 50 --patients 40 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from benchmarks.mock_cliniko import FakeCliniko, create_app, serve_in_background
+
+# Cliniko IDs are 19 digits and the tools check that
+ID_BASE = 1_752_849_000_000_000_000
+
+async def per_record(client, limit: int) -> int:
+    page = (await client.call_tool("list_appointments", {"limit": limit})).structured_content
+    calls = 1
+    for appointment in page["appointments"]:
+        for tool, argument, name in (("get_patient", "patient_id", "patient"),
+                                     ("get_practitioner", "practitioner_id", "practitioner")):
+            linked = appointment[name]["links"]["self"].rsplit("/", 1)[-1]
+            await client.call_tool(tool, {argument: int(linked)})
+            calls += 1
+    return calls
+
+async def expanded(client, limit: int) -> int:
+    page = (await client.call_tool("list_appointments", {"limit": limit, "expand": "patient,practitioner"}))
+    assert all("first_name" in appointment["patient"] for appointment in page.structured_content["appointments"])
+    return 1
+
+async def main(args):
+    fake = FakeCliniko(patient_count=args.patients, appointment_count=args.appointments, days=1, id_base=ID_BASE)
+    app = create_app(fake=fake, latency=args.latency)
+    with serve_in_background(app, port=args.port) as base_url:
+        # Module settings are read on import and client settings on first use, so set them first
+        os.environ.update({
+            "CLINIKO_BASE_URL": base_url,
+            "CLINIKO_RATE_LIMIT_PER_MINUTE": "60000",
+            "CLINIKO_RATE_LIMIT_BURST": "200",
+            "PATIENT_INDEX_PATH": ":memory:",
+            "SYNC_STORE_PATH": ":memory:",
+            "SYNC_INTERVAL": "0",
+            "WARM_DAYS": "0",
+        })
+        import main as server
+        from fastmcp import Client
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        print(f"{'mode':<12}{'appointments':>14}{'tool calls':>12}{'upstream':>10}{'wall ms':>10}")
+        async with Client(server.app) as client:
+            for mode, run in (("per-record", per_record), ("expand", expanded)):
+                server.get_client(server.DEFAULT_TENANT).cache.clear()
+                before = app.state.stats["requests"]
+                started = time.perf_counter()
+                calls = await run(client, args.appointments)
+                elapsed = time.perf_counter() - started
+                print(f"{mode:<12}{args.appointments:>14}{calls:>12}{app.state.stats['requests'] - before:>10}"
+                      f"{elapsed * 1000:>10.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--appointments", type=int, default=50, help="appointments in the day listed")
+    parser.add_argument("--patients", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake Cliniko response")
+    parser.add_argument("--port", type=int, default=8775)
+    asyncio.run(main(parser.parse_args()))
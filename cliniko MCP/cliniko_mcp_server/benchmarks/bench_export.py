@@ -0,0 +1,74 @@
+"""
+Bulk export: every invoice collected into one list and serialized (what
+list_invoices(max_records=None) and the *://list resources do) versus
+streamed page by page with export.export_pages (the /export route) and
+written to a file with export.export_to_file.
+
+Reports records, wall time and peak traced memory, which for the streamed
+modes should stay flat as the record count grows. The fake Cliniko runs in
+the same process, so its per-page response building is included in every
+mode's peak.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_export --records 2000 20000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.mock_cliniko import FakeCliniko, create_app, serve_in_background
+from cliniko_client import ClinikoClient
+from export import export_pages, export_to_file
+from rate_limiter import TokenBucket
+from serialization import dumps
+
+async def collect(client: ClinikoClient, fmt: str, directory: str) -> int:
+    records = await client.list_invoices()
+    dumps({"invoices": records})
+    return len(records)
+
+async def stream(client: ClinikoClient, fmt: str, directory: str) -> int:
+    total = 0
+    async for _, records, _ in export_pages(client, "invoices", fmt=fmt):
+        total += records
+    return total
+
+async def to_file(client: ClinikoClient, fmt: str, directory: str) -> int:
+    result = await export_to_file(client, "invoices", fmt, path=os.path.join(directory, f"invoices.{fmt}"),
+                                  restart=True)
+    return result["records"]
+
+MODES = {"collect": collect, "stream": stream, "file": to_file}
+
+async def main(args):
+    directory = tempfile.mkdtemp()
+    print(f"{'records':>8}  {'mode':<9}{'format':<8}{'exported':>10}{'wall ms':>10}{'peak MB':>9}")
+    for count in args.records:
+        app = create_app(fake=FakeCliniko(patient_count=0, record_count=count, practitioner_count=1))
+        with serve_in_background(app, port=args.port) as base_url:
+            limiter = TokenBucket(rate=args.rpm / 60, capacity=args.burst)
+            async with ClinikoClient(base_url=base_url, limiter=limiter) as client:
+                for mode, run in MODES.items():
+                    for fmt in (("ndjson",) if mode == "collect" else ("ndjson", "csv")):
+                        tracemalloc.start()
+                        started = time.perf_counter()
+                        exported = await run(client, fmt, directory)
+                        elapsed = time.perf_counter() - started
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                        label = "json" if mode == "collect" else fmt
+                        print(f"{count:>8}  {mode:<9}{label:<8}{exported:>10}{elapsed * 1000:>10.0f}"
+                              f"{peak / 2 ** 20:>9.1f}")
+        args.port += 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, nargs="+", default=[2000, 20000], help="invoices in the fake Cliniko")
+    parser.add_argument("--rpm", type=float, default=600000)
+    parser.add_argument("--burst", type=float, default=1000)
+    parser.add_argument("--port", type=int, default=8778)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""
+Write de-duplication: create_patient retried the ways agents and callers
+retry it, with the idempotency store switched off (window 0), on with an
+idempotency key per create, and on without keys but with payload-hash
+de-duplication (IDEMPOTENCY_PAYLOAD_DEDUPE).
+
+  double-submit   the same create sent twice at once
+  timeout-retry   the caller gives up after --timeout and sends it again
+  lost-response   the first create succeeds but its result is dropped,
+                  so the caller sends it again
+
+Reports upstream POSTs, patients actually created in the fake Cliniko (one
+per create is correct; more are duplicate records) and p50 time until the
+caller has its record.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_idempotency --creates 50 --latency 0.2 --timeout 0.1
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.bench_transport import percentile
+from benchmarks.mock_cliniko import FakeCliniko, create_app, serve_in_background
+from cliniko_client import ClinikoClient
+from idempotency import IdempotencyStore
+from rate_limiter import TokenBucket
+
+async def double_submit(client: ClinikoClient, patient: dict, key: str, timeout: float) -> dict:
+    first, _ = await asyncio.gather(client.create_patient(patient, key), client.create_patient(patient, key))
+    return first
+
+async def timeout_retry(client: ClinikoClient, patient: dict, key: str, timeout: float) -> dict:
+    try:
+        return await asyncio.wait_for(client.create_patient(patient, key), timeout)
+    except asyncio.TimeoutError:
+        return await client.create_patient(patient, key)
+
+async def lost_response(client: ClinikoClient, patient: dict, key: str, timeout: float) -> dict:
+    await client.create_patient(patient, key)
+    return await client.create_patient(patient, key)
+
+PATTERNS = {"double-submit": double_submit, "timeout-retry": timeout_retry, "lost-response": lost_response}
+
+# Store setting -> (IdempotencyStore arguments, whether callers send a key)
+STORES = {
+    "off": ({"window": 0}, False),
+    "key": ({"window": 600}, True),
+    "payload": ({"window": 600, "payload_window": 30}, False),
+}
+
+async def run(pattern: str, store: str, base_url: str, app, args) -> dict:
+    fake, stats = app.state.fake, app.state.stats
+    before_posts, before_patients = stats["calls"]["POST /patients"], len(fake.records["patients"])
+    limiter = TokenBucket(rate=args.rpm / 60, capacity=args.burst)
+    latencies = []
+    settings, keyed = STORES[store]
+
+    async def create(i: int):
+        patient = {"first_name": f"Retry{i}", "last_name": f"{pattern}-{store}", "email": f"p{i}@example.com"}
+        started = time.perf_counter()
+        await PATTERNS[pattern](client, patient, f"{pattern}-{i}" if keyed else None, args.timeout)
+        latencies.append(time.perf_counter() - started)
+
+    async with ClinikoClient(base_url=base_url, limiter=limiter, idempotency=IdempotencyStore(**settings)) as client:
+        await asyncio.gather(*(create(i) for i in range(args.creates)))
+        # Requests abandoned by a timed-out caller may still be landing upstream
+        await asyncio.sleep(args.latency * 2)
+        replays = client.idempotency.replays
+    return {
+        "posts": stats["calls"]["POST /patients"] - before_posts,
+        "created": len(fake.records["patients"]) - before_patients,
+        "replays": replays,
+        "p50_ms": percentile(latencies, 50) * 1000,
+    }
+
+async def main(args):
+    app = create_app(fake=FakeCliniko(patient_count=0), latency=args.latency)
+    with serve_in_background(app, port=args.port) as base_url:
+        print(f"{'pattern':<15}{'store':<9}{'creates':>9}{'POSTs':>7}{'created':>9}{'duplicates':>12}"
+              f"{'replays':>9}{'p50 ms':>9}")
+        for pattern in PATTERNS:
+            for store in STORES:
+                result = await run(pattern, store, base_url, app, args)
+                print(f"{pattern:<15}{store:<9}{args.creates:>9}{result['posts']:>7}"
+                      f"{result['created']:>9}{result['created'] - args.creates:>12}{result['replays']:>9}"
+                      f"{result['p50_ms']:>9.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--creates", type=int, default=50, help="distinct patients each pattern creates")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake Cliniko response")
+    parser.add_argument("--timeout", type=float, default=0.1, help="caller timeout in timeout-retry")
+    parser.add_argument("--rpm", type=float, default=60000)
+    parser.add_argument("--burst", type=float, default=200)
+    parser.add_argument("--port", type=int, default=8776)
+    asyncio.run(main(parser.parse_args()))
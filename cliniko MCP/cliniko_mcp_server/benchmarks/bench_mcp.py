@@ -0,0 +1,181 @@
+"""
+Load test for the MCP server: drives the FastMCP tools in main.py in-process
+against the hermetic fake Cliniko and reports req/s, p50/p95/p99 latency and
+upstream calls per scenario.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_mcp --requests 500 --concurrency 20
+    python -m benchmarks.bench_mcp --scenarios get_patient mixed --latency 0.05 --error-rate 0.02
+    python -m benchmarks.bench_mcp --max-p95-ms 250 --min-rps 100 --json results.json   # CI gate
+
+Exits with status 1 when a --max-p95-ms / --min-rps gate is missed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.mock_cliniko import FakeCliniko, create_app, serve_in_background
+
+# Cliniko IDs are 19 digits and the batch tools check that
+ID_BASE = 1_752_849_000_000_000_000
+
+# Nothing that imports cliniko_client may be imported at module level: modules
+# read their settings (SYNC_INTERVAL, WARM_DAYS, ...) when first imported, in main() below.
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def scenarios(fake: FakeCliniko, rng: random.Random) -> dict:
+    """name -> callable returning (tool_name, arguments) for one request"""
+    patient_ids = sorted(fake.records["patients"])
+    today = datetime.now(timezone.utc).date()
+
+    def any_patient():
+        return rng.choice(patient_ids)
+
+    def new_appointment():
+        starts_at = datetime.combine(today + timedelta(days=rng.randrange(1, 14)), datetime.min.time(),
+                                     timezone.utc) + timedelta(minutes=9 * 60 + 15 * rng.randrange(32))
+        return {
+            "patient_id": any_patient(),
+            "practitioner_id": rng.choice(fake.practitioner_ids),
+            "appointment_type_id": str(fake.id_base + 1),
+            "business_id": fake.business_id,
+            "starts_at": starts_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "ends_at": (starts_at + timedelta(minutes=30)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+
+    single = {
+        "list_patients": lambda: ("list_patients", {"limit": 50}),
+        "get_patient": lambda: ("get_patient", {"patient_id": int(any_patient())}),
+        "get_patients": lambda: ("get_patients", {"patient_ids": rng.sample(patient_ids, min(10, len(patient_ids)))}),
+        "search_patients": lambda: ("search_patients", {
+            "query": fake.records["patients"][any_patient()]["last_name"], "limit": 10,
+        }),
+        "list_appointments": lambda: ("list_appointments", {"limit": 50}),
+        "find_available_slots": lambda: ("find_available_slots", {
+            "practitioner_id": rng.choice(fake.practitioner_ids),
+            "date_range": f"{today}/{today + timedelta(days=6)}",
+            "duration": "30",
+        }),
+        "create_appointment": lambda: ("create_appointment", {"appointment": new_appointment()}),
+    }
+    # Roughly what a booking agent does: mostly lookups, some availability, few writes
+    weights = {"get_patient": 35, "search_patients": 25, "find_available_slots": 20,
+               "list_appointments": 10, "create_appointment": 10}
+    names, cumulative = list(weights), list(weights.values())
+    single["mixed"] = lambda: single[rng.choices(names, cumulative)[0]]()
+    return single
+
+async def drive(mcp, make_call, total: int, concurrency: int) -> dict:
+    latencies, errors = [], Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        tool, arguments = make_call()
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await mcp.call_tool(tool, arguments, raise_on_error=False)
+                if result.is_error:
+                    errors[tool] += 1
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "req_per_sec": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": sum(errors.values()),
+    }
+
+async def main(args) -> int:
+    fake = FakeCliniko(args.patients, seed=args.seed, appointment_count=args.appointments,
+                       practitioner_count=args.practitioners, id_base=ID_BASE)
+    app = create_app(fake=fake, rate_limit=args.server_rps, latency=args.latency, jitter=args.jitter,
+                     error_rate=args.error_rate, seed=args.seed)
+    with serve_in_background(app, port=args.port) as base_url:
+        # Module settings are read on import and client settings on first use, so set them first
+        os.environ.update({
+            "CLINIKO_BASE_URL": base_url,
+            "CLINIKO_RATE_LIMIT_PER_MINUTE": str(args.client_rpm),
+            "CLINIKO_RATE_LIMIT_BURST": str(max(args.concurrency, 20)),
+            "PATIENT_INDEX_PATH": ":memory:",
+            "SYNC_STORE_PATH": ":memory:",
+            "SYNC_INTERVAL": "0",
+            "WARM_DAYS": "0",
+        })
+        import main as server
+        from fastmcp import Client
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        rng = random.Random(args.seed)
+        calls = scenarios(fake, rng)
+        results = {}
+        async with Client(server.app) as mcp:
+            if not args.cold_index:
+                await server.get_delta_sync().sync_resource("patients")
+            header = f"{'scenario':<22}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'upstream':>10}"
+            print(header)
+            for name in args.scenarios:
+                before = app.state.stats["requests"]
+                before_calls = Counter(app.state.stats["calls"])
+                result = await drive(mcp, calls[name], args.requests, args.concurrency)
+                result["upstream_calls"] = app.state.stats["requests"] - before
+                result["upstream_by_route"] = dict(app.state.stats["calls"] - before_calls)
+                results[name] = result
+                print(f"{name:<22}{result['req_per_sec']:>9}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+                      f"{result['p99_ms']:>10}{result['errors']:>8}{result['upstream_calls']:>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    failed = [
+        name for name, result in results.items()
+        if (args.max_p95_ms is not None and result["p95_ms"] > args.max_p95_ms)
+        or (args.min_rps is not None and result["req_per_sec"] < args.min_rps)
+    ]
+    if failed:
+        print(f"Regression gate failed for: {', '.join(failed)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=[
+        "list_patients", "get_patient", "get_patients", "search_patients",
+        "list_appointments", "find_available_slots", "create_appointment", "mixed",
+    ])
+    parser.add_argument("--requests", type=int, default=500, help="tool calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--appointments", type=int, default=2000)
+    parser.add_argument("--practitioners", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every upstream response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream 5xx responses")
+    parser.add_argument("--server-rps", type=float, default=None, help="fake Cliniko 429s above this rate")
+    parser.add_argument("--client-rpm", type=float, default=600_000, help="ClinikoClient token bucket rate")
+    parser.add_argument("--cold-index", action="store_true", help="skip the initial patient index sync")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8769)
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--min-rps", type=float, default=None)
+    sys.exit(asyncio.run(main(parser.parse_args())))
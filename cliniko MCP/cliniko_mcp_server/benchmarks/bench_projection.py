@@ -0,0 +1,93 @@
+"""
+Payload size and serialization time per projection profile.
+
+Records are shaped like full Cliniko API objects (nested links, phone
+arrays, custom fields) so the numbers reflect what the tools really return.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_projection --records 50 --rounds 200
+"""
+
+import argparse
+import json
+import time
+
+from config.constants import PROJECTION_PROFILES
+from projection import project
+
+API = "https://api.uk2.cliniko.com/v1"
+
+def link(resource: str, record_id) -> dict:
+    return {"links": {"self": f"{API}/{resource}/{record_id}"}}
+
+def full_patient(i: int) -> dict:
+    return {
+        "id": str(1000 + i),
+        "title": "Ms", "first_name": f"First{i}", "last_name": f"Last{i}", "preferred_first_name": None,
+        "date_of_birth": "1985-04-12", "sex": "Female", "gender_identity": None, "pronouns": None,
+        "email": f"patient{i}@example.com", "accepted_email_marketing": False, "accepted_sms_marketing": True,
+        "address_1": f"{i} High Street", "address_2": "Flat 2", "address_3": None, "city": "London",
+        "state": None, "post_code": "SW1A 1AA", "country": "United Kingdom", "country_code": "GB",
+        "time_zone": "Europe/London", "occupation": "Engineer", "emergency_contact": "Partner 07700 900000",
+        "medicare": None, "medicare_reference_number": None, "reminder_type": "SMS & Email",
+        "referral_source": "Google", "notes": "Prefers morning appointments. " * 3,
+        "patient_phone_numbers": [
+            {"number": f"07700 9{i:05d}", "phone_type": "Mobile"},
+            {"number": f"020 7946 {i % 10000:04d}", "phone_type": "Home"},
+        ],
+        "custom_fields": {"sections": [{"name": "Intake", "fields": [
+            {"name": "Referring GP", "type": "text", "value": "Dr Example"},
+            {"name": "Insurance", "type": "text", "value": "Provider Ltd"},
+        ]}]},
+        "created_at": "2024-01-01T09:00:00Z", "updated_at": "2025-01-01T09:00:00Z", "archived_at": None,
+        "appointments": link("patients", f"{1000 + i}/appointments"),
+        "attendee": link("patients", f"{1000 + i}/attendees"),
+        "invoices": link("patients", f"{1000 + i}/invoices"),
+        "medical_alerts": link("patients", f"{1000 + i}/medical_alerts"),
+        "links": {"self": f"{API}/patients/{1000 + i}"},
+    }
+
+def full_appointment(i: int) -> dict:
+    return {
+        "id": str(5000 + i),
+        "starts_at": "2025-09-01T09:00:00Z", "ends_at": "2025-09-01T09:45:00Z",
+        "appointment_start": "2025-09-01T09:00:00Z", "appointment_end": "2025-09-01T09:45:00Z",
+        "patient_name": f"First{i} Last{i}", "notes": "Follow-up for lower back pain. " * 2,
+        "booking_ip_address": "203.0.113.7", "online_booking_policy_accepted": None, "email_reminder_sent": True,
+        "sms_reminder_sent": True, "did_not_arrive": False, "patient_arrived": False, "invoice_status": 1,
+        "treatment_note_status": 0, "has_patient_appointment_notes": False, "max_attendees": None,
+        "repeat_rule": None, "repeated_from": None, "telehealth_url": None,
+        "cancelled_at": None, "cancellation_note": None, "cancellation_reason": None,
+        "created_at": "2025-08-01T09:00:00Z", "updated_at": "2025-08-01T09:00:00Z", "archived_at": None,
+        "patient": link("patients", 1000 + i), "practitioner": link("practitioners", 1),
+        "appointment_type": link("appointment_types", 1), "business": link("businesses", 1),
+        "attendees": link("individual_appointments", f"{5000 + i}/attendees"),
+        "conflicts": link("individual_appointments", f"{5000 + i}/conflicts"),
+        "invoices": link("individual_appointments", f"{5000 + i}/invoices"),
+        "links": {"self": f"{API}/individual_appointments/{5000 + i}"},
+    }
+
+def measure(records: list, resource: str, fields: str, rounds: int):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        payload = json.dumps({resource: project(records, resource, fields)})
+    elapsed = time.perf_counter() - started
+    return len(payload.encode()), elapsed / rounds
+
+def main(args):
+    datasets = {
+        "patients": [full_patient(i) for i in range(args.records)],
+        "appointments": [full_appointment(i) for i in range(args.records)],
+    }
+    for resource, records in datasets.items():
+        full_bytes, _ = measure(records, resource, "", 1)
+        for profile in ["", *PROJECTION_PROFILES[resource]]:
+            size, seconds = measure(records, resource, profile, args.rounds)
+            print(f"{resource:<13} {profile or 'full':<8} records={args.records:<5} "
+                  f"bytes={size:<8} ({size / full_bytes:6.1%})  project+dumps={seconds * 1000:.3f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,60 @@
+"""
+Benchmark: size the client-side token bucket against a mock that answers 429
+once it sees more than --server-rps requests in a second.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_rate_limit --server-rps 20 --client-rpm 1200 1800 3000
+
+For each client rate it reports throughput, the 429s the server sent, client
+retries, and the limiter's queue depth and time spent waiting for tokens.
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.mock_cliniko import create_app, serve_in_background
+from cliniko_client import ClinikoClient
+from rate_limiter import TokenBucket
+
+async def run(base_url: str, rate_per_minute: float, burst: float, total: int, concurrency: int) -> dict:
+    limiter = TokenBucket(rate=rate_per_minute / 60, capacity=burst)
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    async with ClinikoClient(base_url=base_url, limiter=limiter) as client:
+        client.cache.max_entries = 0  # measure upstream traffic, not cache hits
+
+        async def one(i):
+            nonlocal failures
+            async with semaphore:
+                try:
+                    await client.get_patient(i % 100 + 1)
+                except Exception:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+        return {"req_per_sec": total / elapsed, "failures": failures, "retries": client.retries,
+                **limiter.stats()}
+
+async def main(args):
+    print(f"{'client rpm':>10}{'req/s':>8}{'429s':>6}{'retries':>8}{'failed':>7}"
+          f"{'max queue':>10}{'avg wait ms':>12}")
+    for rpm in args.client_rpm:
+        app = create_app(rate_limit=args.server_rps)
+        with serve_in_background(app, port=args.port) as base_url:
+            result = await run(base_url, rpm, args.burst, args.requests, args.concurrency)
+        print(f"{rpm:>10.0f}{result['req_per_sec']:>8.1f}{app.state.stats['throttled']:>6}"
+              f"{result['retries']:>8}{result['failures']:>7}{result['max_queue_depth']:>10}"
+              f"{result['avg_wait_ms']:>12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server-rps", type=float, default=20)
+    parser.add_argument("--client-rpm", type=float, nargs="+", default=[1200, 1800, 3000])
+    parser.add_argument("--burst", type=float, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8766)
+    asyncio.run(main(parser.parse_args()))
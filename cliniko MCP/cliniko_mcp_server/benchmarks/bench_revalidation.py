@@ -0,0 +1,81 @@
+"""
+Conditional GETs: repeated get_patient reads of mostly-unchanged records with
+and without the ETag/Last-Modified revalidation store.
+
+The read cache is disabled for patients so every call reaches the fake
+Cliniko; between rounds a share of the records is modified. Reports body
+bytes sent by the server, 304s, bytes saved and per-call latency.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_revalidation --patients 200 --rounds 5 --change-rate 0.05
+    python -m benchmarks.bench_revalidation --max-bytes 100000 --spill /tmp/revalidation.db
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.bench_projection import full_patient
+from benchmarks.bench_transport import percentile
+from benchmarks.mock_cliniko import FakeCliniko, create_app, serve_in_background
+from cache import RecordCache
+from cliniko_client import ClinikoClient
+from rate_limiter import TokenBucket
+from revalidation import ValidatorStore
+
+async def run(base_url: str, app, ids: list, args, validators: ValidatorStore) -> dict:
+    fake, stats = app.state.fake, app.state.stats
+    limiter = TokenBucket(rate=10_000, capacity=10_000)
+    before = dict(stats, calls=None)
+    latencies = []
+    async with ClinikoClient(base_url=base_url, cache=RecordCache({}), limiter=limiter,
+                             validators=validators) as client:
+        for round_number in range(args.rounds):
+            if round_number:
+                for record_id in fake.random.sample(ids, int(len(ids) * args.change_rate)):
+                    fake.update("patients", record_id, {"notes": f"Updated in round {round_number}"})
+            for record_id in ids:
+                started = time.perf_counter()
+                await client.get_patient(record_id)
+                latencies.append(time.perf_counter() - started)
+    return {
+        "calls": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "body_bytes": stats["body_bytes"] - before["body_bytes"],
+        "not_modified": stats["not_modified"] - before["not_modified"],
+        **{key: value for key, value in validators.stats().items()
+           if key in ("bytes_saved", "bytes", "spilled_entries", "spill_hits")},
+    }
+
+async def main(args):
+    fake = FakeCliniko(patient_count=0)
+    for i in range(args.patients):
+        patient = full_patient(i)
+        fake.records["patients"][patient["id"]] = patient
+    ids = sorted(fake.records["patients"])
+    app = create_app(fake=fake, etags=True)
+    if args.spill and os.path.exists(args.spill):
+        os.remove(args.spill)
+    with serve_in_background(app, port=args.port) as base_url:
+        print(f"{'mode':<12}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'body KB':>10}{'304s':>7}"
+              f"{'saved KB':>10}{'held KB':>9}{'spilled':>9}{'disk hits':>11}")
+        for mode, store in (("plain", ValidatorStore(max_bytes=0)),
+                            ("conditional", ValidatorStore(args.max_bytes, args.spill or ""))):
+            result = await run(base_url, app, ids, args, store)
+            store.close()
+            print(f"{mode:<12}{result['calls']:>7}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                  f"{result['body_bytes'] / 1024:>10.1f}{result['not_modified']:>7}"
+                  f"{result['bytes_saved'] / 1024:>10.1f}{result['bytes'] / 1024:>9.1f}"
+                  f"{result['spilled_entries']:>9}{result['spill_hits']:>11}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--change-rate", type=float, default=0.05, help="share of patients modified between rounds")
+    parser.add_argument("--max-bytes", type=int, default=8 * 1024 * 1024, help="in-memory revalidation budget")
+    parser.add_argument("--spill", default="", help="SQLite file for entries evicted from memory")
+    parser.add_argument("--port", type=int, default=8771)
+    asyncio.run(main(parser.parse_args()))
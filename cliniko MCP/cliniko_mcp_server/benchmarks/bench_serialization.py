@@ -0,0 +1,84 @@
+"""
+JSON backends: decoding a Cliniko list page and turning it into an MCP tool
+result, with each installed backend and with FastMCP's own conversion versus
+the pass-through result from serialization.tool_result.
+
+"decode" parses the response body, "result" builds the tool result from the
+decoded page, and "call" is a whole in-process tools/call of a tool that
+decodes the body and returns the page.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_serialization --records 1000 10000
+    python -m benchmarks.bench_serialization --records 1000 --fields summary
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastmcp import Client, FastMCP
+
+from benchmarks.bench_projection import full_patient
+from projection import project
+from serialization import codec, tool_result
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+async def call_ms(repeat: int, app: FastMCP) -> float:
+    best = float("inf")
+    async with Client(app) as client:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await client.call_tool("list_patients", {})
+            best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def list_app(body: bytes, json_codec, passthrough: bool, fields: str) -> FastMCP:
+    app = FastMCP("bench")
+
+    @app.tool("list_patients")
+    async def list_patients() -> dict:
+        page = json_codec.loads(body)
+        return tool_result({"patients": project(page["patients"], "patients", fields), "next_cursor": None},
+                           json_codec, passthrough)
+
+    return app
+
+async def main(args):
+    backends = []
+    for name in ("json", "orjson", "msgspec"):
+        backend = codec(name)
+        if backend.name == name:
+            backends.append(backend)
+    print(f"{'records':>8}  {'backend':<9}{'mode':<13}{'body KB':>9}{'decode ms':>11}{'result ms':>11}{'call ms':>10}")
+    for count in args.records:
+        body = json.dumps({"patients": [full_patient(i) for i in range(count)]}).encode()
+        for backend in backends:
+            page = backend.loads(body)
+            value = {"patients": project(page["patients"], "patients", args.fields), "next_cursor": None}
+            decode = best_of(args.repeat, lambda: backend.loads(body))
+            for passthrough in (False, True):
+                if passthrough:
+                    result = best_of(args.repeat, lambda: tool_result(value, backend, True))
+                else:
+                    app = list_app(body, backend, False, args.fields)
+                    tool = await app.get_tool("list_patients")
+                    result = best_of(args.repeat, lambda: tool.convert_result(value))
+                call = await call_ms(args.repeat, list_app(body, backend, passthrough, args.fields))
+                mode = "passthrough" if passthrough else "fastmcp"
+                print(f"{count:>8}  {backend.name:<9}{mode:<13}{len(body) / 1024:>9.0f}{decode:>11.2f}"
+                      f"{result:>11.2f}{call:>10.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, nargs="+", default=[1000, 10000], help="records per page")
+    parser.add_argument("--fields", default="", help="projection applied to each page (e.g. summary)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per measurement (best is reported)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,43 @@
+"""
+Load test: N concurrent identical reads should reach the upstream exactly once.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_singleflight --callers 100
+    python -m benchmarks.bench_singleflight --callers 100 --no-coalesce   # baseline
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.mock_cliniko import create_app, serve_in_background
+from cliniko_client import ClinikoClient
+from rate_limiter import TokenBucket
+
+async def burst(client: ClinikoClient, callers: int, call) -> float:
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call(client) for _ in range(callers)))
+    assert all(result == results[0] for result in results)
+    return time.perf_counter() - started
+
+async def main(args):
+    scenarios = {
+        "get_patient(1)": lambda client: client.get_patient(1),
+        "list_patients()": lambda client: client.list_patients(max_records=100),
+    }
+    app = create_app()
+    with serve_in_background(app, port=args.port) as base_url:
+        for name, call in scenarios.items():
+            limiter = TokenBucket(rate=10_000, capacity=10_000)
+            async with ClinikoClient(base_url=base_url, limiter=limiter, coalesce=not args.no_coalesce) as client:
+                before = app.state.stats["requests"]
+                elapsed = await burst(client, args.callers, call)
+                hits = app.state.stats["requests"] - before
+            print(f"{name:<18} callers={args.callers:<5} upstream hits={hits:<5} elapsed={elapsed * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=100)
+    parser.add_argument("--no-coalesce", action="store_true")
+    parser.add_argument("--port", type=int, default=8767)
+    asyncio.run(main(parser.parse_args()))
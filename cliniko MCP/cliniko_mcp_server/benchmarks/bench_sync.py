@@ -0,0 +1,64 @@
+"""
+Delta sync against a fake Cliniko that mutates records between passes.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_sync --rounds 5 --mutations 50
+
+Each round touches --mutations random records per resource (plus one new
+record), runs one DeltaSync pass and checks every local copy matches the
+fake upstream. The first pass is the full download.
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.mock_cliniko import RESOURCES, FakeCliniko, create_app, serve_in_background
+from cliniko_client import ClinikoClient
+from patient_index import PatientIndex
+from rate_limiter import TokenBucket
+from sync import DeltaSync, RecordStore
+
+def mismatches(fake: FakeCliniko, stores: dict) -> int:
+    bad = 0
+    for resource in RESOURCES:
+        store = stores[resource]
+        for record_id, record in fake.records[resource].items():
+            if isinstance(store, PatientIndex):
+                local = store.find_by_email(record["email"], 1)
+                local = local[0] if local else None
+            else:
+                local = store.get(resource, record_id)
+            if local is None or local.get("updated_at") != record["updated_at"]:
+                bad += 1
+    return bad
+
+async def main(args):
+    fake = FakeCliniko(patient_count=args.records, record_count=args.records)
+    app = create_app(fake=fake)
+    record_store = RecordStore(":memory:")
+    stores = {r: (PatientIndex(":memory:") if r == "patients" else record_store) for r in RESOURCES}
+    with serve_in_background(app, port=args.port) as base_url:
+        limiter = TokenBucket(rate=args.rate, capacity=args.rate)
+        async with ClinikoClient(base_url=base_url, limiter=limiter) as client:
+            engine = DeltaSync(client, stores, concurrency=args.concurrency)
+            print(f"{'round':>5}{'upstream req':>14}{'applied':>9}{'slowest ms':>12}{'mismatches':>12}")
+            for round_number in range(args.rounds + 1):
+                if round_number:
+                    for resource in RESOURCES:
+                        fake.mutate(resource, args.mutations)
+                    await asyncio.sleep(0.002)  # keep new updated_at values distinct
+                before = app.state.stats["requests"]
+                applied = await engine.sync_all()
+                status = engine.status()
+                print(f"{round_number:>5}{app.state.stats['requests'] - before:>14}{sum(applied.values()):>9}"
+                      f"{max(s['last_duration_ms'] for s in status.values()):>12.1f}{mismatches(fake, stores):>12}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000, help="records per resource")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--mutations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=1000, help="limiter tokens/second")
+    parser.add_argument("--port", type=int, default=8768)
+    asyncio.run(main(parser.parse_args()))
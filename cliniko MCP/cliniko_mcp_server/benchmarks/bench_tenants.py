@@ -0,0 +1,113 @@
+"""
+Tenant isolation: a quiet clinic's latency while a noisy clinic floods its own
+(slow) Cliniko shard, with per-tenant pools and rate limiters versus one pool
+and one limiter shared by both, as before tenants existed.
+
+Each tenant gets its own fake Cliniko on localhost, standing in for shards
+such as uk2 and au4. Requests are routed through ClinikoClients by the
+tenant context, as TenantMiddleware does for MCP requests.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_tenants --noisy-concurrency 40 --noisy-latency 0.2 --seconds 5
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+import httpx
+
+from benchmarks.bench_transport import percentile
+from benchmarks.mock_cliniko import create_app, serve_in_background
+from cache import RecordCache
+from cliniko_client import ClinikoClient, ClinikoClients
+from rate_limiter import TokenBucket
+from tenants import current_tenant, tenant_scope
+
+async def tenant_load(clients, tenant: str, concurrency: int, stop_at: float) -> list:
+    latencies = []
+    # A distinct filter per call, so identical-GET coalescing doesn't hide the load
+    calls = itertools.count()
+
+    async def worker():
+        with tenant_scope(tenant):
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                await clients.get(current_tenant()).list_page("patients", [f"id:>={next(calls)}"], 10)
+                latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+class SharedClients:
+    """One pool and one rate limiter for every tenant, like the single global client"""
+
+    def __init__(self, urls: dict, args):
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.max_connections,
+                                                                 max_keepalive_connections=args.max_connections))
+        limiter = TokenBucket(rate=args.rpm / 60, capacity=args.burst)
+        self.clients = {
+            tenant: ClinikoClient(base_url=url, transport=transport, limiter=limiter, cache=RecordCache({}),
+                                  tenant=tenant)
+            for tenant, url in urls.items()
+        }
+
+    def get(self, tenant: str) -> ClinikoClient:
+        return self.clients[tenant]
+
+    async def aclose(self):
+        for client in self.clients.values():
+            await client.aclose()
+
+def isolated_clients(urls: dict, args) -> ClinikoClients:
+    return ClinikoClients({
+        tenant: {"api_key": f"{tenant}-key", "base_url": url, "max_connections": args.max_connections,
+                 "max_keepalive_connections": args.max_connections, "rate_limit_per_minute": args.rpm,
+                 "rate_limit_burst": args.burst}
+        for tenant, url in urls.items()
+    })
+
+async def run(mode: str, clients, apps: dict, args) -> dict:
+    before = {tenant: app.state.stats["requests"] for tenant, app in apps.items()}
+    stop_at = time.perf_counter() + args.seconds
+    noisy, quiet = await asyncio.gather(
+        tenant_load(clients, "noisy", args.noisy_concurrency, stop_at),
+        tenant_load(clients, "quiet", args.quiet_concurrency, stop_at),
+    )
+    await clients.aclose()
+    return {
+        "mode": mode,
+        "noisy_calls": len(noisy),
+        "quiet_calls": len(quiet),
+        "quiet_p50_ms": percentile(quiet, 50) * 1000,
+        "quiet_p95_ms": percentile(quiet, 95) * 1000,
+        "upstream": {tenant: app.state.stats["requests"] - before[tenant] for tenant, app in apps.items()},
+    }
+
+async def main(args):
+    apps = {"noisy": create_app(patient_count=100, latency=args.noisy_latency),
+            "quiet": create_app(patient_count=100, latency=args.quiet_latency)}
+    with serve_in_background(apps["noisy"], port=args.port) as noisy_url, \
+            serve_in_background(apps["quiet"], port=args.port + 1) as quiet_url:
+        urls = {"noisy": noisy_url, "quiet": quiet_url}
+        print(f"{'mode':<10}{'noisy calls':>12}{'quiet calls':>12}{'quiet p50 ms':>14}{'quiet p95 ms':>14}"
+              f"{'noisy upstream':>16}{'quiet upstream':>16}")
+        for mode, clients in (("shared", SharedClients(urls, args)), ("isolated", isolated_clients(urls, args))):
+            result = await run(mode, clients, apps, args)
+            print(f"{mode:<10}{result['noisy_calls']:>12}{result['quiet_calls']:>12}"
+                  f"{result['quiet_p50_ms']:>14.1f}{result['quiet_p95_ms']:>14.1f}"
+                  f"{result['upstream']['noisy']:>16}{result['upstream']['quiet']:>16}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--noisy-concurrency", type=int, default=40)
+    parser.add_argument("--quiet-concurrency", type=int, default=2)
+    parser.add_argument("--noisy-latency", type=float, default=0.2, help="seconds per response from the noisy shard")
+    parser.add_argument("--quiet-latency", type=float, default=0.01)
+    parser.add_argument("--max-connections", type=int, default=10, help="pool size (per tenant when isolated)")
+    parser.add_argument("--rpm", type=float, default=6000, help="rate limit (per tenant when isolated)")
+    parser.add_argument("--burst", type=float, default=50)
+    parser.add_argument("--port", type=int, default=8772)
+    asyncio.run(main(parser.parse_args()))
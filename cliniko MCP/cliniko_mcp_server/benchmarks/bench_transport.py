@@ -0,0 +1,75 @@
+"""
+Benchmark: one httpx.AsyncClient per call (the old ClinikoClient behaviour)
+versus the pooled, long-lived client in ClinikoClient.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_transport --requests 2000 --concurrency 20
+
+Note: the mock speaks plain HTTP, so the per-call numbers exclude the TLS
+handshake that dominates against api.*.cliniko.com; the real gap is larger.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.mock_cliniko import create_app, serve_in_background
+from cliniko_client import ClinikoClient
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run(call, total: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    return {
+        "req_per_sec": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+async def main(total: int, concurrency: int, http2: bool):
+    with serve_in_background(create_app()) as base_url:
+        async def per_call(i):
+            async with httpx.AsyncClient() as client:
+                resp = await client.get(f"{base_url}/patients/{i % 100 + 1}")
+                resp.raise_for_status()
+                resp.json()
+
+        pooled_client = ClinikoClient(base_url=base_url, http2=http2)
+
+        async def pooled(i):
+            await pooled_client.get_patient(i % 100 + 1)
+
+        async with pooled_client:
+            results = {
+                "per-call client": await run(per_call, total, concurrency),
+                "pooled client": await run(pooled, total, concurrency),
+            }
+
+    print(f"{'mode':<18}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode, stats in results.items():
+        print(f"{mode:<18}{stats['req_per_sec']:>10.1f}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--http2", action="store_true", help="enable HTTP/2 on the pooled client (needs h2)")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.http2))
@@ -0,0 +1,84 @@
+"""
+Batch validation: checking each item with its *_error function, as run_batch
+used to, versus screening the whole list in one pass with the compiled
+pydantic schema and re-checking only the items it rejects.
+
+Both modes must return identical error lists; the benchmark asserts it.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_validation --items 200 --invalid-rate 0.1
+    python -m benchmarks.bench_validation --items 10000 --repeat 20
+"""
+
+import argparse
+import random
+import time
+
+from batch import payload_validator, update_item_validator
+from tools.validators import (appointment_create_error, appointment_update_error, patient_create_error,
+                              patient_update_error)
+
+ID = "1764028746571981724"
+
+def patient(i: int) -> dict:
+    return {"first_name": f"Patient{i}", "last_name": "Smith", "email": f"patient{i}@example.com",
+            "date_of_birth": "1985-03-15", "city": "London"}
+
+def appointment(i: int) -> dict:
+    return {"patient_id": ID, "practitioner_id": ID, "appointment_type_id": ID, "business_id": ID,
+            "starts_at": f"2025-09-{i % 28 + 1:02d}T10:00:00Z", "ends_at": f"2025-09-{i % 28 + 1:02d}T11:00:00Z",
+            "notes": "Follow-up"}
+
+# (name, validator, valid item, ways to break an item)
+SCENARIOS = [
+    ("create_patients", payload_validator(patient_create_error), patient,
+     [lambda item: item.update(email="not-an-email"), lambda item: item.update(first_name=" "),
+      lambda item: item.pop("last_name")]),
+    ("update_patients", update_item_validator("patient_id", "patient", patient_update_error),
+     lambda i: {"patient_id": ID, "patient": patient(i)},
+     [lambda item: item["patient"].update(date_of_birth="15/03/1985"), lambda item: item.update(patient_id="42")]),
+    ("create_appointments", payload_validator(appointment_create_error), appointment,
+     [lambda item: item.update(ends_at="2025-09-05 11:00"), lambda item: item.pop("business_id"),
+      lambda item: item.update(patient_id=12345678901)]),
+    ("update_appointments", update_item_validator("appointment_id", "appointment", appointment_update_error),
+     lambda i: {"appointment_id": ID, "appointment": appointment(i)},
+     [lambda item: item["appointment"].update(starts_at="2025-09-05T10:00:00+01:00")]),
+]
+
+def build(make, breakers, count: int, invalid_rate: float, rng: random.Random) -> list:
+    items = []
+    for i in range(count):
+        item = make(i)
+        if rng.random() < invalid_rate:
+            rng.choice(breakers)(item)
+        items.append(item)
+    return items
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(args):
+    rng = random.Random(args.seed)
+    print(f"{'scenario':<22}{'items':>7}{'invalid':>9}{'per-item us':>13}{'one-pass us':>13}{'speedup':>9}")
+    for name, validator, make, breakers in SCENARIOS:
+        items = build(make, breakers, args.items, args.invalid_rate, rng)
+        per_item = [validator(item) for item in items]
+        assert validator.many(items) == per_item
+        invalid = sum(1 for error in per_item if error)
+        item_time = best_of(args.repeat, lambda: [validator(item) for item in items])
+        many_time = best_of(args.repeat, lambda: validator.many(items))
+        print(f"{name:<22}{len(items):>7}{invalid:>9}{item_time / len(items) * 1e6:>13.2f}"
+              f"{many_time / len(items) * 1e6:>13.2f}{item_time / many_time:>8.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200, help="payloads per batch")
+    parser.add_argument("--invalid-rate", type=float, default=0.1, help="share of payloads with a mistake")
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per mode (best is reported)")
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,102 @@
+"""
+Cache warm-up: inbound calls about upcoming appointments ("I'm running late",
+"reschedule my 3pm"), each doing get_appointment then get_patient and
+get_practitioner, against a cold read cache and one preloaded by CacheWarmer.
+
+Reports the warm-up duration and upstream requests it made, then per-call
+latency, upstream requests and get_appointment / get_patient hit rates.
+
+Usage (from cliniko_mcp_server/):
+    python -m benchmarks.bench_warmer --appointments 2000 --days 1 --calls 100 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.bench_transport import percentile
+from benchmarks.mock_cliniko import FakeCliniko, create_app, serve_in_background
+from cache import RecordCache
+from cliniko_client import ClinikoClient, linked_id
+from config.constants import CACHE_TTLS
+from rate_limiter import TokenBucket
+from warmer import WARM_TTL, CacheWarmer
+
+def upcoming(fake: FakeCliniko, days: int) -> list:
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    end = (today + timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return [appointment for appointment in fake.records["appointments"].values()
+            if appointment["starts_at"] < end and linked_id(appointment, "patient")]
+
+async def handle_call(client: ClinikoClient, appointment_id: str) -> float:
+    started = time.perf_counter()
+    appointment = await client.get_appointment(appointment_id)
+    await client.get_patient(linked_id(appointment, "patient"))
+    await client.get_practitioner(linked_id(appointment, "practitioner"))
+    return time.perf_counter() - started
+
+async def run(mode: str, base_url: str, app, calls: list, args) -> dict:
+    stats = app.state.stats
+    limiter = TokenBucket(rate=args.rpm / 60, capacity=args.burst)
+    cache = RecordCache(CACHE_TTLS, max_entries=args.cache_entries)
+    async with ClinikoClient(base_url=base_url, cache=cache, limiter=limiter) as client:
+        warm = {"duration_ms": 0.0}
+        before = stats["requests"]
+        if mode == "warmed":
+            warmer = CacheWarmer(client, days=args.days, business_ids=[app.state.fake.business_id], ttl=WARM_TTL,
+                                 concurrency=args.concurrency)
+            warm = await warmer.warm()
+        warm_requests = stats["requests"] - before
+        hits = {resource: (cache.resource_hits[resource], cache.resource_misses[resource])
+                for resource in ("appointments", "patients")}
+        before = stats["requests"]
+        latencies = [await handle_call(client, appointment_id) for appointment_id in calls]
+        rates = {}
+        for resource, (base_hits, base_misses) in hits.items():
+            lookups = cache.resource_hits[resource] - base_hits + cache.resource_misses[resource] - base_misses
+            rates[resource] = (cache.resource_hits[resource] - base_hits) / lookups if lookups else 0.0
+    return {
+        "mode": mode,
+        "warm_ms": warm["duration_ms"],
+        "warm_requests": warm_requests,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "call_requests": stats["requests"] - before,
+        "appointment_hits": rates["appointments"],
+        "patient_hits": rates["patients"],
+    }
+
+async def main(args):
+    fake = FakeCliniko(patient_count=args.patients, appointment_count=args.appointments, days=args.horizon,
+                       seed=args.seed)
+    app = create_app(fake=fake, latency=args.latency)
+    booked = upcoming(fake, args.days)
+    rng = random.Random(args.seed)
+    calls = [rng.choice(booked)["id"] for _ in range(args.calls)]
+    print(f"{len(booked)} appointments in the next {args.days} day(s), {args.calls} calls about them")
+    with serve_in_background(app, port=args.port) as base_url:
+        print(f"{'mode':<8}{'warm ms':>9}{'warm reqs':>11}{'call p50 ms':>13}{'call p95 ms':>13}"
+              f"{'call reqs':>11}{'appt hit':>10}{'patient hit':>13}")
+        for mode in ("cold", "warmed"):
+            result = await run(mode, base_url, app, calls, args)
+            print(f"{mode:<8}{result['warm_ms']:>9.0f}{result['warm_requests']:>11}{result['p50_ms']:>13.1f}"
+                  f"{result['p95_ms']:>13.1f}{result['call_requests']:>11}{result['appointment_hits']:>10.0%}"
+                  f"{result['patient_hits']:>13.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--appointments", type=int, default=2000, help="spread over --horizon days")
+    parser.add_argument("--horizon", type=int, default=14, help="days the fake's appointments span")
+    parser.add_argument("--days", type=int, default=1, help="days ahead the warmer preloads")
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake Cliniko response")
+    parser.add_argument("--concurrency", type=int, default=5, help="warmer requests in flight")
+    parser.add_argument("--cache-entries", type=int, default=2048)
+    parser.add_argument("--rpm", type=float, default=6000)
+    parser.add_argument("--burst", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8774)
+    asyncio.run(main(parser.parse_args()))
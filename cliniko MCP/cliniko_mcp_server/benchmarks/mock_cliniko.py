@@ -0,0 +1,333 @@
+"""
+Hermetic local stand-in for the Cliniko API used by the benchmarks.
+Serves seeded records on 127.0.0.1 so runs never touch the real API, with
+optional latency, 429 and 5xx injection, and ETag / Last-Modified validators
+on single-record reads.
+
+Run standalone and point the server at it with CLINIKO_BASE_URL:
+    python -m benchmarks.mock_cliniko --patients 10000 --appointments 5000 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+RESOURCES = ("patients", "appointments", "invoices", "practitioners")
+REFERENCE_RESOURCES = ("appointment_types", "businesses")
+FILTER_OPERATORS = (">=", "<=", ">", "<", "=")
+FAULT_STATUSES = (500, 502, 503)
+LINKED = ("patient", "practitioner", "appointment_type", "business")
+
+FIRST_NAMES = ("Olivia", "Jack", "Amelia", "Harry", "Isla", "Oliver", "Ava", "George", "Emily", "Noah",
+               "Sophie", "Leo", "Grace", "Arthur", "Mia", "Muhammad", "Freya", "Oscar", "Lily", "Theo")
+LAST_NAMES = ("Smith", "Jones", "Williams", "Taylor", "Brown", "Davies", "Evans", "Wilson", "Thomas", "Johnson",
+              "Roberts", "Robinson", "Thompson", "Wright", "Walker", "White", "Edwards", "Hughes", "Green", "Hall")
+
+def timestamp(value: datetime = None) -> str:
+    value = value or datetime.now(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+def link(resource: str, record_id) -> dict:
+    return {"links": {"self": f"https://api.example.cliniko.com/v1/{resource}/{record_id}"}}
+
+def make_patient(patient_id: int, rng: random.Random = None) -> dict:
+    rng = rng or random.Random(patient_id)
+    return {
+        "id": str(patient_id),
+        "first_name": rng.choice(FIRST_NAMES),
+        "last_name": rng.choice(LAST_NAMES),
+        "date_of_birth": f"{rng.randint(1940, 2015)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "email": f"patient{patient_id}@example.com",
+        "patient_phone_numbers": [{"number": f"07700 {rng.randint(0, 999999):06d}", "phone_type": "Mobile"}],
+        "created_at": timestamp(),
+        "updated_at": timestamp(),
+        "archived_at": None,
+        "links": {"self": f"/v1/patients/{patient_id}"},
+    }
+
+def make_record(resource: str, record_id: int) -> dict:
+    if resource == "patients":
+        return make_patient(record_id)
+    return {"id": str(record_id), "updated_at": timestamp(), "links": {"self": f"/v1/{resource}/{record_id}"}}
+
+def parse_filter(expression: str):
+    """"updated_at:>=2025-01-01T00:00:00Z" -> ("updated_at", ">=", "2025-01-01T00:00:00Z")"""
+    field, _, condition = expression.partition(":")
+    for operator in FILTER_OPERATORS:
+        if condition.startswith(operator):
+            return field, operator, condition[len(operator):]
+    return field, "=", condition
+
+def field_value(record: dict, field: str):
+    """Filters on practitioner_id etc. match the linked record, as Cliniko's do"""
+    if field in record:
+        return record[field]
+    if field.endswith("_id") and isinstance(record.get(field[:-3]), dict):
+        return record[field[:-3]]["links"]["self"].rsplit("/", 1)[-1]
+    return None
+
+def matches(record: dict, field: str, operator: str, value: str) -> bool:
+    actual = field_value(record, field)
+    if actual is None:
+        return False
+    actual = str(actual)
+    if actual.isdigit() and value.isdigit():
+        actual, value = int(actual), int(value)
+    return {
+        ">=": actual >= value, "<=": actual <= value, ">": actual > value,
+        "<": actual < value, "=": actual == value,
+    }[operator]
+
+class FakeCliniko:
+    """
+    In-memory Cliniko records that can be mutated while a benchmark runs.
+
+    Appointments are spread over the `days` from today across `practitioner_count`
+    practitioners at one business, in 30 minute slots between 09:00 and 17:00 UTC.
+    `id_base` is added to every generated ID; Cliniko IDs are 19 digits and the
+    MCP tools validate that, so benchmarks that go through main.py set it.
+    """
+
+    def __init__(self, patient_count: int = 100, record_count: int = 0, seed: int = 0,
+                 appointment_count: int = 0, practitioner_count: int = 3, days: int = 14, id_base: int = 0):
+        self.random = random.Random(seed)
+        self.id_base = id_base
+        self.records = {resource: {} for resource in RESOURCES + REFERENCE_RESOURCES}
+        for i in range(1, patient_count + 1):
+            self._put("patients", make_patient(id_base + i, random.Random(seed * 1_000_003 + i)))
+        for i in range(1, record_count + 1):
+            self._put("invoices", make_record("invoices", id_base + i))
+        self.business_id = str(id_base + 1)
+        self._put("businesses", {"id": self.business_id, "business_name": "Fake Clinic", "updated_at": timestamp()})
+        self._put("appointment_types", {"id": str(id_base + 1), "name": "Consultation", "duration_in_minutes": 30,
+                                        "updated_at": timestamp()})
+        for i in range(1, max(practitioner_count, record_count) + 1):
+            self._put("practitioners", {
+                "id": str(id_base + i), "first_name": self.random.choice(FIRST_NAMES),
+                "last_name": self.random.choice(LAST_NAMES), "active": True, "updated_at": timestamp(),
+            })
+        self.practitioner_ids = sorted(self.records["practitioners"], key=int)[:max(practitioner_count, 1)]
+        patient_ids = sorted(self.records["patients"], key=int)
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        for i in range(1, max(appointment_count, record_count) + 1):
+            starts_at = today + timedelta(days=self.random.randrange(days),
+                                          minutes=9 * 60 + 30 * self.random.randrange(16))
+            self._put("appointments", self.make_appointment(
+                id_base + i,
+                patient_id=self.random.choice(patient_ids) if patient_ids else None,
+                practitioner_id=self.random.choice(self.practitioner_ids),
+                starts_at=starts_at, ends_at=starts_at + timedelta(minutes=30),
+            ))
+
+    def _put(self, resource: str, record: dict):
+        record.setdefault("links", {"self": f"/v1/{resource}/{record['id']}"})
+        self.records[resource][record["id"]] = record
+
+    def make_appointment(self, appointment_id: int, patient_id, practitioner_id, starts_at: datetime,
+                         ends_at: datetime) -> dict:
+        patient = self.records["patients"].get(str(patient_id), {})
+        return {
+            "id": str(appointment_id),
+            "starts_at": timestamp(starts_at).replace(".000Z", "Z"),
+            "ends_at": timestamp(ends_at).replace(".000Z", "Z"),
+            "patient_name": f"{patient.get('first_name', '')} {patient.get('last_name', '')}".strip(),
+            "notes": None,
+            "cancelled_at": None,
+            "updated_at": timestamp(),
+            "patient": link("patients", patient_id),
+            "practitioner": link("practitioners", practitioner_id),
+            "appointment_type": link("appointment_types", self.id_base + 1),
+            "business": link("businesses", self.business_id),
+        }
+
+    def next_id(self, resource: str) -> str:
+        return str(max((int(i) for i in self.records[resource]), default=self.id_base) + 1)
+
+    def create(self, resource: str, payload: dict) -> dict:
+        record = {key: value for key, value in payload.items() if not key.endswith("_id")}
+        record["id"] = self.next_id(resource)
+        # Cliniko answers with linked records rather than the *_id fields it was sent
+        for name in LINKED:
+            if f"{name}_id" in payload:
+                record[name] = link(f"{name}s", payload[f"{name}_id"])
+        if resource == "appointments":
+            record.setdefault("starts_at", payload.get("appointment_start"))
+            record.setdefault("ends_at", payload.get("appointment_end"))
+        record["created_at"] = record["updated_at"] = timestamp()
+        self._put(resource, record)
+        return record
+
+    def update(self, resource: str, record_id: str, payload: dict) -> dict:
+        record = self.records[resource][record_id]
+        record.update(payload)
+        record["updated_at"] = timestamp()
+        return record
+
+    def mutate(self, resource: str, count: int) -> list:
+        """Touch `count` random records (and add one new record); returns the changed IDs"""
+        records = self.records[resource]
+        changed = self.random.sample(sorted(records), min(count, len(records)))
+        for record_id in changed:
+            records[record_id]["updated_at"] = timestamp()
+            records[record_id]["revision"] = records[record_id].get("revision", 0) + 1
+        new_id = self.next_id(resource)
+        records[new_id] = make_record(resource, int(new_id))
+        return changed + [new_id]
+
+    def delete(self, resource: str, count: int) -> list:
+        """Hard-delete `count` random records, as Cliniko does with deleted and archived ones; returns their IDs"""
+        records = self.records[resource]
+        deleted = self.random.sample(sorted(records), min(count, len(records)))
+        for record_id in deleted:
+            del records[record_id]
+        return deleted
+
+def create_app(patient_count: int = 100, rate_limit: float = None, fake: FakeCliniko = None,
+               latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0,
+               etags: bool = False) -> Starlette:
+    """
+    rate_limit: requests/second allowed before answering 429 with Retry-After
+    latency, jitter: seconds added to every response (latency + uniform(0, jitter))
+    error_rate: fraction of requests answered with a random 500/502/503
+    etags: send ETag/Last-Modified on GET /{resource}/{id} and answer matching
+        If-None-Match / If-Modified-Since with 304
+
+    All three can be changed while the server runs through app.state.faults.
+    """
+    fake = fake or FakeCliniko(patient_count)
+    faults = {"latency": latency, "jitter": jitter, "error_rate": error_rate}
+    rng = random.Random(seed)
+    window = {"second": 0, "count": 0}
+    stats = {"requests": 0, "throttled": 0, "errors": 0, "not_modified": 0, "body_bytes": 0, "calls": Counter()}
+
+    async def admit(request):
+        """Apply latency and fault injection; returns a refusal response or None"""
+        stats["requests"] += 1
+        resource = request.path_params.get("resource", "")
+        stats["calls"][f"{request.method} /{resource}{'/{id}' if 'record_id' in request.path_params else ''}"] += 1
+        if faults["latency"] or faults["jitter"]:
+            await asyncio.sleep(faults["latency"] + rng.uniform(0, faults["jitter"]))
+        if rate_limit is not None:
+            second = int(time.monotonic())
+            if second != window["second"]:
+                window["second"], window["count"] = second, 0
+            window["count"] += 1
+            if window["count"] > rate_limit:
+                stats["throttled"] += 1
+                return JSONResponse({"message": "Too Many Requests"}, status_code=429, headers={"Retry-After": "1"})
+        if faults["error_rate"] and rng.random() < faults["error_rate"]:
+            stats["errors"] += 1
+            return JSONResponse({"message": "Injected fault"}, status_code=rng.choice(FAULT_STATUSES))
+        if resource not in fake.records:
+            return JSONResponse({"message": "Not found"}, status_code=404)
+        return None
+
+    async def collection(request):
+        # Read before the injected latency: like Cliniko, a create whose caller
+        # has stopped waiting still goes through
+        payload = await request.json() if request.method == "POST" else None
+        if (refused := await admit(request)) is not None:
+            return refused
+        resource = request.path_params["resource"]
+        if request.method == "POST":
+            return JSONResponse(fake.create(resource, payload), status_code=201)
+        records = list(fake.records[resource].values())
+        for expression in request.query_params.getlist("q[]"):
+            field, operator, value = parse_filter(expression)
+            records = [record for record in records if matches(record, field, operator, value)]
+        # Same shape as Cliniko: page/per_page params and a links.next URL
+        page = int(request.query_params.get("page", 1))
+        per_page = min(int(request.query_params.get("per_page", 30)), 100)
+        start = (page - 1) * per_page
+        links = {"self": str(request.url)}
+        if start + per_page < len(records):
+            links["next"] = str(request.url.include_query_params(page=page + 1, per_page=per_page))
+        return JSONResponse({
+            resource: records[start:start + per_page],
+            "total_entries": len(records),
+            "links": links,
+        })
+
+    async def member(request):
+        if (refused := await admit(request)) is not None:
+            return refused
+        resource, record_id = request.path_params["resource"], request.path_params["record_id"]
+        if record_id not in fake.records[resource]:
+            return JSONResponse({"message": "Not found"}, status_code=404)
+        if request.method in ("PUT", "PATCH"):
+            return JSONResponse(fake.update(resource, record_id, await request.json()))
+        if request.method == "DELETE":
+            del fake.records[resource][record_id]
+            return Response(status_code=204)
+        record = fake.records[resource][record_id]
+        if not etags:
+            return JSONResponse(record)
+        body = json.dumps(record).encode()
+        headers = {"ETag": f'"{hashlib.md5(body).hexdigest()}"'}
+        if record.get("updated_at"):
+            updated = datetime.fromisoformat(record["updated_at"].replace("Z", "+00:00"))
+            headers["Last-Modified"] = format_datetime(updated.replace(microsecond=0), usegmt=True)
+        if_none_match = request.headers.get("If-None-Match")
+        if (if_none_match == headers["ETag"]
+                or if_none_match is None and request.headers.get("If-Modified-Since", "~") == headers.get("Last-Modified")):
+            stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        stats["body_bytes"] += len(body)
+        return Response(body, media_type="application/json", headers=headers)
+
+    app = Starlette(routes=[
+        Route("/v1/{resource}", collection, methods=["GET", "POST"]),
+        Route("/v1/{resource}/{record_id}", member, methods=["GET", "PUT", "PATCH", "DELETE"]),
+    ])
+    app.state.stats = stats
+    app.state.fake = fake
+    app.state.faults = faults
+    return app
+
+@contextmanager
+def serve_in_background(app, host: str = "127.0.0.1", port: int = 8765):
+    """Run `app` with uvicorn in a daemon thread and yield its /v1 base URL"""
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://{host}:{port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--appointments", type=int, default=500)
+    parser.add_argument("--practitioners", type=int, default=3)
+    parser.add_argument("--id-base", type=int, default=1_752_849_000_000_000_000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--etags", action="store_true", help="send validators and answer conditional GETs with 304")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    fake = FakeCliniko(args.patients, seed=args.seed, appointment_count=args.appointments,
+                       practitioner_count=args.practitioners, id_base=args.id_base)
+    app = create_app(fake=fake, rate_limit=args.rate_limit, latency=args.latency, jitter=args.jitter,
+                     error_rate=args.error_rate, seed=args.seed, etags=args.etags)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,162 @@
+"""
+Cliniko MCP Server - Read Cache
+Bounded in-process LRU cache with per-resource TTLs for Cliniko records.
+"""
+
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Set on records served from an expired cache entry while Cliniko is unreachable
+STALE_MARKER = "_stale"
+
+class TTLCache:
+    """
+    LRU mapping with a per-entry time-to-live.
+
+    Writers bump a sequence number on invalidation, so a read that started
+    before an update cannot put the stale record back afterwards: take
+    read_token() before fetching and pass it to set().
+
+    Expired entries are kept (still LRU-bounded) so get_stale() can serve them
+    while the upstream is down; invalidated entries are dropped immediately.
+    """
+
+    def __init__(self, max_entries: int = 2048, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._seq = 0
+        self._cleared_at = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value, _ = entry
+        if expires_at <= self.clock():
+            if expires_at != float("-inf"):
+                # Keep the value for get_stale(); -inf marks it as already counted
+                self._entries[key] = (float("-inf"), value, entry[2])
+                self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Any:
+        """The fresh value for `key` without touching LRU order or hit/miss counts"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            return None
+        return entry[1]
+
+    def get_stale(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """(value, age_seconds) for a cached entry even if it has expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[1], self.clock() - entry[2]
+
+    def read_token(self) -> int:
+        return self._seq
+
+    def set(self, key: Hashable, value: Any, ttl: float, token: int = None):
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        if token is not None and (token < self._cleared_at or self._invalidated.get(key, -1) > token):
+            return
+        now = self.clock()
+        self._entries[key] = (now + ttl, value, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._seq += 1
+        self._invalidated[key] = self._seq
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > self.max_entries:
+            self._invalidated.popitem(last=False)
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._seq += 1
+        self._cleared_at = self._seq
+        self._entries.clear()
+        self._invalidated.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+class RecordCache(TTLCache):
+    """TTLCache keyed by (resource, record_id) with a TTL per Cliniko resource"""
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 2048, clock=time.monotonic):
+        super().__init__(max_entries, clock)
+        self.ttls = dict(ttls)
+        self.resource_hits: Counter = Counter()
+        self.resource_misses: Counter = Counter()
+
+    @staticmethod
+    def key(resource: str, record_id) -> tuple:
+        return (resource, str(record_id))
+
+    def get_record(self, resource: str, record_id):
+        if self.ttls.get(resource, 0) <= 0:
+            return None
+        record = self.get(self.key(resource, record_id))
+        if record is None:
+            self.resource_misses[resource] += 1
+        else:
+            self.resource_hits[resource] += 1
+        return record
+
+    def has_record(self, resource: str, record_id) -> bool:
+        return self.ttls.get(resource, 0) > 0 and self.peek(self.key(resource, record_id)) is not None
+
+    def put_record(self, resource: str, record_id, record: dict, token: int = None, ttl: float = None):
+        """Cache with the resource's TTL, or `ttl` when given (the warmer keeps records longer)"""
+        resource_ttl = self.ttls.get(resource, 0)
+        if resource_ttl > 0:
+            self.set(self.key(resource, record_id), record, resource_ttl if ttl is None else ttl, token)
+
+    def get_stale_record(self, resource: str, record_id) -> Optional[Tuple[dict, float]]:
+        return self.get_stale(self.key(resource, record_id))
+
+    def invalidate_record(self, resource: str, record_id):
+        self.invalidate(self.key(resource, record_id))
+
+    def resource_stats(self, resource: str) -> Dict[str, Any]:
+        hits, misses = self.resource_hits[resource], self.resource_misses[resource]
+        return {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "resources": {resource: self.resource_stats(resource)
+                          for resource in sorted(set(self.resource_hits) | set(self.resource_misses))},
+        }
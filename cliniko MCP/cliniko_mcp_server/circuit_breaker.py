@@ -0,0 +1,152 @@
+"""
+Cliniko MCP Server - Circuit Breaker
+Fails fast while a Cliniko endpoint family is erroring or slow, instead of
+making every tool call wait out timeouts and retries.
+"""
+
+import time
+from collections import deque
+from typing import Dict
+
+from config.settings import env
+
+BREAKER_FAILURE_RATE = float(env("CLINIKO_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_RATE = float(env("CLINIKO_BREAKER_SLOW_CALL_RATE", "0.8"))
+BREAKER_SLOW_CALL_SECONDS = float(env("CLINIKO_BREAKER_SLOW_CALL_SECONDS", "5"))
+BREAKER_MIN_CALLS = int(env("CLINIKO_BREAKER_MIN_CALLS", "10"))
+BREAKER_WINDOW_SECONDS = float(env("CLINIKO_BREAKER_WINDOW_SECONDS", "30"))
+BREAKER_OPEN_SECONDS = float(env("CLINIKO_BREAKER_OPEN_SECONDS", "15"))
+BREAKER_HALF_OPEN_CALLS = int(env("CLINIKO_BREAKER_HALF_OPEN_CALLS", "3"))
+# Serve expired cache entries (marked stale) from get_* while a breaker is open
+SERVE_STALE_ON_OPEN = env("CLINIKO_SERVE_STALE_ON_OPEN", "true").lower() in ("1", "true", "yes")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Cliniko while the endpoint family's breaker is open"""
+
+    def __init__(self, family: str, retry_after: float):
+        super().__init__(f"Cliniko {family or 'API'} is unavailable (circuit open); retry in {retry_after:.0f}s")
+        self.family = family
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Closed -> open when, over the last `window` seconds and at least `min_calls`
+    calls, the share of failures (5xx, transport errors) reaches `failure_rate`
+    or the share of calls slower than `slow_call_seconds` reaches `slow_call_rate`.
+
+    After `open_seconds` the breaker goes half-open and lets `half_open_calls`
+    probes through at a time; that many consecutive good probes close it, any
+    bad one reopens it.
+    """
+
+    def __init__(self, family: str = "", failure_rate: float = BREAKER_FAILURE_RATE,
+                 slow_call_rate: float = BREAKER_SLOW_CALL_RATE, slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+                 min_calls: int = BREAKER_MIN_CALLS, window: float = BREAKER_WINDOW_SECONDS,
+                 open_seconds: float = BREAKER_OPEN_SECONDS, half_open_calls: int = BREAKER_HALF_OPEN_CALLS,
+                 clock=time.monotonic):
+        self.family = family
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self.clock = clock
+        self.state = CLOSED
+        self._calls = deque()  # (timestamp, failed, slow)
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # Metrics
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self) -> bool:
+        """Admit a call or raise CircuitOpenError; returns True if the call is a half-open probe"""
+        if self.state == OPEN:
+            remaining = self._opened_at + self.open_seconds - self.clock()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.family, remaining)
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.family, 1.0)
+            self._probes_in_flight += 1
+            return True
+        return False
+
+    def record(self, failed: bool, duration: float, probe: bool = False):
+        slow = duration >= self.slow_call_seconds
+        now = self.clock()
+        if probe:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if self.state != HALF_OPEN:
+                return
+            if failed or slow:
+                self._open(now)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self.state = CLOSED
+            return
+        if self.state != CLOSED:
+            return  # started before the breaker opened
+        self._calls.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        while self._calls and self._calls[0][0] < now - self.window:
+            _, old_failed, old_slow = self._calls.popleft()
+            self._failures -= old_failed
+            self._slow -= old_slow
+        calls = len(self._calls)
+        if calls >= self.min_calls and (self._failures / calls >= self.failure_rate
+                                        or self._slow / calls >= self.slow_call_rate):
+            self._open(now)
+
+    def release(self, probe: bool = False):
+        """The admitted call never completed (e.g. cancelled); don't count it either way"""
+        if probe:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self._opened_at = now
+        self.opened += 1
+        self._calls.clear()
+        self._failures = self._slow = 0
+
+    def stats(self) -> dict:
+        calls = len(self._calls)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(self._slow / calls, 3) if calls else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+class CircuitBreakers:
+    """One CircuitBreaker per endpoint family (patients, appointments, ...), created on first use"""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, family: str) -> CircuitBreaker:
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            breaker = self._breakers[family] = CircuitBreaker(family, **self.settings)
+        return breaker
+
+    def stats(self) -> Dict[str, dict]:
+        return {family: breaker.stats() for family, breaker in self._breakers.items()}
@@ -1,151 +1,647 @@
-import os
 import httpx
 import base64
-from dotenv import load_dotenv
+import asyncio
+import time
+import logging
+from contextlib import aclosing
+from functools import cache
+from typing import Dict, Optional
+from cache import STALE_MARKER, RecordCache
+from revalidation import ValidatorStore
+from serialization import loads
+from circuit_breaker import SERVE_STALE_ON_OPEN, CircuitBreakers, CircuitOpenError
+import deadline
+from deadline import DeadlineExceeded
+from availability import BookingConflict, ScheduleCache
+from singleflight import SingleFlight
+from idempotency import IdempotencyStore
+from tracing import tracer
+from tenants import DEFAULT_TENANT, UnknownTenantError, current_tenant, load_tenants, shard_base_url, tenant_tokens
+from metrics import UPSTREAM_IN_FLIGHT, UPSTREAM_LATENCY, UPSTREAM_REQUESTS, UPSTREAM_RETRIES, resource_label
+from rate_limiter import IDEMPOTENT_METHODS, RetryPolicy, TokenBucket, parse_retry_after
+from config.constants import CACHE_TTLS, HTTP_TIMEOUTS, SCHEDULE_CACHE_TTL
+from config.settings import env
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-CLINIKO_API_KEY = os.getenv("CLINIKO_API_KEY")
-# Try different Cliniko API endpoints based on your region
-BASE_URL = "https://api.uk2.cliniko.com/v1"  # Changed from au4 to uk2
+# Credentials and the API shard are read when the first client is created (not
+# at import), via CLINIKO_API_KEY and CLINIKO_BASE_URL. Without a base URL the
+# shard comes from the API key's suffix, falling back to this one.
+DEFAULT_BASE_URL = "https://api.uk2.cliniko.com/v1"  # Changed from au4 to uk2
 
-def get_auth_header():
+# Pagination. Cliniko caps per_page at 100 and links each page to the next one.
+MAX_PER_PAGE = 100
+
+@cache
+def client_settings() -> dict:
+    """
+    Process-wide client settings, read from the environment when the first
+    client is created rather than at import. A tenant's own settings (see
+    tenants.load_tenants) override the keys they name.
+    """
+    return {
+        # Connection pool tuning. One pool is shared by every call made through a
+        # ClinikoClient, so keep-alive connections (and their TLS sessions) are reused.
+        "max_connections": int(env("CLINIKO_MAX_CONNECTIONS", "20")),
+        "max_keepalive_connections": int(env("CLINIKO_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        "keepalive_expiry": float(env("CLINIKO_KEEPALIVE_EXPIRY", "30")),
+        # HTTP/2 multiplexes concurrent requests over one connection; needs the `h2` package
+        "http2": env("CLINIKO_HTTP2", "false").lower() in ("1", "true", "yes"),
+        "per_page": min(int(env("CLINIKO_PER_PAGE", str(MAX_PER_PAGE))), MAX_PER_PAGE),
+        # Read cache for get_* lookups (per-resource TTLs live in config/constants.py)
+        "cache_max_entries": int(env("CLINIKO_CACHE_MAX_ENTRIES", "2048")),
+        # Client-side rate limiting (Cliniko allows 200 requests/minute per API key)
+        "rate_limit_per_minute": float(env("CLINIKO_RATE_LIMIT_PER_MINUTE", "200")),
+        "rate_limit_burst": float(env("CLINIKO_RATE_LIMIT_BURST", "20")),
+        "max_retries": int(env("CLINIKO_MAX_RETRIES", "3")),
+    }
+
+def get_auth_header(api_key: str = None):
     # Cliniko expects "Authorization: Basic <base64(key:)>"
-    base = f"{CLINIKO_API_KEY}:".encode()
+    if api_key is None:
+        api_key = env("CLINIKO_API_KEY")
+    base = f"{api_key}:".encode()
     b64 = base64.b64encode(base).decode()
     return {"Authorization": f"Basic {b64}"}
 
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def default_limits(settings: dict = None) -> httpx.Limits:
+    settings = settings or client_settings()
+    return httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive_connections"],
+        keepalive_expiry=settings["keepalive_expiry"],
+    )
+
+def http_timeouts(config: dict = HTTP_TIMEOUTS) -> dict:
+    """{resource: httpx.Timeout} from HTTP_TIMEOUTS, each filled in from "default" """
+    default = config["default"]
+    return {resource: httpx.Timeout(**{**default, **values}) for resource, values in config.items()}
+
+def capped_timeout(timeout: httpx.Timeout, budget: float = None) -> httpx.Timeout:
+    """`timeout` with every phase limited to the remaining deadline budget"""
+    if budget is None:
+        return timeout
+    budget = max(budget, 0.001)
+    return httpx.Timeout(
+        connect=min(timeout.connect, budget), read=min(timeout.read, budget),
+        write=min(timeout.write, budget), pool=min(timeout.pool, budget),
+    )
+
+def query_params(q) -> dict:
+    """A plain search string goes in `q`; a list of Cliniko filters such as
+    "updated_at:>2025-01-01T00:00:00Z" goes in repeated `q[]` params"""
+    if not q:
+        return {}
+    if isinstance(q, (list, tuple)):
+        return {"q[]": list(q)}
+    return {"q": q}
+
+def linked_id(record: dict, name: str):
+    """ID of a linked entity, from `<name>_id` or the `<name>.links.self` URL"""
+    if not isinstance(record, dict):
+        return None
+    if record.get(f"{name}_id"):
+        return str(record[f"{name}_id"])
+    link = ((record.get(name) or {}).get("links") or {}).get("self")
+    return link.rstrip("/").rsplit("/", 1)[-1] if link else None
+
+def connection_tracer(span, started: float):
+    """
+    httpx trace hook for a sampled attempt: records how long the request
+    waited for a pooled connection (including connect/TLS if a new one was
+    opened) before its headers went out
+    """
+    async def trace(event: str, info: dict):
+        if event.startswith("connection.connect_tcp.started"):
+            span.set_attribute("new_connection", True)
+        elif event.endswith("send_request_headers.started"):
+            span.set_attribute("connection_wait_ms", round((time.perf_counter() - started) * 1000, 3))
+    return trace
+
+def encode_cursor(page: int, offset: int, per_page: int) -> str:
+    return f"{page}:{offset}:{per_page}"
+
+def decode_cursor(cursor: str):
+    """Parse a cursor from list_page() into (page, offset, per_page)"""
+    try:
+        page, offset, per_page = (int(part) for part in cursor.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+    if page < 1 or offset < 0 or not 1 <= per_page <= MAX_PER_PAGE:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return page, offset, per_page
+
 class ClinikoClient:
-    def __init__(self):
-        self.headers = get_auth_header()
-        self.headers |= {
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
+    def __init__(self, base_url: str = None, limits: httpx.Limits = None,
+                 http2: bool = None, transport: httpx.AsyncBaseTransport = None,
+                 cache: RecordCache = None, limiter: TokenBucket = None, coalesce: bool = True,
+                 breakers: CircuitBreakers = None, validators: ValidatorStore = None, api_key: str = None,
+                 tenant: str = DEFAULT_TENANT, idempotency: IdempotencyStore = None):
+        settings = client_settings()
+        self.base_url = base_url or env("CLINIKO_BASE_URL") or shard_base_url(
+            api_key or env("CLINIKO_API_KEY"), DEFAULT_BASE_URL
+        )
+        self.api_key = api_key
+        self.tenant = tenant
+        self.limits = limits or default_limits(settings)
+        self.per_page = settings["per_page"]
+        http2 = settings["http2"] if http2 is None else http2
+        if http2 and not http2_available():
+            logger.warning("CLINIKO_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self._transport = transport
+        self._http = None
+        self.cache = cache if cache is not None else RecordCache(CACHE_TTLS, settings["cache_max_entries"])
+        self.schedules = ScheduleCache(SCHEDULE_CACHE_TTL)
+        self.limiter = limiter or TokenBucket.shared(
+            tenant, rate=settings["rate_limit_per_minute"] / 60, capacity=settings["rate_limit_burst"]
+        )
+        # Reads may be replayed freely; writes only when Cliniko never acted on them
+        self.read_retry = RetryPolicy(max_retries=settings["max_retries"])
+        self.write_retry = RetryPolicy(max_retries=settings["max_retries"], idempotent=False)
+        self.retries = 0
+        # Identical concurrent GETs share one upstream request; writes never do
+        self.inflight = SingleFlight() if coalesce else None
+        # Fail fast per endpoint family while Cliniko is erroring or slow
+        self.breakers = breakers if breakers is not None else CircuitBreakers()
+        self.timeouts = http_timeouts()
+        # ETag/Last-Modified per record, so cache misses can be conditional GETs
+        self.validators = validators if validators is not None else ValidatorStore()
+        # A retried create within the window gets the first one's record instead of a second POST
+        self.idempotency = idempotency if idempotency is not None else IdempotencyStore()
+
+    # Lifecycle. The FastMCP lifespan calls start()/aclose(); the first request
+    # also starts the pool lazily so the client works outside the server too.
+    async def start(self):
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=get_auth_header(self.api_key) | {
+                    "Accept": "application/json",
+                    "Content-Type": "application/json"
+                },
+                limits=self.limits,
+                http2=self.http2,
+                transport=self._transport,
+            )
+        return self
+
+    async def aclose(self):
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _request(self, method: str, path: str, background: bool = False, **kwargs) -> httpx.Response:
+        """background=True marks sync/warm-up traffic that yields to tool calls"""
+        if self._http is None or self._http.is_closed:
+            await self.start()
+        if method == "GET" and self.inflight is not None:
+            key = (path, str(httpx.QueryParams(kwargs.get("params") or {})), str(kwargs.get("headers") or ""))
+            shared = self.inflight.do(key, lambda: self._send(method, path, background, **kwargs))
+            budget = deadline.remaining()
+            if budget is None:
+                return await shared
+            # The shared request runs under the first caller's deadline; stop waiting at ours
+            try:
+                return await asyncio.wait_for(shared, max(budget, 0))
+            except TimeoutError:
+                raise DeadlineExceeded() from None
+        return await self._send(method, path, background, **kwargs)
+
+    async def _send(self, method: str, path: str, background: bool = False, **kwargs) -> httpx.Response:
+        policy = self.read_retry if method in IDEMPOTENT_METHODS else self.write_retry
+        resource = resource_label(path)
+        breaker = self.breakers.get(resource)
+        attempt = 0
+        with tracer.span("cliniko.request", method=method, resource=resource, background=background):
+            while True:
+                with tracer.span("cliniko.attempt", attempt=attempt) as span:
+                    deadline.check()
+                    probe = breaker.before_call()
+                    try:
+                        waited = await self._acquire(background)
+                    except BaseException:
+                        breaker.release(probe)
+                        raise
+                    span.set_attribute("rate_limit_wait_ms", round(waited * 1000, 3))
+                    if span.sampled:
+                        kwargs["extensions"] = {"trace": connection_tracer(span, time.perf_counter())}
+                    UPSTREAM_IN_FLIGHT.inc()
+                    started = time.perf_counter()
+                    failed = None
+                    timeout = capped_timeout(self.timeouts.get(resource, self.timeouts["default"]), deadline.remaining())
+                    try:
+                        resp = await self._http.request(method, path, timeout=timeout, **kwargs)
+                    except httpx.TransportError as e:
+                        budget = deadline.remaining()
+                        out_of_time = isinstance(e, httpx.TimeoutException) and budget is not None and budget <= 0.001
+                        # A timeout cut short by our own deadline says nothing about Cliniko's health
+                        failed = None if out_of_time else True
+                        UPSTREAM_REQUESTS.inc(method, resource, type(e).__name__)
+                        span.set_attribute("error", type(e).__name__)
+                        if out_of_time:
+                            raise DeadlineExceeded(f"Tool call deadline exceeded during {method} {resource}") from e
+                        if not policy.should_retry(attempt, error=e):
+                            raise
+                        delay = policy.delay(attempt)
+                    else:
+                        failed = resp.status_code >= 500
+                        UPSTREAM_REQUESTS.inc(method, resource, str(resp.status_code))
+                        span.set_attribute("status_code", resp.status_code)
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        if resp.status_code == 429:
+                            self.limiter.on_throttle(retry_after)
+                        elif resp.status_code < 500:
+                            self.limiter.on_success()
+                        if resp.status_code == 304:
+                            return resp  # conditional GET: the caller's stored copy is current
+                        if not resp.is_error or not policy.should_retry(attempt, status=resp.status_code):
+                            resp.raise_for_status()
+                            return resp
+                        delay = policy.delay(attempt, retry_after)
+                    finally:
+                        elapsed = time.perf_counter() - started
+                        UPSTREAM_IN_FLIGHT.dec()
+                        UPSTREAM_LATENCY.observe(elapsed, method, resource)
+                        if failed is None:
+                            breaker.release(probe)
+                        else:
+                            breaker.record(failed, elapsed, probe)
+                    span.set_attribute("retry_in_ms", round(delay * 1000, 1))
+                budget = deadline.remaining()
+                if budget is not None and budget <= delay:
+                    raise DeadlineExceeded(f"Tool call deadline exceeded before retrying {method} {resource}")
+                attempt += 1
+                self.retries += 1
+                UPSTREAM_RETRIES.inc(method, resource)
+                logger.info("Retrying %s %s in %.2fs (attempt %d)", method, path, delay, attempt)
+                await asyncio.sleep(delay)
+
+    async def _acquire(self, background: bool) -> float:
+        """Take a rate-limit token, giving up when the deadline runs out"""
+        budget = deadline.remaining()
+        if budget is None:
+            return await self.limiter.acquire(background)
+        try:
+            return await asyncio.wait_for(self.limiter.acquire(background), max(budget, 0))
+        except TimeoutError:
+            raise DeadlineExceeded("Tool call deadline exceeded waiting for a rate-limit token") from None
+
+    # Read-through cache. Successful writes invalidate the record they touched;
+    # while the endpoint's circuit is open (or the deadline has run out), an
+    # expired copy is served marked stale. A miss on a record Cliniko sent
+    # validators for is a conditional GET, and a 304 reuses the stored copy.
+    async def _get_record(self, resource: str, record_id):
+        record = self.cache.get_record(resource, record_id)
+        if record is not None:
+            return record
+        return await self._fetch_record(resource, record_id)
+
+    async def _fetch_record(self, resource: str, record_id, background: bool = False, ttl: float = None):
+        token = self.cache.read_token()
+        validated = self.validators.get(resource, record_id)
+        try:
+            resp = await self._request("GET", f"/{resource}/{record_id}", background,
+                                       headers=validated.headers() if validated else None)
+        except (CircuitOpenError, DeadlineExceeded):
+            stale = self.cache.get_stale_record(resource, record_id) if SERVE_STALE_ON_OPEN else None
+            if stale is None:
+                raise
+            record, age = stale
+            return {**record, STALE_MARKER: True, "_stale_age_seconds": round(age, 1)}
+        if validated is not None:
+            self.validators.revalidated(validated, resp.status_code == 304)
+        if resp.status_code == 304:
+            record = validated.record
+        else:
+            record = loads(resp.content)
+            self.validators.put(resource, record_id, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                                record, len(resp.content))
+        self.cache.put_record(resource, record_id, record, token, ttl)
+        return record
+
+    async def prefetch_record(self, resource: str, record_id, ttl: float = None) -> bool:
+        """
+        Load a record into the read cache on spare rate-limit tokens, kept for
+        `ttl` seconds instead of the resource's TTL. False if it was cached already.
+        """
+        if self.cache.has_record(resource, record_id):
+            return False
+        await self._fetch_record(resource, record_id, background=True, ttl=ttl)
+        return True
+
+    def _invalidate(self, resource: str, record_id):
+        self.cache.invalidate_record(resource, record_id)
+        self.validators.invalidate(resource, record_id)
+
+    async def _write_record(self, method: str, resource: str, record_id, payload: dict):
+        resp = await self._request(method, f"/{resource}/{record_id}", json=payload)
+        self._invalidate(resource, record_id)
+        return loads(resp.content)
+
+    async def _create_record(self, resource: str, payload: dict, idempotency_key: str = None):
+        return await self.idempotency.run(resource, payload, lambda: self._post_record(resource, payload),
+                                          idempotency_key)
+
+    async def _post_record(self, resource: str, payload: dict):
+        resp = await self._request("POST", f"/{resource}", json=payload)
+        record = loads(resp.content)
+        if isinstance(record, dict) and "id" in record:
+            self._invalidate(resource, record["id"])
+        return record
 
-    async def list_patients(self, q=""):
-        params = {"q": q} if q else {}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{BASE_URL}/patients", headers=self.headers, params=params)
-            resp.raise_for_status()
-            return resp.json().get("patients", [])
+    async def _delete_record(self, resource: str, record_id):
+        await self._request("DELETE", f"/{resource}/{record_id}")
+        self._invalidate(resource, record_id)
+        # A retried create must not hand back a record that no longer exists
+        self.idempotency.invalidate(resource, record_id)
+        return {"deleted": True}
+
+    # Pagination. Pages are fetched lazily by following Cliniko's links.next;
+    # with prefetch=True the next page is requested while the caller is still
+    # consuming the current one.
+    async def iter_pages(self, resource: str, q="", per_page: int = None,
+                         page: int = 1, prefetch: bool = False, background: bool = False):
+        """Yield (page_number, records, has_next) for each page of a list endpoint"""
+        params = {"page": page, "per_page": min(per_page or self.per_page, MAX_PER_PAGE), **query_params(q)}
+        pending = asyncio.ensure_future(self._request("GET", f"/{resource}", background, params=params))
+        try:
+            while pending is not None:
+                resp = await pending
+                pending = None
+                body = loads(resp.content)
+                next_url = (body.get("links") or {}).get("next")
+                if next_url and prefetch:
+                    pending = asyncio.ensure_future(self._request("GET", next_url, background))
+                yield page, body.get(resource, []), bool(next_url)
+                if next_url and pending is None:
+                    pending = asyncio.ensure_future(self._request("GET", next_url, background))
+                page += 1
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+    async def iter_records(self, resource: str, q="", per_page: int = None,
+                           max_records: int = None, prefetch: bool = False):
+        """Yield individual records across pages, stopping after max_records"""
+        if max_records is not None and max_records <= 0:
+            return
+        count = 0
+        async with aclosing(self.iter_pages(resource, q, per_page, prefetch=prefetch)) as pages:
+            async for _, records, _ in pages:
+                for record in records:
+                    yield record
+                    count += 1
+                    if max_records is not None and count >= max_records:
+                        return
+
+    async def list_page(self, resource: str, q="", limit: int = None, cursor: str = ""):
+        """
+        Return (records, next_cursor, partial) with at most `limit` records,
+        resuming from `cursor`. next_cursor is None once the listing is exhausted.
+        partial is True when the tool call's deadline ran out after some pages
+        arrived; next_cursor then resumes from the first page not fetched.
+        """
+        limit = limit or self.per_page
+        if cursor:
+            page, offset, per_page = decode_cursor(cursor)
+        else:
+            page, offset, per_page = 1, 0, min(max(limit, 1), MAX_PER_PAGE)
+        records = []
+        next_cursor = None
+        prefetch = limit > per_page - offset
+        try:
+            async with aclosing(self.iter_pages(resource, q, per_page, page, prefetch)) as pages:
+                async for page_number, items, has_next in pages:
+                    remaining = limit - len(records)
+                    items = items[offset:]
+                    if len(items) > remaining:
+                        records.extend(items[:remaining])
+                        next_cursor = encode_cursor(page_number, offset + remaining, per_page)
+                        break
+                    records.extend(items)
+                    offset = 0
+                    page = page_number + 1
+                    if len(records) >= limit:
+                        if has_next:
+                            next_cursor = encode_cursor(page, 0, per_page)
+                        break
+        except DeadlineExceeded:
+            if not records:
+                raise
+            # Out of time part way through: return what we have and where to resume
+            return records, encode_cursor(page, offset, per_page), True
+        return records, next_cursor, False
+
+    async def _collect(self, resource: str, q="", max_records: int = None):
+        return [record async for record in self.iter_records(resource, q, max_records=max_records, prefetch=True)]
+
+    def iter_patients(self, q="", per_page: int = None, max_records: int = None, prefetch: bool = False):
+        return self.iter_records("patients", q, per_page, max_records, prefetch)
+
+    def iter_appointments(self, q="", per_page: int = None, max_records: int = None, prefetch: bool = False):
+        return self.iter_records("appointments", q, per_page, max_records, prefetch)
+
+    def iter_invoices(self, q="", per_page: int = None, max_records: int = None, prefetch: bool = False):
+        return self.iter_records("invoices", q, per_page, max_records, prefetch)
+
+    def iter_practitioners(self, q="", per_page: int = None, max_records: int = None, prefetch: bool = False):
+        return self.iter_records("practitioners", q, per_page, max_records, prefetch)
+
+    async def list_patients(self, q="", max_records: int = None):
+        return await self._collect("patients", q, max_records)
 
     async def get_patient(self, patient_id: str):
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{BASE_URL}/patients/{patient_id}", headers=self.headers)
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_record("patients", patient_id)
 
-    async def create_patient(self, patient: dict):
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(f"{BASE_URL}/patients", headers=self.headers, json=patient)
-            resp.raise_for_status()
-            return resp.json()
+    async def create_patient(self, patient: dict, idempotency_key: str = None):
+        return await self._create_record("patients", patient, idempotency_key)
 
     async def update_patient(self, patient_id: str, patient: dict):
-        async with httpx.AsyncClient() as client:
-            resp = await client.put(f"{BASE_URL}/patients/{patient_id}", headers=self.headers, json=patient)
-            resp.raise_for_status()
-            return resp.json()
+        return await self._write_record("PUT", "patients", patient_id, patient)
 
     async def delete_patient(self, patient_id: str):
-        async with httpx.AsyncClient() as client:
-            resp = await client.delete(f"{BASE_URL}/patients/{patient_id}", headers=self.headers)
-            resp.raise_for_status()
-            return {"deleted": True}
+        return await self._delete_record("patients", patient_id)
 
     # Appointment methods
-    async def list_appointments(self, q=""):
-        params = {"q": q} if q else {}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{BASE_URL}/appointments", headers=self.headers, params=params)
-            resp.raise_for_status()
-            return resp.json().get("appointments", [])
+    async def list_appointments(self, q="", max_records: int = None):
+        return await self._collect("appointments", q, max_records)
 
     async def get_appointment(self, appointment_id: str):
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{BASE_URL}/appointments/{appointment_id}", headers=self.headers)
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_record("appointments", appointment_id)
+
+    # Appointment writes are applied to the practitioner's cached schedule days
+    def record_schedule(self, result: dict, appointment: dict = None):
+        """Apply an appointment record to the cached schedule days, or drop the days it may affect"""
+        practitioner_id = linked_id(result, "practitioner") or linked_id(appointment, "practitioner")
+        if not isinstance(result, dict) or not self.schedules.record(result, practitioner_id):
+            if isinstance(result, dict) and "id" in result:
+                self.schedules.invalidate_appointment(result["id"])
+            self.schedules.invalidate_practitioner(practitioner_id)
 
-    async def create_appointment(self, appointment: dict):
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(f"{BASE_URL}/appointments", headers=self.headers, json=appointment)
-            resp.raise_for_status()
-            return resp.json()
+    async def _book_appointment(self, appointment: dict, check_conflicts: bool):
+        if not check_conflicts:
+            result = await self._post_record("appointments", appointment)
+            self.record_schedule(result, appointment)
+            return result
+        practitioner_id = linked_id(appointment, "practitioner")
+        async with self.schedules.booking_lock(practitioner_id):
+            conflicts = await self.schedules.conflicts(self, practitioner_id, appointment)
+            if conflicts:
+                raise BookingConflict(conflicts)
+            result = await self._post_record("appointments", appointment)
+            self.record_schedule(result, appointment)
+        return result
+
+    async def create_appointment(self, appointment: dict, idempotency_key: str = None,
+                                 check_conflicts: bool = False):
+        """With check_conflicts, a booking that overlaps the practitioner's schedule raises BookingConflict
+        instead of being sent; replays of an earlier create skip the check"""
+        return await self.idempotency.run("appointments", appointment,
+                                          lambda: self._book_appointment(appointment, check_conflicts),
+                                          idempotency_key)
 
     async def update_appointment(self, appointment_id: str, appointment: dict):
-        async with httpx.AsyncClient() as client:
-            resp = await client.patch(f"{BASE_URL}/appointments/{appointment_id}", headers=self.headers, json=appointment)
-            resp.raise_for_status()
-            return resp.json()
+        result = await self._write_record("PATCH", "appointments", appointment_id, appointment)
+        self.record_schedule(result)
+        return result
 
     async def delete_appointment(self, appointment_id: str):
-        async with httpx.AsyncClient() as client:
-            resp = await client.delete(f"{BASE_URL}/appointments/{appointment_id}", headers=self.headers)
-            resp.raise_for_status()
-            return {"deleted": True}
+        result = await self._delete_record("appointments", appointment_id)
+        self.schedules.discard(appointment_id)
+        return result
 
     # Invoice methods
-    async def list_invoices(self, q=""):
-        params = {"q": q} if q else {}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{BASE_URL}/invoices", headers=self.headers, params=params)
-            resp.raise_for_status()
-            return resp.json().get("invoices", [])
+    async def list_invoices(self, q="", max_records: int = None):
+        return await self._collect("invoices", q, max_records)
 
     async def get_invoice(self, invoice_id):
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{BASE_URL}/invoices/{invoice_id}", headers=self.headers)
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_record("invoices", invoice_id)
 
-    async def create_invoice(self, invoice: dict):
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(f"{BASE_URL}/invoices", headers=self.headers, json=invoice)
-            resp.raise_for_status()
-            return resp.json()
+    async def create_invoice(self, invoice: dict, idempotency_key: str = None):
+        return await self._create_record("invoices", invoice, idempotency_key)
 
     async def update_invoice(self, invoice_id: int, invoice: dict):
-        async with httpx.AsyncClient() as client:
-            resp = await client.put(f"{BASE_URL}/invoices/{invoice_id}", headers=self.headers, json=invoice)
-            resp.raise_for_status()
-            return resp.json()
+        return await self._write_record("PUT", "invoices", invoice_id, invoice)
 
     async def delete_invoice(self, invoice_id: int):
-        async with httpx.AsyncClient() as client:
-            resp = await client.delete(f"{BASE_URL}/invoices/{invoice_id}", headers=self.headers)
-            resp.raise_for_status()
-            return {"deleted": True}
+        return await self._delete_record("invoices", invoice_id)
 
     # Practitioner methods
-    async def list_practitioners(self, q=""):
-        params = {"q": q} if q else {}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{BASE_URL}/practitioners", headers=self.headers, params=params)
-            resp.raise_for_status()
-            return resp.json().get("practitioners", [])
+    async def list_practitioners(self, q="", max_records: int = None):
+        return await self._collect("practitioners", q, max_records)
 
     async def get_practitioner(self, practitioner_id):
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{BASE_URL}/practitioners/{practitioner_id}", headers=self.headers)
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_record("practitioners", practitioner_id)
 
     async def create_practitioner(self, practitioner: dict):
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(f"{BASE_URL}/practitioners", headers=self.headers, json=practitioner)
-            resp.raise_for_status()
-            return resp.json()
+        return await self._create_record("practitioners", practitioner)
 
     async def update_practitioner(self, practitioner_id: int, practitioner: dict):
-        async with httpx.AsyncClient() as client:
-            resp = await client.put(f"{BASE_URL}/practitioners/{practitioner_id}", headers=self.headers, json=practitioner)
-            resp.raise_for_status()
-            return resp.json()
+        return await self._write_record("PUT", "practitioners", practitioner_id, practitioner)
 
     async def delete_practitioner(self, practitioner_id: int):
-        async with httpx.AsyncClient() as client:
-            resp = await client.delete(f"{BASE_URL}/practitioners/{practitioner_id}", headers=self.headers)
-            resp.raise_for_status()
-            return {"deleted": True}
+        return await self._delete_record("practitioners", practitioner_id)
+
+    # Appointment type methods (rarely change, so they get a long cache TTL)
+    async def list_appointment_types(self, q="", max_records: int = None):
+        return await self._collect("appointment_types", q, max_records)
+
+    async def get_appointment_type(self, appointment_type_id):
+        return await self._get_record("appointment_types", appointment_type_id)
+
+    async def get_linked(self, resource: str, record_id):
+        """Read-through fetch of any cached resource by name (see expansion.py)"""
+        return await self._get_record(resource, record_id)
+
+class ClinikoClients:
+    """
+    One ClinikoClient per tenant, created on first use. Each has its own
+    connection pool, rate limiter, caches and breakers, so a busy clinic
+    cannot use up another's connections, tokens or cache space.
+    """
+
+    def __init__(self, tenants: Dict[str, dict] = None):
+        self.tenants = dict(tenants or {})
+        # Bearer token -> tenant, for tenants.resolve_tenant()
+        self.tokens = tenant_tokens(self.tenants)
+        self._clients: Dict[str, ClinikoClient] = {}
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant == DEFAULT_TENANT or tenant in self.tenants
+
+    def get(self, tenant: str = DEFAULT_TENANT) -> ClinikoClient:
+        client = self._clients.get(tenant)
+        if client is None:
+            if tenant not in self:
+                raise UnknownTenantError(tenant)
+            client = self._clients[tenant] = self._create(tenant)
+        return client
+
+    def _create(self, tenant: str) -> ClinikoClient:
+        settings = self.tenants.get(tenant)
+        if settings is None:
+            return ClinikoClient(tenant=tenant)
+        settings = {**client_settings(), **settings}
+        return ClinikoClient(
+            base_url=settings.get("base_url") or shard_base_url(settings["api_key"], DEFAULT_BASE_URL),
+            api_key=settings["api_key"],
+            limits=default_limits(settings),
+            cache=RecordCache(CACHE_TTLS, settings["cache_max_entries"]),
+            limiter=TokenBucket.shared(tenant, rate=settings["rate_limit_per_minute"] / 60,
+                                       capacity=settings["rate_limit_burst"]),
+            # Spill files are per process, not per tenant; tenants revalidate from memory only
+            validators=ValidatorStore(spill_path=""),
+            tenant=tenant,
+        )
+
+    def items(self):
+        return list(self._clients.items())
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            tenant: {
+                "base_url": client.base_url,
+                "cache": client.cache.stats(),
+                "rate_limiter": client.limiter.stats(),
+                "circuit_breakers": client.breakers.stats(),
+                "idempotency": client.idempotency.stats(),
+            }
+            for tenant, client in self._clients.items()
+        }
+
+_clients: Optional[ClinikoClients] = None
+
+def get_clients() -> ClinikoClients:
+    """The process-wide per-tenant client registry, configured on first use"""
+    global _clients
+    if _clients is None:
+        _clients = ClinikoClients(load_tenants())
+    return _clients
+
+def get_client(tenant: str = None) -> ClinikoClient:
+    """
+    The ClinikoClient for `tenant`, or for the tenant the current request is
+    acting for (see tenants.TenantMiddleware). Tools, resources and background
+    jobs share each tenant's connection pool, caches, rate limiter and
+    breakers; the FastMCP lifespan closes them.
+    """
+    return get_clients().get(tenant or current_tenant())
@@ -22,6 +22,19 @@ APPOINTMENT_DURATIONS = {
     "short": 0.25,         # 15 minutes
 }
 
+# Opening hours used by find_available_slots (in DEFAULT_TIMEZONE; weekdays 0=Monday)
+BUSINESS_HOURS = {
+    "start": "09:00",
+    "end": "17:00",
+    "weekdays": [0, 1, 2, 3, 4],
+}
+
+# Free slots are offered on this grid (minutes past the opening time)
+SLOT_INTERVAL_MINUTES = 15
+
+# Seconds a cached practitioner day schedule is trusted before refetching
+SCHEDULE_CACHE_TTL = 60
+
 # Date/Time Format Examples
 DATETIME_FORMAT_EXAMPLES = {
     "iso_format": "2025-09-05T10:00:00Z",
@@ -88,8 +101,9 @@ QUICK_REFERENCE = {
     "book_appointment_workflow": [
         "1. Search for patient by name using list_patients(q='patient_name')",
         "2. If patient doesn't exist, create using create_patient with first_name and last_name",
-        "3. Use create_appointment with all required fields including patient_id from step 1/2",
-        "4. Verify appointment was created using get_appointment or list_appointments"
+        "3. Pick a time with find_available_slots(practitioner_id, date_range, duration)",
+        "4. Use create_appointment with all required fields including patient_id from step 1/2",
+        "5. Verify appointment was created using get_appointment or list_appointments"
     ],
     "required_appointment_fields": [
         "patient_id (string)",
@@ -98,5 +112,85 @@ QUICK_REFERENCE = {
         "business_id (string - use DEFAULT_BUSINESS_ID)",
         "appointment_start (ISO datetime string)",
         "appointment_end (ISO datetime string)"
+    ],
+    "compact_responses": [
+        "Pass fields='summary' or fields='booking' to get/list/search tools for a trimmed record",
+        "Or pass comma-separated dotted paths, e.g. fields='id,first_name,patient_phone_numbers.number'"
     ]
 }
+
+# Named field projections for the `fields` tool argument. Paths are dotted and
+# apply to every element of a list (e.g. patient_phone_numbers.number).
+PROJECTION_PROFILES = {
+    "patients": {
+        "summary": ["id", "first_name", "last_name", "date_of_birth", "email", "patient_phone_numbers.number"],
+        "booking": ["id", "first_name", "last_name", "patient_phone_numbers.number"],
+    },
+    "appointments": {
+        "summary": ["id", "starts_at", "ends_at", "patient_name", "notes", "cancelled_at", "did_not_arrive"],
+        "booking": [
+            "id", "starts_at", "ends_at", "patient_name", "cancelled_at",
+            "patient.links.self", "practitioner.links.self", "appointment_type.links.self", "business.links.self",
+        ],
+    },
+    "practitioners": {
+        "summary": ["id", "title", "first_name", "last_name", "designation", "active"],
+        "booking": ["id", "first_name", "last_name", "active"],
+    },
+    "invoices": {
+        "summary": ["id", "number", "issue_date", "status", "total_amount", "net_amount", "patient.links.self"],
+        "booking": ["id", "number", "status", "total_amount"],
+    },
+}
+
+# Linked records the `expand` tool argument can inline, per resource: name -> Cliniko resource
+EXPANDABLE_LINKS = {
+    "appointments": {
+        "patient": "patients",
+        "practitioner": "practitioners",
+        "appointment_type": "appointment_types",
+        "business": "businesses",
+    },
+}
+
+# List tool paging (records returned per list_* call; pass next_cursor back for more)
+DEFAULT_LIST_LIMIT = 50
+MAX_LIST_LIMIT = 500
+
+# Read cache TTLs in seconds per Cliniko resource (0 disables caching).
+# Practitioners, appointment types and businesses rarely change; appointments move often.
+CACHE_TTLS = {
+    "patients": 300,
+    "practitioners": 3600,
+    "appointment_types": 3600,
+    "businesses": 3600,
+    "appointments": 30,
+    "invoices": 60,
+}
+
+# Upstream HTTP timeouts in seconds per Cliniko resource; missing keys fall back
+# to "default". Every value is further capped by the tool call's deadline.
+HTTP_TIMEOUTS = {
+    "default": {"connect": 5.0, "read": 15.0, "write": 15.0, "pool": 5.0},
+    "patients": {"read": 10.0},
+    "practitioners": {"read": 10.0},
+    "appointment_types": {"read": 10.0},
+    "appointments": {"read": 20.0},
+    "invoices": {"read": 20.0},
+}
+
+# Total time budget in seconds per tool call, covering rate-limit waits, retries
+# and pagination. List tools return what they have (partial=True) when it runs out.
+TOOL_DEADLINES = {
+    "default": 15.0,
+    "list_patients": 25.0,
+    "list_appointments": 25.0,
+    "list_invoices": 25.0,
+    "find_available_slots": 20.0,
+    "get_patients": 45.0,
+    "create_patients": 45.0,
+    "update_patients": 45.0,
+    "get_appointments": 45.0,
+    "create_appointments": 45.0,
+    "update_appointments": 45.0,
+}
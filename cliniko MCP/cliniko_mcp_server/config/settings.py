@@ -0,0 +1,21 @@
+"""
+Cliniko MCP Server - Settings
+Environment lookups for every module's settings. The first lookup loads .env
+(variables already set win), so .env applies whichever module is imported
+first and nothing has to run before the imports.
+"""
+
+import os
+from functools import cache
+from typing import Optional
+
+from dotenv import load_dotenv
+
+@cache
+def load_env_file() -> bool:
+    """Load .env into os.environ once; True if a file was found"""
+    return load_dotenv()
+
+def env(name: str, default: Optional[str] = None) -> Optional[str]:
+    load_env_file()
+    return os.getenv(name, default)
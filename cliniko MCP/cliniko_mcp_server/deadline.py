@@ -0,0 +1,58 @@
+"""
+Cliniko MCP Server - Deadlines
+A per-tool-call time budget carried in a context variable, so the rate
+limiter wait, every HTTP attempt, retry backoff and pagination under one tool
+call share a single deadline instead of each waiting on its own timeout.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from fastmcp.server.middleware import Middleware
+
+from config.constants import TOOL_DEADLINES
+from config.settings import env
+
+DEFAULT_TOOL_DEADLINE = float(env("CLINIKO_TOOL_DEADLINE", str(TOOL_DEADLINES["default"])))
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("cliniko_deadline", default=None)
+
+class DeadlineExceeded(TimeoutError):
+    """The tool call's time budget ran out before Cliniko answered"""
+
+    def __init__(self, message: str = "Tool call deadline exceeded"):
+        super().__init__(message)
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Run the block with `seconds` of budget (never extending an outer deadline)"""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or None when no deadline is set"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def check():
+    """Raise DeadlineExceeded if the current budget is spent"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+class DeadlineMiddleware(Middleware):
+    """Gives each tools/call its budget from TOOL_DEADLINES"""
+
+    async def on_call_tool(self, context, call_next):
+        with deadline_scope(TOOL_DEADLINES.get(context.message.name, DEFAULT_TOOL_DEADLINE)):
+            return await call_next(context)
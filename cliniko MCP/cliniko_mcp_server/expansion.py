@@ -0,0 +1,86 @@
+"""
+Cliniko MCP Server - Linked Record Expansion
+Inlines the records an object links to (an appointment's patient,
+practitioner, ...) for the `expand` tool argument, fetching each distinct
+linked record once per call through the client's read cache.
+"""
+
+import asyncio
+from typing import Dict, List, Tuple
+
+from cliniko_client import linked_id
+from config.constants import EXPANDABLE_LINKS
+from config.settings import env
+from projection import resolve_fields
+from tracing import tracer
+
+# Linked-record fetches in flight per expansion
+EXPAND_CONCURRENCY = int(env("EXPAND_CONCURRENCY", "10"))
+
+def parse_expand(resource: str, expand: str) -> List[str]:
+    """"patient,practitioner" -> ["patient", "practitioner"]; "all" expands every link"""
+    links = EXPANDABLE_LINKS.get(resource, {})
+    names = [name.strip() for name in (expand or "").split(",") if name.strip()]
+    if names == ["all"]:
+        return list(links)
+    unknown = [name for name in names if name not in links]
+    if unknown:
+        raise ValueError(f"Cannot expand {', '.join(unknown)} on {resource}; "
+                         f"choose from {', '.join(links) or 'nothing'} or all")
+    return list(dict.fromkeys(names))
+
+def expand_fields(resource: str, fields: str, names: List[str]) -> str:
+    """
+    `fields` with each expanded name in place of its sub-paths, so projection
+    keeps the inlined records whole (a profile's patient.links.self would
+    otherwise cut the fetched patient back down to its link)
+    """
+    paths = resolve_fields(resource, fields)
+    if not paths or not names:
+        return fields
+    kept = [path for path in paths if path.strip().split(".", 1)[0] not in names]
+    return ",".join(kept + list(names))
+
+async def expand_records(client, resource: str, records: List[dict], names: List[str],
+                         concurrency: int = EXPAND_CONCURRENCY) -> List[dict]:
+    """
+    Copies of `records` with each named link replaced by the linked record.
+
+    Every distinct (resource, id) across the whole list is fetched once,
+    at most `concurrency` at a time; a link that can't be fetched is kept
+    with an "error" alongside it.
+    """
+    links = EXPANDABLE_LINKS.get(resource, {})
+    wanted: Dict[Tuple[str, str], None] = {}
+    for record in records:
+        for name in names:
+            record_id = linked_id(record, name)
+            if record_id:
+                wanted[(links[name], record_id)] = None
+    if not wanted:
+        return records
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(linked_resource: str, record_id: str):
+        async with semaphore:
+            try:
+                return await client.get_linked(linked_resource, record_id)
+            except Exception as e:
+                return e
+
+    with tracer.span("expand", resource=resource, links=len(wanted)):
+        fetched = dict(zip(wanted, await asyncio.gather(*(fetch(*key) for key in wanted))))
+    expanded = []
+    for record in records:
+        record = dict(record)
+        for name in names:
+            record_id = linked_id(record, name)
+            if not record_id:
+                continue
+            linked = fetched[(links[name], record_id)]
+            if isinstance(linked, Exception):
+                record[name] = {**(record.get(name) or {}), "error": str(linked) or type(linked).__name__}
+            else:
+                record[name] = linked
+        expanded.append(record)
+    return expanded
@@ -0,0 +1,189 @@
+"""
+Cliniko MCP Server - Export
+Streams every record of a Cliniko listing as NDJSON or CSV one page at a
+time, to an HTTP response or to a local file with a checkpoint to resume
+from, so memory use does not grow with the size of the dataset.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import time
+import weakref
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional, Tuple
+
+from cliniko_client import MAX_PER_PAGE, decode_cursor, encode_cursor
+from projection import project, resolve_fields
+from serialization import dumps, loads
+from config.settings import env
+
+logger = logging.getLogger(__name__)
+
+# Directory file exports (and their .checkpoint files) are written to
+EXPORT_DIR = env("EXPORT_DIR", "data/exports")
+# Records per Cliniko page, and so per chunk written
+EXPORT_PER_PAGE = int(env("EXPORT_PER_PAGE", str(MAX_PER_PAGE)))
+# GET /export/{resource} is off unless enabled, and then needs a bearer token (see tenants.py)
+EXPORT_HTTP_ENABLED = env("EXPORT_HTTP_ENABLED", "false").lower() == "true"
+
+EXPORT_RESOURCES = ("patients", "appointments", "invoices", "practitioners")
+# Format -> (file extension, media type)
+EXPORT_FORMATS = {"ndjson": ("ndjson", "application/x-ndjson"), "csv": ("csv", "text/csv")}
+
+def check_export(resource: str, fmt: str, cursor: str = ""):
+    """Raise ValueError for an export that can't be started"""
+    if resource not in EXPORT_RESOURCES:
+        raise ValueError(f"resource must be one of {', '.join(EXPORT_RESOURCES)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if cursor:
+        decode_cursor(cursor)
+
+def csv_columns(resource: str, fields: str = "") -> List[str]:
+    """CSV columns are fixed up front, so a resumed export matches its header; default is the summary profile"""
+    return resolve_fields(resource, fields or "summary")
+
+def csv_cell(record: dict, path: str) -> str:
+    """Value at a dotted path; lists are followed element-wise and their values joined with '; '"""
+    values = [record]
+    for key in path.split("."):
+        found = []
+        for value in values:
+            value = value.get(key) if isinstance(value, dict) else None
+            found.extend(value if isinstance(value, list) else [value])
+        values = found
+    return "; ".join(value if isinstance(value, str) else dumps(value) for value in values if value is not None)
+
+class PageEncoder:
+    """Encodes one page of records at a time as NDJSON lines or CSV rows"""
+
+    def __init__(self, resource: str, fmt: str, fields: str = ""):
+        self.resource = resource
+        self.fmt = fmt
+        self.fields = fields
+        self.columns = csv_columns(resource, fields) if fmt == "csv" else None
+
+    def _csv(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self._csv([self.columns]) if self.columns else b""
+
+    def encode(self, records: List[dict]) -> bytes:
+        if self.columns:
+            return self._csv([csv_cell(record, column) for column in self.columns] for record in records)
+        return "".join(dumps(record) + "\n" for record in project(records, self.resource, self.fields)).encode()
+
+async def export_pages(client, resource: str, q="", fmt: str = "ndjson", fields: str = "", cursor: str = "",
+                       per_page: int = EXPORT_PER_PAGE) -> AsyncIterator[Tuple[bytes, int, Optional[str]]]:
+    """
+    Yield (chunk, records, next_cursor) for each page of the listing from
+    `cursor` (a list_* next_cursor, or the start). next_cursor resumes after
+    the chunk and is None after the last one. Only one page is held at a
+    time (plus the next, prefetched); requests use spare rate-limit tokens
+    like delta sync, so an export doesn't hold up interactive calls.
+    """
+    check_export(resource, fmt, cursor)
+    if cursor:
+        page, offset, per_page = decode_cursor(cursor)
+    else:
+        page, offset, per_page = 1, 0, min(max(per_page, 1), MAX_PER_PAGE)
+    encoder = PageEncoder(resource, fmt, fields)
+    header = b"" if cursor else encoder.header()
+    async with aclosing(client.iter_pages(resource, q, per_page, page, prefetch=True, background=True)) as pages:
+        async for number, records, has_next in pages:
+            records = records[offset:]
+            offset = 0
+            yield header + encoder.encode(records), len(records), (
+                encode_cursor(number + 1, 0, per_page) if has_next else None
+            )
+            header = b""
+
+def resume_cursor(records_received: int, per_page: int = EXPORT_PER_PAGE, cursor: str = "") -> str:
+    """Cursor that resumes a streamed export started at `cursor` after `records_received` complete records"""
+    page, offset, per_page = decode_cursor(cursor) if cursor else (1, 0, min(max(per_page, 1), MAX_PER_PAGE))
+    page, offset = divmod((page - 1) * per_page + offset + records_received, per_page)
+    return encode_cursor(page + 1, offset, per_page)
+
+def export_path(resource: str, fmt: str, tenant: str = None, directory: str = None) -> str:
+    name = f"{tenant}-{resource}" if tenant else resource
+    return os.path.join(directory or EXPORT_DIR, f"{name}.{EXPORT_FORMATS[fmt][0]}")
+
+# One export per file at a time; holders and waiters keep the lock alive, then it is collected
+_file_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _file_lock(path: str) -> asyncio.Lock:
+    path = os.path.abspath(path)
+    lock = _file_locks.get(path)
+    if lock is None:
+        lock = _file_locks[path] = asyncio.Lock()
+    return lock
+
+def _write_page(f, chunk: bytes) -> int:
+    """Append a page and make it durable; returns the file size"""
+    f.write(chunk)
+    f.flush()
+    os.fsync(f.fileno())
+    return f.tell()
+
+def _write_checkpoint(path: str, checkpoint: dict):
+    # Replaced atomically, so a crash leaves the previous checkpoint intact
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+def _read_checkpoint(path: str) -> Optional[dict]:
+    try:
+        with open(path, "rb") as f:
+            return loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+async def export_to_file(client, resource: str, fmt: str = "ndjson", q="", fields: str = "", path: str = None,
+                         restart: bool = False, per_page: int = EXPORT_PER_PAGE) -> dict:
+    """
+    Write the whole listing to `path` (EXPORT_DIR/<resource>.<ext> by default)
+    page by page. After each page, <path>.checkpoint records the cursor and
+    the file's size; an interrupted export of the same resource, format, q
+    and fields resumes from there, truncating any half-written page, unless
+    `restart`. Returns the checkpoint.
+
+    Concurrent exports to the same path run one after the other, and file
+    writes and fsyncs run in a worker thread, off the event loop.
+    """
+    check_export(resource, fmt)
+    path = path or export_path(resource, fmt)
+    async with _file_lock(path):
+        return await _export_to_file(client, resource, fmt, q, fields, path, restart, per_page)
+
+async def _export_to_file(client, resource: str, fmt: str, q, fields: str, path: str, restart: bool,
+                          per_page: int) -> dict:
+    checkpoint_path = f"{path}.checkpoint"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    query = {"resource": resource, "format": fmt, "q": q, "fields": fields}
+    checkpoint = None if restart else _read_checkpoint(checkpoint_path)
+    resumed = bool(checkpoint and not checkpoint["complete"] and checkpoint["query"] == query
+                   and os.path.exists(path) and os.path.getsize(path) >= checkpoint["bytes"])
+    if not resumed:
+        checkpoint = {"query": query, "path": path, "cursor": "", "records": 0, "pages": 0, "bytes": 0,
+                      "complete": False, "started_at": time.time()}
+    resumed_from = checkpoint["cursor"] if resumed else None
+    with open(path, "r+b" if resumed else "wb") as f:
+        f.truncate(checkpoint["bytes"])
+        f.seek(checkpoint["bytes"])
+        async for chunk, records, next_cursor in export_pages(client, resource, q, fmt, fields, checkpoint["cursor"],
+                                                              per_page):
+            size = await asyncio.to_thread(_write_page, f, chunk)
+            checkpoint.update(cursor=next_cursor or "", records=checkpoint["records"] + records,
+                              pages=checkpoint["pages"] + 1, bytes=size, complete=next_cursor is None,
+                              updated_at=time.time())
+            await asyncio.to_thread(_write_checkpoint, checkpoint_path, dict(checkpoint))
+    logger.info("Exported %s %s to %s", checkpoint["records"], resource, path)
+    return {**checkpoint, "resumed_from": resumed_from}
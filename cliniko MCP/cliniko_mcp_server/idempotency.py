@@ -0,0 +1,117 @@
+"""
+Cliniko MCP Server - Idempotent Creates
+Remembers what each create_* call returned, keyed by the caller's idempotency
+key (or, when enabled, a hash of the payload), so a retried create within the
+window gets the original record back instead of POSTing a duplicate.
+"""
+
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cache import TTLCache
+from singleflight import SingleFlight
+from config.settings import env
+
+# Seconds a keyed create's result is replayed for (0 disables de-duplication)
+IDEMPOTENCY_WINDOW = float(env("IDEMPOTENCY_WINDOW", "600"))
+IDEMPOTENCY_MAX_ENTRIES = int(env("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+# Creates without a key are only merged with an identical payload when this is
+# on, and only for a few seconds: two identical creates may well be meant
+IDEMPOTENCY_PAYLOAD_DEDUPE = env("IDEMPOTENCY_PAYLOAD_DEDUPE", "false").lower() == "true"
+IDEMPOTENCY_PAYLOAD_WINDOW = float(env("IDEMPOTENCY_PAYLOAD_WINDOW", "30"))
+
+# Set on records returned from the store rather than from a new POST
+REPLAY_MARKER = "_idempotent_replay"
+
+class IdempotencyConflict(ValueError):
+    """An idempotency key was reused with a different payload"""
+
+    def __init__(self, key: str):
+        super().__init__(f"idempotency_key {key!r} was already used with a different payload")
+        self.key = key
+
+def payload_hash(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class IdempotencyStore:
+    """
+    Completed creates are kept for `window` seconds in a bounded TTLCache;
+    creates still in flight are tracked by a SingleFlight, so a retry that
+    arrives while the first POST is running waits for that POST (which a
+    cancelled caller does not abort) instead of sending its own.
+
+    Creates without a key are sent as they are, unless `payload_window` is
+    set: then the payload hash is the key for that many seconds, so only
+    identical payloads sent close together are treated as one create. Failed
+    creates are not remembered and can be retried, and a record that is
+    deleted is forgotten (see invalidate()), so it is never replayed.
+    """
+
+    def __init__(self, window: float = IDEMPOTENCY_WINDOW, max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+                 clock=time.monotonic,
+                 payload_window: float = IDEMPOTENCY_PAYLOAD_WINDOW if IDEMPOTENCY_PAYLOAD_DEDUPE else 0):
+        self.window = window
+        self.payload_window = payload_window
+        self._done = TTLCache(max_entries, clock)
+        # (resource, record id) -> the key its create is stored under
+        self._records = TTLCache(max_entries, clock)
+        self._inflight = SingleFlight()
+        self.creates = 0
+        self.replays = 0
+        self.conflicts = 0
+        self.invalidations = 0
+
+    async def run(self, resource: str, payload: Any, create: Callable[[], Awaitable[Any]],
+                  key: Optional[str] = None) -> Any:
+        """create() once per key within the window; repeats get its result marked with REPLAY_MARKER"""
+        ttl = self.window if key else self.payload_window
+        if ttl <= 0:
+            return await create()
+        digest = payload_hash(payload)
+        store_key = (resource, "key", key) if key else (resource, "payload", digest)
+        done = self._done.get(store_key)
+        if done is None:
+            replay = store_key in self._inflight
+
+            async def first():
+                record = await create()
+                self.creates += 1
+                self._done.set(store_key, (digest, record), ttl)
+                if isinstance(record, dict) and record.get("id") is not None:
+                    self._records.set((resource, str(record["id"])), store_key, ttl)
+                return digest, record
+
+            done = await self._inflight.do(store_key, first)
+        else:
+            replay = True
+        if done[0] != digest:
+            self.conflicts += 1
+            raise IdempotencyConflict(key)
+        if not replay:
+            return done[1]
+        self.replays += 1
+        return {**done[1], REPLAY_MARKER: True} if isinstance(done[1], dict) else done[1]
+
+    def invalidate(self, resource: str, record_id):
+        """Forget the create that returned `record_id`, so its key or payload creates afresh"""
+        store_key = self._records.peek((resource, str(record_id)))
+        if store_key is None:
+            return
+        self._records.invalidate((resource, str(record_id)))
+        self._done.invalidate(store_key)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window,
+            "payload_window_seconds": self.payload_window,
+            "entries": len(self._done),
+            "in_flight": len(self._inflight),
+            "creates": self.creates,
+            "replays": self.replays,
+            "conflicts": self.conflicts,
+            "invalidations": self.invalidations,
+        }
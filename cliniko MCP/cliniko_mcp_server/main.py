@@ -1,6 +1,31 @@
 from fastmcp import FastMCP
-from cliniko_client import ClinikoClient
-import os
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from cliniko_client import MAX_PER_PAGE, get_client, get_clients
+from metrics import REGISTRY, ToolMetricsMiddleware, client_collector, tenants_collector, warmer_collector
+from tracing import TracingMiddleware
+from deadline import DeadlineMiddleware
+from tenants import DEFAULT_TENANT, TenantAuthError, TenantMiddleware, current_tenant, resolve_tenant
+from patient_index import PatientIndex
+from batch import run_batch, payload_validator, update_item_validator
+from tools.validators import (
+    id_error, patient_create_error, patient_update_error,
+    appointment_create_error, appointment_update_error,
+)
+from availability import BOOKING_CONFLICT_CHECK, BookingConflict, find_available_slots as find_slots
+from projection import project
+from expansion import expand_fields, expand_records, parse_expand
+from idempotency import REPLAY_MARKER, IdempotencyConflict
+from export import EXPORT_FORMATS, EXPORT_HTTP_ENABLED, EXPORT_PER_PAGE, check_export, export_pages, export_path, export_to_file
+from serialization import CODEC, JSON_PASSTHROUGH, tool_result
+from sync import DeltaSync, RecordStore, SYNC_INTERVAL, SYNC_RESOURCES
+from warmer import CacheWarmer, WARM_DAYS, WARM_RESOURCES, WARM_TTL
+from config.constants import DEFAULT_LIST_LIMIT, MAX_LIST_LIMIT
+from config.settings import env
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import cache
+from typing import Container, Optional
+import asyncio
 import logging
 
 # Configure logging for production
@@ -9,127 +34,400 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-# Create the FastMCP app instance
-app = FastMCP("Cliniko MCP Server")
+logger = logging.getLogger(__name__)
+
+# One Cliniko client per tenant (see tenants.py); tools and resources call
+# get_client() for the tenant of the current request. Clients, stores and
+# background jobs are created on first use or by the lifespan, never at import.
+
+# Local patient search index and record store, kept fresh by a background delta sync
+# of the default tenant
+@cache
+def get_patient_index() -> PatientIndex:
+    return PatientIndex()
+
+@cache
+def get_record_store() -> RecordStore:
+    return RecordStore()
+
+@cache
+def get_delta_sync() -> DeltaSync:
+    return DeltaSync(get_client(DEFAULT_TENANT), {
+        resource: get_patient_index() if resource == "patients" else get_record_store()
+        for resource in SYNC_RESOURCES
+    })
+
+# Preloads upcoming appointments and their patients/practitioners before clinic hours.
+# Warmed records are only kept past their usual TTL while delta sync invalidates changes.
+@cache
+def get_cache_warmer() -> CacheWarmer:
+    return CacheWarmer(
+        get_client(DEFAULT_TENANT),
+        ttl=WARM_TTL if SYNC_INTERVAL > 0 and set(WARM_RESOURCES) <= set(SYNC_RESOURCES) else None,
+    )
 
-# Create the Cliniko client
-client = ClinikoClient()
+@asynccontextmanager
+async def lifespan(server):
+    """Open the shared Cliniko connection pools on startup and drain them on shutdown"""
+    async with get_client(DEFAULT_TENANT):
+        sync_task = asyncio.create_task(get_delta_sync().run()) if SYNC_INTERVAL > 0 else None
+        warm_task = asyncio.create_task(get_cache_warmer().run()) if WARM_DAYS > 0 else None
+        try:
+            yield
+        finally:
+            for task in (sync_task, warm_task):
+                if task is not None:
+                    task.cancel()
+            await get_clients().aclose()
+
+# Create the FastMCP app instance
+app = FastMCP("Cliniko MCP Server", lifespan=lifespan)
+
+# Per-tool call counts and latency histograms; upstream calls are recorded by ClinikoClient
+app.add_middleware(ToolMetricsMiddleware())
+# Root span per tool call (TRACING_EXPORTER / TRACING_SAMPLE_RATIO)
+app.add_middleware(TracingMiddleware())
+# One time budget per tool call shared by rate limiting, retries and pagination (TOOL_DEADLINES)
+app.add_middleware(DeadlineMiddleware())
+# Tenant per request from its bearer token (tenant access tokens, CLINIKO_ACCESS_TOKEN)
+app.add_middleware(TenantMiddleware(lambda: get_clients().tokens))
+# Collectors look the client and warmer up at scrape time
+REGISTRY.add_collector("cliniko", "Live ClinikoClient cache, revalidation, rate limiter, circuit breaker, coalescing and idempotency state", lambda: client_collector(get_client(DEFAULT_TENANT))())
+REGISTRY.add_collector("cliniko_warmer", "Cache warm-up of upcoming appointments and the read cache hit ratio since", lambda: warmer_collector(get_cache_warmer())())
+
+def visible_tenants(request) -> Optional[Container[str]]:
+    """
+    Tenants whose state /health and /metrics show this caller, checked like
+    /export: every tenant for the default account's bearer token, only its
+    own for a tenant's token, none without a valid token (so probes still work)
+    """
+    tokens = get_clients().tokens
+    if not tokens:
+        return ()
+    try:
+        tenant = resolve_tenant(request.headers, tokens)
+    except TenantAuthError:
+        return ()
+    return None if tenant == DEFAULT_TENANT else (tenant,)
 
 # Health check endpoint for deployment monitoring
-@app.get("/health")
-def health_check():
+@app.custom_route("/health", methods=["GET"])
+async def health_check(request):
     """Health check endpoint for deployment monitoring"""
-    return {
+    client = get_client(DEFAULT_TENANT)
+    tenants = visible_tenants(request)
+    return JSONResponse({
         "status": "healthy",
         "version": "1.0.0",
-        "timestamp": "2025-08-30T22:35:00Z",
-        "api_key_configured": bool(os.getenv("CLINIKO_API_KEY"))
-    }
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "api_key_configured": bool(env("CLINIKO_API_KEY")),
+        "cache": client.cache.stats(),
+        "rate_limiter": client.limiter.stats(),
+        "upstream_retries": client.retries,
+        "coalescing": client.inflight.stats() if client.inflight else None,
+        "sync": get_delta_sync().status() if SYNC_INTERVAL > 0 else None,
+        "warmer": get_cache_warmer().status() if WARM_DAYS > 0 else None,
+        "schedules": client.schedules.stats(),
+        "circuit_breakers": client.breakers.stats(),
+        "revalidation": client.validators.stats(),
+        "idempotency": client.idempotency.stats(),
+        "serialization": {"backend": CODEC.name, "passthrough": JSON_PASSTHROUGH},
+        "tenants": {tenant: stats for tenant, stats in get_clients().stats().items()
+                    if tenant != DEFAULT_TENANT and (tenants is None or tenant in tenants)}
+    })
+
+# Prometheus scrape endpoint
+@app.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    tenants = visible_tenants(request)
+    collectors = [] if tenants == () else [
+        ("cliniko_tenant", "Per-tenant ClinikoClient state, labelled by tenant",
+         tenants_collector(get_clients(), exclude=DEFAULT_TENANT, tenants=tenants)),
+    ]
+    return PlainTextResponse(REGISTRY.render(collectors), media_type="text/plain; version=0.0.4")
+
+# Streaming export of a whole listing as NDJSON or CSV (see export.py)
+@app.custom_route("/export/{resource}", methods=["GET"])
+async def export_endpoint(request):
+    """
+    GET /export/<resource>?format=ndjson|csv&q=...&fields=...&cursor=...
+    Records arrive a page at a time; after an interruption, pass
+    export.resume_cursor(records received, X-Export-Per-Page, cursor) as
+    `cursor` to continue where the download stopped. Off unless
+    EXPORT_HTTP_ENABLED, and only served to callers with a bearer token
+    """
+    if not EXPORT_HTTP_ENABLED:
+        return JSONResponse({"error": "HTTP export is disabled (EXPORT_HTTP_ENABLED)"}, status_code=404)
+    tokens = get_clients().tokens
+    if not tokens:
+        return JSONResponse({"error": "HTTP export needs CLINIKO_ACCESS_TOKEN or tenant access tokens"},
+                            status_code=403)
+    resource = request.path_params["resource"]
+    params = request.query_params
+    fmt = params.get("format", "ndjson")
+    cursor = params.get("cursor", "")
+    try:
+        # The same tenant resolution as MCP requests (see TenantMiddleware)
+        export_client = get_clients().get(resolve_tenant(request.headers, tokens))
+    except TenantAuthError as e:
+        return JSONResponse({"error": str(e)}, status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    try:
+        check_export(resource, fmt, cursor)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    try:
+        per_page = min(max(1, int(params.get("per_page", EXPORT_PER_PAGE))), MAX_PER_PAGE)
+    except ValueError:
+        return JSONResponse({"error": "per_page must be an integer"}, status_code=400)
+    chunks = export_pages(export_client, resource, params.getlist("q[]") or params.get("q", ""), fmt,
+                          params.get("fields", ""), cursor, per_page)
+    extension, media_type = EXPORT_FORMATS[fmt]
+    return StreamingResponse((chunk async for chunk, _, _ in chunks), media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{resource}.{extension}"',
+        "X-Export-Per-Page": str(per_page),
+    })
+
+async def list_resource(resource: str, q: str, limit: int, cursor: str, fields: str = "", expand: str = ""):
+    """One page of a Cliniko listing, plus the cursor to fetch the next page"""
+    if not 1 <= limit <= MAX_LIST_LIMIT:
+        return {"error": f"limit must be between 1 and {MAX_LIST_LIMIT}", resource: []}
+    try:
+        names = parse_expand(resource, expand)
+        records, next_cursor, partial = await get_client().list_page(resource, q, limit, cursor)
+    except ValueError as e:
+        return {"error": str(e), resource: []}
+    result = {resource: await expanded(records, resource, fields, names), "next_cursor": next_cursor}
+    if partial:
+        result["partial"] = True
+    return tool_result(result)
+
+async def expanded(records, resource: str, fields: str, names: list):
+    """Inline the `names` links of a record or list of records, then project keeping them"""
+    if not names:
+        return project(records, resource, fields)
+    single = isinstance(records, dict)
+    records = await expand_records(get_client(), resource, [records] if single else records, names)
+    projected_records = project(records, resource, expand_fields(resource, fields, names))
+    return projected_records[0] if single else projected_records
+
+def projected(worker, resource: str, fields: str):
+    """Wrap a batch worker so each result is projected before it is collected"""
+    async def run(item):
+        return project(await worker(item), resource, fields)
+    return run
+
+async def indexed(write) -> dict:
+    """Await a patient create or update and apply the returned record to the local patient index,
+    which only holds the default tenant's patients (a replay was indexed by its first create)"""
+    record = await write
+    if (current_tenant() == DEFAULT_TENANT and isinstance(record, dict) and "id" in record
+            and not record.get(REPLAY_MARKER)):
+        get_patient_index().upsert([record])
+    return record
 
 # Register all patient tools directly here
-@app.tool("list_patients", description="List/search all Cliniko patients")
-async def list_patients(q: str = "") -> dict:
-    patients = await client.list_patients(q)
-    return {"patients": patients}
+@app.tool("list_patients", description="List/search Cliniko patients, `limit` at a time. Pass next_cursor back as `cursor` for the next page.")
+async def list_patients(q: str = "", limit: int = DEFAULT_LIST_LIMIT, cursor: str = "", fields: str = "") -> dict:
+    return await list_resource("patients", q, limit, cursor, fields)
+
+@app.tool("search_patients", description="Find patients by name (prefix, sound-alike or misspelt), email or phone number. Uses a local index and falls back to Cliniko search on a miss.")
+async def search_patients(query: str, limit: int = 10, fields: str = "") -> dict:
+    if not 1 <= limit <= MAX_LIST_LIMIT:
+        return {"error": f"limit must be between 1 and {MAX_LIST_LIMIT}", "patients": []}
+    # The local index only holds the default tenant's patients
+    patients = get_patient_index().search(query, limit) if current_tenant() == DEFAULT_TENANT else []
+    if patients:
+        return tool_result({"patients": project(patients, "patients", fields), "source": "index"})
+    patients, _, _ = await get_client().list_page("patients", query, limit)
+    if current_tenant() == DEFAULT_TENANT:
+        get_patient_index().upsert(patients)
+    return tool_result({"patients": project(patients, "patients", fields), "source": "cliniko"})
 
 @app.tool("get_patient", description="Get patient by ID")
-async def get_patient(patient_id: int) -> dict:
-    return await client.get_patient(patient_id)
+async def get_patient(patient_id: int, fields: str = "") -> dict:
+    return project(await get_client().get_patient(patient_id), "patients", fields)
 
-@app.tool("create_patient", description="Create new patient")
-async def create_patient(patient: dict) -> dict:
-    return await client.create_patient(patient)
+@app.tool("create_patient", description="Create new patient. Retrying with the same idempotency_key within IDEMPOTENCY_WINDOW returns the original record, marked _idempotent_replay, instead of creating another; without a key every call creates a record.")
+async def create_patient(patient: dict, fields: str = "", idempotency_key: str = "") -> dict:
+    try:
+        record = await indexed(get_client().create_patient(patient, idempotency_key or None))
+    except IdempotencyConflict as e:
+        return {"error": str(e)}
+    return project(record, "patients", fields)
 
 @app.tool("update_patient", description="Update patient details")
-async def update_patient(patient_id: int, patient: dict) -> dict:
-    return await client.update_patient(patient_id, patient)
+async def update_patient(patient_id: int, patient: dict, fields: str = "") -> dict:
+    return project(await indexed(get_client().update_patient(patient_id, patient)), "patients", fields)
 
 @app.tool("delete_patient", description="Delete (archive) a patient")
 async def delete_patient(patient_id: int) -> dict:
-    return await client.delete_patient(patient_id)
+    result = await get_client().delete_patient(patient_id)
+    if current_tenant() == DEFAULT_TENANT:
+        get_patient_index().remove(patient_id)
+    return result
 
 # Register all appointment tools
-@app.tool("list_appointments", description="List/search all Cliniko appointments")
-async def list_appointments(q: str = "") -> dict:
-    appointments = await client.list_appointments(q)
-    return {"appointments": appointments}
-
-@app.tool("get_appointment", description="Get appointment by ID")
-async def get_appointment(appointment_id: int) -> dict:
-    return await client.get_appointment(appointment_id)
+@app.tool("list_appointments", description="List/search Cliniko appointments, `limit` at a time. Pass next_cursor back as `cursor` for the next page. expand (patient, practitioner, appointment_type, business or all, comma-separated) inlines those linked records.")
+async def list_appointments(q: str = "", limit: int = DEFAULT_LIST_LIMIT, cursor: str = "", fields: str = "",
+                            expand: str = "") -> dict:
+    return await list_resource("appointments", q, limit, cursor, fields, expand)
 
-@app.tool("create_appointment", description="Create new appointment")
-async def create_appointment(appointment: dict) -> dict:
-    return await client.create_appointment(appointment)
+@app.tool("get_appointment", description="Get appointment by ID. expand (patient, practitioner, appointment_type, business or all) inlines those linked records.")
+async def get_appointment(appointment_id: int, fields: str = "", expand: str = "") -> dict:
+    try:
+        names = parse_expand("appointments", expand)
+    except ValueError as e:
+        return {"error": str(e)}
+    return await expanded(await get_client().get_appointment(appointment_id), "appointments", fields, names)
+
+@app.tool("create_appointment", description="Create new appointment. With check_conflicts (default BOOKING_CONFLICT_CHECK, off), a slot that overlaps the practitioner's existing bookings at any business is refused with the conflicting appointments, before anything is sent to Cliniko; pass false to double-book deliberately. Retrying with the same idempotency_key within IDEMPOTENCY_WINDOW returns the original record, marked _idempotent_replay, instead of creating another; without a key every call creates a record.")
+async def create_appointment(appointment: dict, fields: str = "", idempotency_key: str = "",
+                             check_conflicts: bool = BOOKING_CONFLICT_CHECK) -> dict:
+    try:
+        record = await get_client().create_appointment(appointment, idempotency_key or None, check_conflicts)
+    except BookingConflict as e:
+        return {"error": str(e), "conflicts": e.details()}
+    except IdempotencyConflict as e:
+        return {"error": str(e)}
+    return project(record, "appointments", fields)
 
 @app.tool("update_appointment", description="Update appointment details")
-async def update_appointment(appointment_id: int, appointment: dict) -> dict:
-    return await client.update_appointment(appointment_id, appointment)
+async def update_appointment(appointment_id: int, appointment: dict, fields: str = "") -> dict:
+    return project(await get_client().update_appointment(appointment_id, appointment), "appointments", fields)
 
 @app.tool("delete_appointment", description="Delete an appointment")
 async def delete_appointment(appointment_id: int) -> dict:
-    return await client.delete_appointment(appointment_id)
+    return await get_client().delete_appointment(appointment_id)
+
+@app.tool("find_available_slots", description="Free appointment slots for a practitioner in one call, within opening hours and not in the past; their bookings at every business count as busy. date_range is 'YYYY-MM-DD' or 'YYYY-MM-DD/YYYY-MM-DD'; duration is consultation, follow_up, checkup, procedure, short, or a number of minutes.")
+async def find_available_slots(practitioner_id: str, date_range: str, duration: str = "consultation") -> dict:
+    try:
+        slots = await find_slots(get_client(), practitioner_id, date_range, duration)
+    except ValueError as e:
+        return {"error": str(e), "slots": []}
+    return {"slots": slots, "duration": duration}
+
+# Batch tools: one MCP call fans out to many upstream requests (bounded by
+# BATCH_CONCURRENCY) and returns per-item results and errors in input order
+@app.tool("get_patients", description="Get many patients by ID (list of ID strings) in one call")
+async def get_patients(patient_ids: list[str], fields: str = "") -> dict:
+    return await run_batch(patient_ids, projected(get_client().get_patient, "patients", fields), lambda i: id_error("patient_id", i))
+
+@app.tool("create_patients", description="Create many patients in one call; each item uses create_patient fields")
+async def create_patients(patients: list[dict], fields: str = "") -> dict:
+    return await run_batch(patients, projected(lambda item: indexed(get_client().create_patient(item)), "patients", fields), payload_validator(patient_create_error))
+
+@app.tool("update_patients", description="Update many patients in one call. Items: {\"patient_id\": \"...\", \"patient\": {fields}}")
+async def update_patients(updates: list[dict], fields: str = "") -> dict:
+    return await run_batch(
+        updates,
+        projected(lambda item: indexed(get_client().update_patient(item["patient_id"], item["patient"])), "patients", fields),
+        update_item_validator("patient_id", "patient", patient_update_error),
+    )
+
+@app.tool("get_appointments", description="Get many appointments by ID (list of ID strings) in one call. expand works as in get_appointment, fetching each linked record once for the whole batch.")
+async def get_appointments(appointment_ids: list[str], fields: str = "", expand: str = "") -> dict:
+    try:
+        names = parse_expand("appointments", expand)
+    except ValueError as e:
+        return {"error": str(e), "results": []}
+    if not names:
+        return await run_batch(appointment_ids, projected(get_client().get_appointment, "appointments", fields), lambda i: id_error("appointment_id", i))
+    batch = await run_batch(appointment_ids, get_client().get_appointment, lambda i: id_error("appointment_id", i))
+    succeeded = [result for result in batch["results"] if result["ok"]]
+    records = await expanded([result["result"] for result in succeeded], "appointments", fields, names)
+    for result, record in zip(succeeded, records):
+        result["result"] = record
+    return batch
+
+@app.tool("create_appointments", description="Create many appointments in one call; each item uses create_appointment fields and is checked for conflicts as in create_appointment, including with earlier items")
+async def create_appointments(appointments: list[dict], fields: str = "", check_conflicts: bool = BOOKING_CONFLICT_CHECK) -> dict:
+    return await run_batch(
+        appointments,
+        projected(lambda item: get_client().create_appointment(item, check_conflicts=check_conflicts), "appointments", fields),
+        payload_validator(appointment_create_error),
+    )
+
+@app.tool("update_appointments", description="Update many appointments in one call. Items: {\"appointment_id\": \"...\", \"appointment\": {starts_at, ends_at, notes}}")
+async def update_appointments(updates: list[dict], fields: str = "") -> dict:
+    return await run_batch(
+        updates,
+        projected(lambda item: get_client().update_appointment(item["appointment_id"], item["appointment"]), "appointments", fields),
+        update_item_validator("appointment_id", "appointment", appointment_update_error),
+    )
 
 # Register all invoice tools
-@app.tool("list_invoices", description="List/search all Cliniko invoices")
-async def list_invoices(q: str = "") -> dict:
-    invoices = await client.list_invoices(q)
-    return {"invoices": invoices}
+@app.tool("list_invoices", description="List/search Cliniko invoices, `limit` at a time. Pass next_cursor back as `cursor` for the next page.")
+async def list_invoices(q: str = "", limit: int = DEFAULT_LIST_LIMIT, cursor: str = "", fields: str = "") -> dict:
+    return await list_resource("invoices", q, limit, cursor, fields)
 
 @app.tool("get_invoice", description="Get invoice by ID")
-async def get_invoice(invoice_id: int) -> dict:
-    return await client.get_invoice(invoice_id)
+async def get_invoice(invoice_id: int, fields: str = "") -> dict:
+    return project(await get_client().get_invoice(invoice_id), "invoices", fields)
 
-@app.tool("create_invoice", description="Create new invoice")
-async def create_invoice(invoice: dict) -> dict:
-    return await client.create_invoice(invoice)
+@app.tool("create_invoice", description="Create new invoice. Retrying with the same idempotency_key within IDEMPOTENCY_WINDOW returns the original record, marked _idempotent_replay, instead of creating another; without a key every call creates a record.")
+async def create_invoice(invoice: dict, fields: str = "", idempotency_key: str = "") -> dict:
+    try:
+        record = await get_client().create_invoice(invoice, idempotency_key or None)
+    except IdempotencyConflict as e:
+        return {"error": str(e)}
+    return project(record, "invoices", fields)
 
 @app.tool("update_invoice", description="Update invoice details")
-async def update_invoice(invoice_id: int, invoice: dict) -> dict:
-    return await client.update_invoice(invoice_id, invoice)
+async def update_invoice(invoice_id: int, invoice: dict, fields: str = "") -> dict:
+    return project(await get_client().update_invoice(invoice_id, invoice), "invoices", fields)
 
 @app.tool("delete_invoice", description="Delete an invoice")
 async def delete_invoice(invoice_id: int) -> dict:
-    return await client.delete_invoice(invoice_id)
+    return await get_client().delete_invoice(invoice_id)
 
 # Register all practitioner tools
-@app.tool("list_practitioners", description="List/search all Cliniko practitioners")
-async def list_practitioners(q: str = "") -> dict:
-    practitioners = await client.list_practitioners(q)
-    return {"practitioners": practitioners}
+@app.tool("list_practitioners", description="List/search Cliniko practitioners, `limit` at a time. Pass next_cursor back as `cursor` for the next page.")
+async def list_practitioners(q: str = "", limit: int = DEFAULT_LIST_LIMIT, cursor: str = "", fields: str = "") -> dict:
+    return await list_resource("practitioners", q, limit, cursor, fields)
 
 @app.tool("get_practitioner", description="Get practitioner by ID")
-async def get_practitioner(practitioner_id: int) -> dict:
-    return await client.get_practitioner(practitioner_id)
+async def get_practitioner(practitioner_id: int, fields: str = "") -> dict:
+    return project(await get_client().get_practitioner(practitioner_id), "practitioners", fields)
 
 @app.tool("create_practitioner", description="Create new practitioner")
-async def create_practitioner(practitioner: dict) -> dict:
-    return await client.create_practitioner(practitioner)
+async def create_practitioner(practitioner: dict, fields: str = "") -> dict:
+    return project(await get_client().create_practitioner(practitioner), "practitioners", fields)
 
 @app.tool("update_practitioner", description="Update practitioner details")
-async def update_practitioner(practitioner_id: int, practitioner: dict) -> dict:
-    return await client.update_practitioner(practitioner_id, practitioner)
+async def update_practitioner(practitioner_id: int, practitioner: dict, fields: str = "") -> dict:
+    return project(await get_client().update_practitioner(practitioner_id, practitioner), "practitioners", fields)
 
 @app.tool("delete_practitioner", description="Delete a practitioner")
 async def delete_practitioner(practitioner_id: int) -> dict:
-    return await client.delete_practitioner(practitioner_id)
+    return await get_client().delete_practitioner(practitioner_id)
 
 # Register resources
 @app.resource("patient://{id}", description="Get patient by ID")
 async def get_patient_resource(id: int):
-    return await client.get_patient(id)
+    return await get_client().get_patient(id)
 
 @app.resource("patients://list", description="List all patients")
 async def list_patients_resource():
-    return {"patients": await client.list_patients()}
+    return {"patients": await get_client().list_patients()}
 
 @app.resource("appointment://{id}", description="Get appointment by ID")
 async def get_appointment_resource(id: int):
-    return await client.get_appointment(id)
+    return await get_client().get_appointment(id)
 
 @app.resource("appointments://list", description="List all appointments")
 async def list_appointments_resource():
-    return {"appointments": await client.list_appointments()}
+    return {"appointments": await get_client().list_appointments()}
+
+@app.resource("export://{resource}/{fmt}{?q,fields,restart}", description="Export every patient, appointment, invoice or practitioner (optionally filtered by q) to a local NDJSON or CSV file under EXPORT_DIR, page by page. An interrupted export resumes from its checkpoint on the next read; restart=true starts over. Returns the file path, record count and whether it is complete.")
+async def export_resource(resource: str, fmt: str, q: str = "", fields: str = "", restart: str = "") -> dict:
+    tenant = current_tenant()
+    try:
+        check_export(resource, fmt)
+        return await export_to_file(get_client(), resource, fmt, q, fields, restart=restart.lower() == "true",
+                                    path=export_path(resource, fmt, None if tenant == DEFAULT_TENANT else tenant))
+    except ValueError as e:
+        return {"error": str(e)}
 
 if __name__ == "__main__":
     import uvicorn
@@ -148,8 +446,8 @@ if __name__ == "__main__":
     print("🎯 Server ready to start...")
 
     # Use production server for deployment
-    port = int(os.getenv("PORT", 8000))
-    host = os.getenv("HOST", "0.0.0.0")
+    port = int(env("PORT", "8000"))
+    host = env("HOST", "0.0.0.0")
 
     print(f"🌐 Starting server on {host}:{port}")
     uvicorn.run(
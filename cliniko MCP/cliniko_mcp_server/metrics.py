@@ -0,0 +1,285 @@
+"""
+Cliniko MCP Server - Metrics
+Prometheus-style counters, gauges and histograms for tool calls and upstream
+Cliniko requests, rendered in the text exposition format on /metrics.
+
+Recording is a dict lookup and an add (plus a bisect for histograms), so it
+is cheap enough to leave on in production; nothing is computed until scrape.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Container, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastmcp.server.middleware import Middleware
+
+# Seconds. Covers cache hits (sub-millisecond) through slow paginated listings.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._lines())
+        return lines
+
+    @abstractmethod
+    def _lines(self) -> List[str]:
+        """Sample lines, after the HELP and TYPE lines"""
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _lines(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self._values.items())]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def _lines(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames + ("le",), labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            series_labels = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{series_labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{series_labels} {cumulative}")
+        return lines
+
+class Registry:
+    """
+    Holds metrics plus collectors: callables run at scrape time that return
+    (name, labels, value) samples read from live objects (cache stats,
+    limiter state), so those never cost anything on the request path.
+    Samples named *_total are typed as counters and the rest as gauges.
+    """
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Tuple[str, str, Callable[[], Iterable[Sample]]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, prefix: str, documentation: str, collect: Callable[[], Iterable[Sample]]):
+        self.collectors.append((prefix, documentation, collect))
+
+    def render(self, collectors: Iterable[Tuple[str, str, Callable[[], Iterable[Sample]]]] = ()) -> str:
+        """The exposition text; `collectors` are run after the registered ones, for this scrape only"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for prefix, documentation, collect in self.collectors + list(collectors):
+            typed = set()
+            for name, labels, value in collect():
+                name = f"{prefix}_{name}"
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# HELP {name} {documentation}")
+                    lines.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+                lines.append(f"{name}{_format_labels(labels, labels.values())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+TOOL_CALLS = REGISTRY.counter("cliniko_mcp_tool_calls_total", "MCP tool calls by outcome", ("tool", "outcome"))
+TOOL_LATENCY = REGISTRY.histogram("cliniko_mcp_tool_duration_seconds", "MCP tool call latency", ("tool",))
+TOOLS_IN_FLIGHT = REGISTRY.gauge("cliniko_mcp_tools_in_flight", "MCP tool calls currently running")
+
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "cliniko_upstream_requests_total", "Cliniko API responses by status (or transport error)",
+    ("method", "resource", "status"),
+)
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "cliniko_upstream_duration_seconds", "Cliniko API request latency per attempt", ("method", "resource"),
+)
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge("cliniko_upstream_in_flight", "Cliniko API requests currently open")
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "cliniko_upstream_retries_total", "Cliniko API requests retried", ("method", "resource"),
+)
+
+def resource_label(path: str) -> str:
+    """"/patients/123" or "https://.../v1/patients?page=2" -> "patients" """
+    segments = [segment for segment in urlsplit(path).path.split("/") if segment and segment != "v1"]
+    return segments[0] if segments else ""
+
+# Tool label for calls to names that are not registered tools
+UNKNOWN_TOOL = "unknown"
+
+class ToolMetricsMiddleware(Middleware):
+    """
+    Counts and times every tools/call. The tool name comes from the client,
+    so names that aren't registered tools share the UNKNOWN_TOOL label
+    rather than each adding series.
+    """
+
+    def __init__(self):
+        self._tools: Optional[Container[str]] = None
+
+    async def _tool_label(self, context) -> str:
+        # Tools are all registered at import, so the names are read once
+        if self._tools is None and context.fastmcp_context is not None:
+            tools = await context.fastmcp_context.fastmcp.list_tools(run_middleware=False)
+            self._tools = frozenset(tool.name for tool in tools)
+        name = context.message.name
+        return name if self._tools is not None and name in self._tools else UNKNOWN_TOOL
+
+    async def on_call_tool(self, context, call_next):
+        tool = await self._tool_label(context)
+        TOOLS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await call_next(context)
+        except Exception:
+            outcome = "exception"
+            raise
+        finally:
+            TOOLS_IN_FLIGHT.dec()
+            TOOL_LATENCY.observe(time.perf_counter() - started, tool)
+            TOOL_CALLS.inc(tool, outcome)
+
+# Numeric encoding of CircuitBreaker.state for the cliniko_circuit_state gauge
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+def client_collector(client) -> Callable[[], Iterable[Sample]]:
+    """Scrape-time samples for a ClinikoClient's cache, revalidation store, limiter, breakers, coalescer
+    and idempotency store"""
+    def collect():
+        cache = client.cache.stats()
+        lookups = cache["hits"] + cache["misses"]
+        yield "cache_hit_ratio", {}, cache["hits"] / lookups if lookups else 0.0
+        yield "cache_entries", {}, cache["entries"]
+        for key in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            yield f"cache_{key}_total", {}, cache[key]
+        for key in ("hits", "misses"):
+            for resource, counts in cache["resources"].items():
+                yield f"cache_resource_{key}_total", {"resource": resource}, counts[key]
+        limiter = client.limiter.stats()
+        for key in ("rate_per_second", "tokens", "queue_depth", "background_queue_depth"):
+            yield f"rate_limiter_{key}", {}, limiter[key]
+        yield "rate_limiter_acquired_total", {}, limiter["acquired"]
+        yield "rate_limiter_wait_seconds_total", {}, limiter["wait_seconds_total"]
+        yield "rate_limiter_throttled_total", {}, limiter["throttled"]
+        for family, breaker in client.breakers.stats().items():
+            yield "circuit_state", {"family": family}, BREAKER_STATES[breaker["state"]]
+            yield "circuit_rejected_total", {"family": family}, breaker["rejected"]
+        revalidation = client.validators.stats()
+        for key in ("entries", "bytes"):
+            yield f"revalidation_{key}", {}, revalidation[key]
+        for key in ("revalidations", "not_modified", "bytes_saved"):
+            yield f"revalidation_{key}_total", {}, revalidation[key]
+        if client.inflight is not None:
+            coalescing = client.inflight.stats()
+            yield "coalescing_in_flight", {}, coalescing["in_flight"]
+            for key in ("executions", "coalesced"):
+                yield f"coalescing_{key}_total", {}, coalescing[key]
+        idempotency = client.idempotency.stats()
+        for key in ("entries", "in_flight"):
+            yield f"idempotency_{key}", {}, idempotency[key]
+        for key in ("creates", "replays", "conflicts", "invalidations"):
+            yield f"idempotency_{key}_total", {}, idempotency[key]
+    return collect
+
+def warmer_collector(warmer) -> Callable[[], Iterable[Sample]]:
+    """Scrape-time samples for a CacheWarmer: its last warm-up and the cache hit ratios since"""
+    def collect():
+        status = warmer.status()
+        yield "runs_total", {}, status["runs"]
+        last = status.get("last")
+        if last:
+            yield "last_duration_seconds", {}, last["duration_ms"] / 1000
+            for resource in ("appointments", "patients", "practitioners"):
+                yield "last_records", {"resource": resource}, last[resource]
+        for resource, rates in status["hits_since_warm"].items():
+            yield "hit_ratio", {"resource": resource}, rates["hit_ratio"]
+    return collect
+
+def tenants_collector(clients, exclude: str = None,
+                      tenants: Container[str] = None) -> Callable[[], Iterable[Sample]]:
+    """client_collector() samples for each tenant's client in a ClinikoClients (only `tenants`, if given),
+    labelled by tenant"""
+    def collect():
+        samples = [
+            (name, {**labels, "tenant": tenant}, value)
+            for tenant, client in clients.items() if tenant != exclude and (tenants is None or tenant in tenants)
+            for name, labels, value in client_collector(client)()
+        ]
+        # Keep each metric's samples together, as the text format requires
+        return sorted(samples, key=lambda sample: sample[0])
+    return collect
@@ -0,0 +1,274 @@
+"""
+Cliniko MCP Server - Local Patient Index
+SQLite/FTS5 index of patients for millisecond name, email and phone lookup.
+
+The index is a sync.DeltaSync target: it is filled incrementally from Cliniko
+using `updated_at` filters, so after the first full pass each sync only
+downloads patients that changed.
+"""
+
+import difflib
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from serialization import dumps, loads
+from config.settings import env
+
+PATIENT_INDEX_PATH = env("PATIENT_INDEX_PATH", "data/patient_index.db")
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+$")
+PHONE_PATTERN = re.compile(r"^\+?[\d\s().-]{6,}$")
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+# Phone numbers are matched on their last 9 digits so "+44 7700 900123" and
+# "07700 900123" find the same patient.
+PHONE_MATCH_DIGITS = 9
+FUZZY_THRESHOLD = 0.75
+FUZZY_CANDIDATES = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL DEFAULT '',
+    last_name TEXT NOT NULL DEFAULT '',
+    full_name TEXT NOT NULL DEFAULT '',
+    phonetic TEXT NOT NULL DEFAULT '',
+    email TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS patients_email ON patients(email);
+CREATE INDEX IF NOT EXISTS patients_updated_at ON patients(updated_at);
+CREATE TABLE IF NOT EXISTS patient_phones (
+    number TEXT NOT NULL,
+    patient_id INTEGER NOT NULL,
+    PRIMARY KEY (number, patient_id)
+);
+CREATE INDEX IF NOT EXISTS patient_phones_patient ON patient_phones(patient_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+    first_name, last_name, phonetic,
+    content='patients', content_rowid='id',
+    prefix='1 2 3', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS patients_ai AFTER INSERT ON patients BEGIN
+    INSERT INTO patients_fts(rowid, first_name, last_name, phonetic)
+    VALUES (new.id, new.first_name, new.last_name, new.phonetic);
+END;
+CREATE TRIGGER IF NOT EXISTS patients_ad AFTER DELETE ON patients BEGIN
+    INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, phonetic)
+    VALUES ('delete', old.id, old.first_name, old.last_name, old.phonetic);
+END;
+CREATE TRIGGER IF NOT EXISTS patients_au AFTER UPDATE ON patients BEGIN
+    INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, phonetic)
+    VALUES ('delete', old.id, old.first_name, old.last_name, old.phonetic);
+    INSERT INTO patients_fts(rowid, first_name, last_name, phonetic)
+    VALUES (new.id, new.first_name, new.last_name, new.phonetic);
+END;
+CREATE TABLE IF NOT EXISTS index_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"), "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+def soundex(word: str) -> str:
+    """American Soundex code, e.g. soundex("Smyth") == soundex("Smith") == "S530" """
+    letters = [c for c in word.lower() if c.isascii() and c.isalpha()]
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+def name_tokens(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+def normalize_phone(number: str) -> str:
+    digits = re.sub(r"\D", "", number or "")
+    return digits[-PHONE_MATCH_DIGITS:]
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+def _fts_quote(token: str) -> str:
+    return '"' + token.replace('"', '""') + '"'
+
+class PatientIndex:
+    """
+    Embedded patient search index.
+
+    search() answers in milliseconds from SQLite: exact email or phone,
+    otherwise name prefix, then phonetic (Soundex), then fuzzy matches.
+    """
+
+    def __init__(self, path: str = PATIENT_INDEX_PATH):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+
+    # Writes
+    def upsert(self, patients: Iterable[dict]) -> int:
+        """Insert or replace patients; archived patients are removed. Returns rows touched."""
+        count = 0
+        with self._lock, self._db:
+            for patient in patients:
+                patient_id = int(patient["id"])
+                self._db.execute("DELETE FROM patient_phones WHERE patient_id = ?", (patient_id,))
+                if patient.get("archived_at"):
+                    self._db.execute("DELETE FROM patients WHERE id = ?", (patient_id,))
+                    count += 1
+                    continue
+                first_name = patient.get("first_name") or ""
+                last_name = patient.get("last_name") or ""
+                preferred = patient.get("preferred_first_name") or ""
+                if preferred and preferred.lower() != first_name.lower():
+                    first_name = f"{first_name} {preferred}"
+                tokens = name_tokens(f"{first_name} {last_name}")
+                self._db.execute(
+                    """INSERT INTO patients (id, first_name, last_name, full_name, phonetic, email, updated_at, data)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(id) DO UPDATE SET
+                           first_name = excluded.first_name, last_name = excluded.last_name,
+                           full_name = excluded.full_name, phonetic = excluded.phonetic,
+                           email = excluded.email, updated_at = excluded.updated_at, data = excluded.data""",
+                    (
+                        patient_id, first_name, last_name, " ".join(tokens),
+                        " ".join(soundex(token) for token in tokens),
+                        normalize_email(patient.get("email")) or None,
+                        patient.get("updated_at"), dumps(patient),
+                    ),
+                )
+                phones = {normalize_phone(p.get("number")) for p in patient.get("patient_phone_numbers") or []}
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO patient_phones (number, patient_id) VALUES (?, ?)",
+                    [(number, patient_id) for number in phones if number],
+                )
+                count += 1
+        return count
+
+    def remove(self, patient_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM patient_phones WHERE patient_id = ?", (int(patient_id),))
+            self._db.execute("DELETE FROM patients WHERE id = ?", (int(patient_id),))
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO index_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    # Reads
+    def _records(self, sql: str, params: tuple) -> List[dict]:
+        return [loads(row["data"]) for row in self._db.execute(sql, params)]
+
+    def find_by_email(self, email: str, limit: int = 10) -> List[dict]:
+        return self._records("SELECT data FROM patients WHERE email = ? LIMIT ?", (normalize_email(email), limit))
+
+    def find_by_phone(self, number: str, limit: int = 10) -> List[dict]:
+        return self._records(
+            "SELECT p.data FROM patient_phones ph JOIN patients p ON p.id = ph.patient_id "
+            "WHERE ph.number = ? LIMIT ?",
+            (normalize_phone(number), limit),
+        )
+
+    def find_by_name(self, name: str, limit: int = 10) -> List[dict]:
+        tokens = name_tokens(name)
+        if not tokens:
+            return []
+        results: Dict[int, dict] = {}
+
+        def collect(match: str, cap: int):
+            rows = self._db.execute(
+                "SELECT p.id, p.data FROM patients_fts JOIN patients p ON p.id = patients_fts.rowid "
+                "WHERE patients_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match, cap),
+            )
+            for row in rows:
+                if len(results) >= limit:
+                    return
+                results.setdefault(row["id"], loads(row["data"]))
+
+        # 1. Every token is a prefix of a first or last name ("jo smi" -> John Smith)
+        collect(" AND ".join("{first_name last_name}: " + _fts_quote(t) + "*" for t in tokens), limit)
+        # 2. Sounds alike ("Jon Smyth" -> John Smith)
+        if len(results) < limit:
+            codes = [soundex(t) for t in tokens if soundex(t)]
+            if codes:
+                collect(" AND ".join("phonetic: " + _fts_quote(code) for code in codes), limit)
+        # 3. Typos: rank candidates sharing a leading letter by edit similarity
+        if len(results) < limit:
+            query = " ".join(tokens)
+            candidates = self._db.execute(
+                "SELECT p.id, p.full_name, p.data FROM patients_fts JOIN patients p ON p.id = patients_fts.rowid "
+                "WHERE patients_fts MATCH ? LIMIT ?",
+                (" OR ".join("{first_name last_name}: " + _fts_quote(t[0]) + "*" for t in tokens), FUZZY_CANDIDATES),
+            )
+            scored = []
+            for row in candidates:
+                if row["id"] in results:
+                    continue
+                score = difflib.SequenceMatcher(None, query, row["full_name"]).ratio()
+                if score >= FUZZY_THRESHOLD:
+                    scored.append((score, row["id"], row["data"]))
+            for score, patient_id, data in sorted(scored, reverse=True)[: limit - len(results)]:
+                results[patient_id] = loads(data)
+        return list(results.values())
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        query = (query or "").strip()
+        if not query:
+            return []
+        if EMAIL_PATTERN.match(query):
+            return self.find_by_email(query, limit)
+        if PHONE_PATTERN.match(query):
+            return self.find_by_phone(query, limit)
+        return self.find_by_name(query, limit)
+
+    # Sync target interface used by sync.DeltaSync
+    def apply(self, resource: str, records: Iterable[dict]) -> int:
+        return self.upsert(records)
+
+    def ids(self, resource: str) -> Set[str]:
+        return {str(row[0]) for row in self._db.execute("SELECT id FROM patients")}
+
+    def remove_ids(self, resource: str, ids: Iterable[str]) -> int:
+        ids = [(int(patient_id),) for patient_id in ids]
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM patient_phones WHERE patient_id = ?", ids)
+            self._db.executemany("DELETE FROM patients WHERE id = ?", ids)
+        return len(ids)
+
+    def get_watermark(self, resource: str) -> Optional[str]:
+        return self.get_meta(f"{resource}_updated_at")
+
+    def set_watermark(self, resource: str, value: str):
+        self.set_meta(f"{resource}_updated_at", value)
@@ -0,0 +1,72 @@
+"""
+Cliniko MCP Server - Response Projection
+Trims Cliniko objects down to the fields the agent asked for before they are
+serialized, so tool payloads (and LLM tokens) stay small.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache import STALE_MARKER
+from idempotency import REPLAY_MARKER
+from config.constants import PROJECTION_PROFILES
+from tracing import tracer
+
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+def compile_fields(fields: List[str]) -> FieldTree:
+    """["id", "patient.links.self"] -> {"id": None, "patient": {"links": {"self": None}}}"""
+    return _compile(tuple(fields))
+
+# `fields` comes from the caller, so the cache of compiled trees is bounded
+@lru_cache(maxsize=256)
+def _compile(fields: Tuple[str, ...]) -> FieldTree:
+    tree = {}
+    for path in fields:
+        node = tree
+        parts = [part for part in path.strip().split(".") if part]
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = None  # take the whole value
+            else:
+                child = node.get(part, {})
+                if child is None:
+                    break  # an ancestor is already taken whole
+                node = node.setdefault(part, child)
+    return tree
+
+def _apply(value: Any, tree: FieldTree) -> Any:
+    if isinstance(value, list):
+        return [_apply(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for name, subtree in tree.items():
+        if name in value:
+            projected[name] = value[name] if subtree is None else _apply(value[name], subtree)
+    return projected
+
+def resolve_fields(resource: str, fields: str) -> Optional[List[str]]:
+    """A profile name for the resource ("summary", "booking") or comma-separated dotted paths"""
+    fields = (fields or "").strip()
+    if not fields:
+        return None
+    profiles = PROJECTION_PROFILES.get(resource, {})
+    if fields in profiles:
+        return profiles[fields]
+    return [field for field in fields.split(",") if field.strip()]
+
+def project(value: Any, resource: str, fields: str) -> Any:
+    """Project a record or list of records; an empty `fields` returns value untouched"""
+    paths = resolve_fields(resource, fields)
+    if not paths:
+        return value
+    with tracer.span("shape", resource=resource, fields=len(paths)):
+        projected = _apply(value, compile_fields(paths))
+    if isinstance(value, dict) and value.get(STALE_MARKER):
+        # Never hide that a record came from an expired cache entry
+        projected.update({key: item for key, item in value.items() if key.startswith(STALE_MARKER)})
+    if isinstance(value, dict) and value.get(REPLAY_MARKER):
+        # Nor that a create was answered from an earlier attempt
+        projected[REPLAY_MARKER] = True
+    return projected
@@ -0,0 +1,182 @@
+"""
+Cliniko MCP Server - Rate Limiting and Retries
+Process-wide adaptive token bucket plus the retry policies used by ClinikoClient.
+"""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+# Methods that are safe to replay after an ambiguous failure
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+class TokenBucket:
+    """
+    Async token bucket shared by every ClinikoClient in the process.
+
+    The refill rate adapts AIMD-style: a 429 halves it (down to min_rate) and
+    pauses all callers for Retry-After, each success creeps it back up
+    towards the configured rate. Waiters are served in FIFO order.
+
+    Background callers (delta sync, cache warming) only take a token when no
+    interactive caller is waiting and more than `background_reserve` tokens
+    are left, so they can never starve tool traffic.
+    """
+
+    _shared: Dict[str, "TokenBucket"] = {}
+
+    @classmethod
+    def shared(cls, key: str = "default", **kwargs) -> "TokenBucket":
+        """Return the process-wide bucket for `key`, creating it on first use"""
+        bucket = cls._shared.get(key)
+        if bucket is None:
+            bucket = cls._shared[key] = cls(**kwargs)
+        return bucket
+
+    def __init__(self, rate: float, capacity: float, min_rate: float = None,
+                 background_reserve: float = None, clock=time.monotonic):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.capacity = capacity
+        self.background_reserve = background_reserve if background_reserve is not None else capacity / 2
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+        # Metrics
+        self.queue_depth = 0
+        self.background_queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.wait_seconds_total = 0.0
+        self.throttled = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, background: bool = False) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        if background:
+            return await self._acquire_background()
+        started = self.clock()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            async with self._lock:
+                while True:
+                    now = self.clock()
+                    if now < self.paused_until:
+                        await asyncio.sleep(self.paused_until - now)
+                        continue
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.queue_depth -= 1
+        waited = self.clock() - started
+        self.acquired += 1
+        self.wait_seconds_total += waited
+        return waited
+
+    async def _acquire_background(self) -> float:
+        started = self.clock()
+        threshold = min(1 + self.background_reserve, self.capacity)
+        self.background_queue_depth += 1
+        try:
+            while True:
+                now = self.clock()
+                self._refill(now)
+                if now >= self.paused_until and self.queue_depth == 0 and self.tokens >= threshold:
+                    self.tokens -= 1
+                    break
+                wait = max(self.paused_until - now, (threshold - self.tokens) / self.rate)
+                await asyncio.sleep(max(wait, 0.01))
+        finally:
+            self.background_queue_depth -= 1
+        waited = self.clock() - started
+        self.acquired += 1
+        self.wait_seconds_total += waited
+        return waited
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+    def on_throttle(self, retry_after: float = None):
+        self.throttled += 1
+        self._refill(self.clock())
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = min(self.tokens, 0)
+        if retry_after:
+            self.paused_until = max(self.paused_until, self.clock() + retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "max_rate_per_second": self.max_rate,
+            "tokens": round(self.tokens, 3),
+            "queue_depth": self.queue_depth,
+            "background_queue_depth": self.background_queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "acquired": self.acquired,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "avg_wait_ms": round(self.wait_seconds_total / self.acquired * 1000, 3) if self.acquired else 0.0,
+            "throttled": self.throttled,
+        }
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, honouring Retry-After.
+
+    With idempotent=False the policy only retries failures where Cliniko
+    cannot have acted on the request: a 429 or a connection that was never
+    established. Anything else could create a duplicate record.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 idempotent: bool = True):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.idempotent = idempotent
+
+    def should_retry(self, attempt: int, status: int = None, error: Exception = None) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if error is not None:
+            if self.idempotent:
+                return isinstance(error, httpx.TransportError)
+            return isinstance(error, self.UNSENT_ERRORS)
+        if self.idempotent:
+            return status in self.RETRY_STATUSES
+        return status == 429
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
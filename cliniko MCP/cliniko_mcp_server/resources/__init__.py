@@ -1 +0,0 @@
-# Resources package for Cliniko MCP Server
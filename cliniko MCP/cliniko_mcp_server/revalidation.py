@@ -0,0 +1,174 @@
+"""
+Cliniko MCP Server - Revalidation Store
+Remembers the ETag / Last-Modified validators Cliniko sent with each record so
+repeat reads can be conditional GETs; a 304 reuses the stored record as-is.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from serialization import dumps, loads
+from config.settings import env
+
+# In-memory budget, measured as the size of the response bodies kept (0 disables)
+REVALIDATION_MAX_BYTES = int(env("CLINIKO_REVALIDATION_MAX_BYTES", str(8 * 1024 * 1024)))
+# SQLite file that entries evicted from memory spill to ("" keeps everything in memory)
+REVALIDATION_SPILL_PATH = env("CLINIKO_REVALIDATION_SPILL_PATH", "")
+REVALIDATION_SPILL_MAX_ENTRIES = int(env("CLINIKO_REVALIDATION_SPILL_MAX_ENTRIES", "50000"))
+
+class Validated:
+    """A stored record with the validators it was served with"""
+    __slots__ = ("etag", "last_modified", "record", "size")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], record: Any, size: int):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.record = record
+        self.size = size
+
+    def headers(self) -> Dict[str, str]:
+        """Request headers that make a GET conditional on this copy"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ValidatorStore:
+    """
+    LRU of Validated records bounded by `max_bytes` of response body.
+
+    With a `spill_path`, entries evicted from memory are written to SQLite
+    (up to `spill_max_entries`, oldest dropped first) and promoted back on
+    their next lookup. Records only reach the store if Cliniko sent an ETag
+    or Last-Modified header with them.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS validated (
+        resource TEXT NOT NULL,
+        id TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        size INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (resource, id)
+    );
+    """
+
+    def __init__(self, max_bytes: int = REVALIDATION_MAX_BYTES, spill_path: str = REVALIDATION_SPILL_PATH,
+                 spill_max_entries: int = REVALIDATION_SPILL_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.spill_max_entries = spill_max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Validated]" = OrderedDict()
+        self._bytes = 0
+        self._db = None
+        if spill_path and max_bytes > 0:
+            if spill_path != ":memory:" and os.path.dirname(spill_path):
+                os.makedirs(os.path.dirname(spill_path), exist_ok=True)
+            self._db = sqlite3.connect(spill_path, check_same_thread=False)
+            self._lock = threading.Lock()
+            with self._lock, self._db:
+                self._db.executescript(self.SCHEMA)
+        # Metrics
+        self.revalidations = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self.spill_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get(self, resource: str, record_id) -> Optional[Validated]:
+        key = (resource, str(record_id))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT etag, last_modified, size, data FROM validated WHERE resource = ? AND id = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        self.spill_hits += 1
+        entry = Validated(row[0], row[1], loads(row[3]), row[2])
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM validated WHERE resource = ? AND id = ?", key)
+        self._remember(key, entry)
+        return entry
+
+    def put(self, resource: str, record_id, etag: Optional[str], last_modified: Optional[str],
+            record: Any, size: int):
+        if not self.enabled or not (etag or last_modified):
+            return
+        key = (resource, str(record_id))
+        self._drop(key)
+        if size > self.max_bytes:
+            return
+        self._remember(key, Validated(etag, last_modified, record, size))
+
+    def revalidated(self, entry: Validated, not_modified: bool):
+        """Record the outcome of a conditional GET sent for `entry`"""
+        self.revalidations += 1
+        if not_modified:
+            self.not_modified += 1
+            self.bytes_saved += entry.size
+
+    def invalidate(self, resource: str, record_id):
+        self._drop((resource, str(record_id)))
+
+    def _remember(self, key: Tuple[str, str], entry: Validated):
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            old_key, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self._spill(old_key, old)
+
+    def _drop(self, key: Tuple[str, str]):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        if self._db is not None:
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM validated WHERE resource = ? AND id = ?", key)
+
+    def _spill(self, key: Tuple[str, str], entry: Validated):
+        if self._db is None:
+            return
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO validated (resource, id, etag, last_modified, size, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, entry.etag, entry.last_modified, entry.size, dumps(entry.record)),
+            )
+            self._db.execute(
+                "DELETE FROM validated WHERE rowid IN (SELECT rowid FROM validated ORDER BY rowid "
+                "LIMIT max(0, (SELECT count(*) FROM validated) - ?))",
+                (self.spill_max_entries,),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        spilled_entries = self._db.execute("SELECT count(*) FROM validated").fetchone()[0] if self._db else 0
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "spilled_entries": spilled_entries,
+            "spill_hits": self.spill_hits,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -0,0 +1,80 @@
+"""
+Cliniko MCP Server - Serialization
+JSON decoding of Cliniko response bodies and encoding of MCP tool results,
+using orjson or msgspec when installed and the standard library otherwise.
+"""
+
+import json
+import logging
+from typing import Any, Callable
+
+from fastmcp.tools.base import ToolResult
+from mcp.types import TextContent
+
+from config.settings import env
+
+logger = logging.getLogger(__name__)
+
+# auto (orjson, then msgspec, then json), orjson, msgspec or json
+JSON_BACKEND = env("CLINIKO_JSON_BACKEND", "auto").lower()
+# List tools hand FastMCP their result already encoded instead of having it walked twice
+JSON_PASSTHROUGH = env("CLINIKO_JSON_PASSTHROUGH", "true").lower() == "true"
+
+class JsonCodec:
+    """A named pair of loads(bytes | str) -> object and dumps(object) -> str"""
+    __slots__ = ("name", "loads", "dumps")
+
+    def __init__(self, name: str, loads: Callable[[Any], Any], dumps: Callable[[Any], str]):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+def _orjson() -> JsonCodec:
+    import orjson
+    options = orjson.OPT_NON_STR_KEYS
+    return JsonCodec("orjson", orjson.loads, lambda value: orjson.dumps(value, default=str, option=options).decode())
+
+def _msgspec() -> JsonCodec:
+    import msgspec
+    encoder = msgspec.json.Encoder(enc_hook=str)
+    return JsonCodec("msgspec", msgspec.json.decode, lambda value: encoder.encode(value).decode())
+
+def _stdlib() -> JsonCodec:
+    # Compact and unescaped, like the pydantic encoder FastMCP would use
+    return JsonCodec("json", json.loads,
+                     lambda value: json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")))
+
+_BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "json": _stdlib}
+
+def codec(name: str = "auto") -> JsonCodec:
+    """The named backend; "auto" or a backend that isn't installed falls back down the list"""
+    names = list(_BACKENDS) if name == "auto" else [name, "json"]
+    for candidate in names:
+        try:
+            return _BACKENDS[candidate]()
+        except ImportError:
+            continue
+        except KeyError:
+            logger.warning("Unknown CLINIKO_JSON_BACKEND %r", candidate)
+    return _stdlib()
+
+CODEC = codec(JSON_BACKEND)
+loads = CODEC.loads
+dumps = CODEC.dumps
+
+def tool_result(value: Any, json_codec: JsonCodec = None, passthrough: bool = None) -> Any:
+    """
+    Wrap a tool's dict result so its text content is encoded once by the fast
+    backend and its structured content is passed through as-is.
+
+    FastMCP otherwise converts a returned dict to JSON-able form and then
+    serializes it again for the text content. The value must already be plain
+    JSON data (decoded Cliniko records, projected or not). Anything else, or
+    pass-through switched off, is returned unchanged for FastMCP to handle.
+    """
+    passthrough = JSON_PASSTHROUGH if passthrough is None else passthrough
+    if not passthrough or not isinstance(value, dict):
+        return value
+    text = (json_codec or CODEC).dumps(value)
+    return ToolResult.model_construct(content=[TextContent(type="text", text=text)], structured_content=value,
+                                      meta=None, is_error=False)
@@ -0,0 +1,212 @@
+"""
+Cliniko MCP Server - Delta Sync
+Keeps local stores fresh by polling Cliniko for records changed since a
+per-resource `updated_at` high-water mark, with a periodic full pass that
+drops records deleted or archived upstream.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from serialization import dumps, loads
+from config.settings import env
+
+logger = logging.getLogger(__name__)
+
+SYNC_STORE_PATH = env("SYNC_STORE_PATH", "data/cliniko_sync.db")
+# Off unless set: a pass copies every synced record into SYNC_STORE_PATH and the patient index
+SYNC_INTERVAL = int(env("SYNC_INTERVAL", "0"))
+SYNC_CONCURRENCY = int(env("SYNC_CONCURRENCY", "1"))
+# Every Nth pass lists every record to find deletions (0: only the first pass)
+SYNC_RECONCILE_EVERY = int(env("SYNC_RECONCILE_EVERY", "12"))
+SYNC_RESOURCES = tuple(
+    r.strip() for r in env("SYNC_RESOURCES", "patients,appointments,invoices,practitioners").split(",") if r.strip()
+)
+
+class RecordStore:
+    """
+    SQLite store of raw Cliniko records plus their sync watermarks.
+
+    Any object with apply(resource, records), ids(resource),
+    remove_ids(resource, ids), get_watermark(resource) and
+    set_watermark(resource, value) can be used as a sync target; PatientIndex
+    implements the same methods.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS records (
+        resource TEXT NOT NULL,
+        id TEXT NOT NULL,
+        updated_at TEXT,
+        data TEXT NOT NULL,
+        PRIMARY KEY (resource, id)
+    );
+    CREATE TABLE IF NOT EXISTS watermarks (
+        resource TEXT PRIMARY KEY,
+        updated_at TEXT
+    );
+    """
+
+    def __init__(self, path: str = SYNC_STORE_PATH):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.executescript(self.SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def apply(self, resource: str, records: Iterable[dict]) -> int:
+        """Upsert changed records; ones carrying archived_at or deleted_at are dropped"""
+        upserts, deletes = [], []
+        for record in records:
+            if record.get("archived_at") or record.get("deleted_at"):
+                deletes.append((resource, str(record["id"])))
+            else:
+                upserts.append((resource, str(record["id"]), record.get("updated_at"), dumps(record)))
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM records WHERE resource = ? AND id = ?", deletes)
+            self._db.executemany(
+                "INSERT INTO records (resource, id, updated_at, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(resource, id) DO UPDATE SET updated_at = excluded.updated_at, data = excluded.data",
+                upserts,
+            )
+        return len(upserts) + len(deletes)
+
+    def ids(self, resource: str) -> Set[str]:
+        return {row[0] for row in self._db.execute("SELECT id FROM records WHERE resource = ?", (resource,))}
+
+    def remove_ids(self, resource: str, ids: Iterable[str]) -> int:
+        rows = [(resource, str(record_id)) for record_id in ids]
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM records WHERE resource = ? AND id = ?", rows)
+        return len(rows)
+
+    def get(self, resource: str, record_id) -> Optional[dict]:
+        row = self._db.execute(
+            "SELECT data FROM records WHERE resource = ? AND id = ?", (resource, str(record_id))
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def count(self, resource: str) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM records WHERE resource = ?", (resource,)).fetchone()[0]
+
+    def get_watermark(self, resource: str) -> Optional[str]:
+        row = self._db.execute("SELECT updated_at FROM watermarks WHERE resource = ?", (resource,)).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, resource: str, value: str):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO watermarks (resource, updated_at) VALUES (?, ?) "
+                "ON CONFLICT(resource) DO UPDATE SET updated_at = excluded.updated_at",
+                (resource, value),
+            )
+
+class DeltaSync:
+    """
+    Background delta sync for Cliniko list endpoints.
+
+    Each pass asks for `updated_at:>=<watermark>` through
+    ClinikoClient.iter_pages with background=True, so sync requests only use
+    spare rate-limit tokens, and at most `concurrency` resources sync at once.
+    The watermark advances only after a pass completes, so an interrupted
+    pass is repeated rather than skipped.
+
+    Cliniko's listings leave out deleted and archived records, so a delta
+    never reports them. The first pass and every `reconcile_every`th one
+    list everything instead, and local records that were present before the
+    pass but not listed are removed (from the store, the read cache and the
+    schedule days).
+    """
+
+    def __init__(self, client, stores: Dict[str, object], interval: float = SYNC_INTERVAL,
+                 concurrency: int = SYNC_CONCURRENCY, per_page: int = 100,
+                 reconcile_every: int = SYNC_RECONCILE_EVERY):
+        self.client = client
+        self.stores = stores
+        self.interval = interval
+        self.per_page = per_page
+        self.reconcile_every = reconcile_every
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._status = {resource: {"runs": 0, "applied_total": 0, "removed_total": 0} for resource in stores}
+        self._fresh_as_of: Dict[str, float] = {}
+
+    async def sync_resource(self, resource: str) -> int:
+        store = self.stores[resource]
+        status = self._status[resource]
+        async with self._semaphore:
+            started_wall, started = time.time(), time.perf_counter()
+            watermark = store.get_watermark(resource)
+            runs = status["runs"]
+            reconcile = runs == 0 or bool(self.reconcile_every) and runs % self.reconcile_every == 0
+            filters = [f"updated_at:>={watermark}"] if watermark and not reconcile else ""
+            # Records added while the pass runs are not in the listing, so only earlier ones can be stale
+            local_ids = store.ids(resource) if reconcile else set()
+            newest, applied, listed = watermark, 0, set()
+            try:
+                async for _, records, _ in self.client.iter_pages(resource, filters, self.per_page, background=True):
+                    applied += store.apply(resource, records)
+                    for record in records:
+                        listed.add(str(record["id"]))
+                        self.client.cache.invalidate_record(resource, record["id"])
+                        if resource == "appointments":
+                            self.client.record_schedule(record)
+                        updated_at = record.get("updated_at")
+                        if updated_at and (newest is None or updated_at > newest):
+                            newest = updated_at
+            except Exception as e:
+                status["last_error"] = str(e)
+                raise
+            removed = local_ids - listed
+            if removed:
+                store.remove_ids(resource, removed)
+                for record_id in removed:
+                    self.client.cache.invalidate_record(resource, record_id)
+                    if resource == "appointments":
+                        self.client.schedules.discard(record_id)
+            if newest and newest != watermark:
+                store.set_watermark(resource, newest)
+            # Everything changed before this pass started is now local
+            self._fresh_as_of[resource] = started_wall
+            status.update(
+                runs=status["runs"] + 1,
+                applied_total=status["applied_total"] + applied,
+                removed_total=status["removed_total"] + len(removed),
+                last_applied=applied,
+                last_duration_ms=round((time.perf_counter() - started) * 1000, 1),
+                watermark=newest,
+                last_error=None,
+            )
+        return applied
+
+    async def sync_all(self) -> Dict[str, int]:
+        resources = list(self.stores)
+        results = await asyncio.gather(*(self.sync_resource(r) for r in resources), return_exceptions=True)
+        for resource, result in zip(resources, results):
+            if isinstance(result, Exception):
+                logger.warning("Delta sync of %s failed: %s", resource, result)
+        return {r: result for r, result in zip(resources, results) if not isinstance(result, Exception)}
+
+    async def run(self):
+        """Sync forever, every `interval` seconds"""
+        while True:
+            await self.sync_all()
+            await asyncio.sleep(self.interval)
+
+    def lag_seconds(self, resource: str) -> Optional[float]:
+        """Upper bound on how stale the local copy of `resource` is"""
+        fresh_as_of = self._fresh_as_of.get(resource)
+        return None if fresh_as_of is None else round(time.time() - fresh_as_of, 3)
+
+    def status(self) -> dict:
+        return {resource: {**status, "lag_seconds": self.lag_seconds(resource)}
+                for resource, status in self._status.items()}
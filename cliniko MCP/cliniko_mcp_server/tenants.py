@@ -0,0 +1,158 @@
+"""
+Cliniko MCP Server - Tenants
+Per-clinic Cliniko accounts (API key, shard and limits) and the tenant that
+the current MCP request is acting for, resolved from its bearer token.
+"""
+
+import contextvars
+import hmac
+import json
+import re
+from contextlib import contextmanager
+from typing import Callable, Dict, Mapping, Optional
+
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware
+from mcp.shared.exceptions import MCPError
+from mcp.types import INVALID_REQUEST
+
+from config.settings import env
+
+# The account in CLINIKO_API_KEY / CLINIKO_BASE_URL
+DEFAULT_TENANT = "default"
+# Optional; must name the tenant the bearer token belongs to
+TENANT_HEADER = env("CLINIKO_TENANT_HEADER", "X-Cliniko-Tenant").lower()
+
+# Cliniko API keys end in their shard, e.g. "...-au4"
+_SHARD = re.compile(r"-([a-z]{2}\d+)$")
+
+class UnknownTenantError(ValueError):
+    """The request named a tenant that is not configured"""
+
+    def __init__(self, tenant: str):
+        super().__init__(f"Unknown Cliniko tenant: {tenant!r}")
+        self.tenant = tenant
+
+class TenantAuthError(PermissionError):
+    """The request has no valid bearer token for the tenant it is acting for"""
+
+def shard_base_url(api_key: Optional[str], default: str = None) -> Optional[str]:
+    """API base URL for the shard encoded in a Cliniko API key, else `default`"""
+    match = _SHARD.search(api_key or "")
+    return f"https://api.{match.group(1)}.cliniko.com/v1" if match else default
+
+def load_tenants(inline: str = None, path: str = None) -> Dict[str, dict]:
+    """
+    Read tenant settings from CLINIKO_TENANTS (JSON) or CLINIKO_TENANTS_FILE
+    (a JSON file), whichever is set:
+
+        {"north": {"api_key_env": "NORTH_CLINIKO_KEY", "rate_limit_per_minute": 200},
+         "sydney": {"api_key_env": "SYDNEY_CLINIKO_KEY", "shard": "au4", "max_connections": 5}}
+
+    Each tenant needs `api_key` or `api_key_env` (the variable holding the key),
+    and `access_token` or `access_token_env`: the bearer token MCP and export
+    requests present to act for it. A tenant without one is refused, so
+    tenants can only be selected by an authenticated caller.
+    `base_url` or `shard` pick the API host, defaulting to the key's shard.
+    `rate_limit_per_minute`, `rate_limit_burst`, `max_connections`,
+    `max_keepalive_connections` and `cache_max_entries` are optional and fall
+    back to the process-wide CLINIKO_* settings.
+    """
+    inline = env("CLINIKO_TENANTS", "") if inline is None else inline
+    path = env("CLINIKO_TENANTS_FILE", "") if path is None else path
+    if path:
+        with open(path) as f:
+            raw = json.load(f)
+    elif inline:
+        raw = json.loads(inline)
+    else:
+        return {}
+    tenants = {}
+    for name, settings in raw.items():
+        settings = dict(settings)
+        if "api_key_env" in settings:
+            settings["api_key"] = env(settings.pop("api_key_env"))
+        if not settings.get("api_key"):
+            raise ValueError(f"Cliniko tenant {name!r} has no API key")
+        if "access_token_env" in settings:
+            settings["access_token"] = env(settings.pop("access_token_env"))
+        if not settings.get("access_token"):
+            raise ValueError(f"Cliniko tenant {name!r} has no access token")
+        if "shard" in settings:
+            settings.setdefault("base_url", f"https://api.{settings.pop('shard')}.cliniko.com/v1")
+        tenants[name] = settings
+    return tenants
+
+def tenant_tokens(tenants: Dict[str, dict], default_token: str = None) -> Dict[str, str]:
+    """Bearer token -> tenant, with CLINIKO_ACCESS_TOKEN (if set) for the default tenant"""
+    default_token = env("CLINIKO_ACCESS_TOKEN", "") if default_token is None else default_token
+    tokens = {settings["access_token"]: name for name, settings in tenants.items() if settings.get("access_token")}
+    if default_token:
+        tokens[default_token] = DEFAULT_TENANT
+    return tokens
+
+def bearer_token(headers: Mapping[str, str]) -> str:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else ""
+
+def resolve_tenant(headers: Mapping[str, str], tokens: Mapping[str, str]) -> str:
+    """
+    The tenant an HTTP request acts for: the one its `Authorization: Bearer`
+    token belongs to. With no tokens configured there is only the default
+    tenant. TENANT_HEADER may name the tenant too, but must match the token.
+    Raises TenantAuthError otherwise.
+    """
+    requested = headers.get(TENANT_HEADER)
+    if not tokens:
+        if requested and requested != DEFAULT_TENANT:
+            raise TenantAuthError(f"Cliniko tenant {requested!r} needs an access token and none are configured")
+        return DEFAULT_TENANT
+    token = bearer_token(headers).encode()
+    # Compare every token in constant time rather than looking the token up
+    tenant = None
+    for known, name in tokens.items():
+        if hmac.compare_digest(known.encode(), token):
+            tenant = name
+    if tenant is None:
+        raise TenantAuthError("Missing or invalid bearer token")
+    if requested and requested != tenant:
+        raise TenantAuthError(f"The bearer token is not valid for Cliniko tenant {requested!r}")
+    return tenant
+
+_tenant: contextvars.ContextVar = contextvars.ContextVar("cliniko_tenant", default=DEFAULT_TENANT)
+
+def current_tenant() -> str:
+    return _tenant.get()
+
+@contextmanager
+def tenant_scope(tenant: str):
+    """Act for `tenant` inside the block"""
+    token = _tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+class TenantMiddleware(Middleware):
+    """
+    Acts for the tenant resolve_tenant() finds for each MCP HTTP request, and
+    refuses requests without a valid bearer token once tokens are configured.
+    `get_tokens` returns tenant_tokens(); it is called per request, so tenants
+    are only loaded once the first request arrives. Without an HTTP request
+    (stdio) the server acts for the default tenant.
+    """
+
+    def __init__(self, get_tokens: Callable[[], Mapping[str, str]]):
+        self.get_tokens = get_tokens
+
+    async def on_request(self, context, call_next):
+        headers = get_http_headers(include_all=True)
+        if not headers:
+            return await call_next(context)
+        try:
+            tenant = resolve_tenant(headers, self.get_tokens())
+        except TenantAuthError as e:
+            # Answered as a JSON-RPC error rather than logged as a server fault
+            raise MCPError(INVALID_REQUEST, str(e)) from None
+        with tenant_scope(tenant):
+            return await call_next(context)
@@ -0,0 +1,64 @@
+"""
+Shared fixtures: a seeded FakeCliniko (benchmarks/mock_cliniko.py) served
+in-process through httpx.ASGITransport, and a ClinikoClient pointed at it.
+Nothing listens on a port and nothing reaches the real API.
+
+Run from cliniko_mcp_server/:
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cliniko_client  # noqa: E402
+from benchmarks.mock_cliniko import FakeCliniko, create_app  # noqa: E402
+from cliniko_client import ClinikoClient, ClinikoClients  # noqa: E402
+from patient_index import PatientIndex  # noqa: E402
+from rate_limiter import TokenBucket  # noqa: E402
+from revalidation import ValidatorStore  # noqa: E402
+from tenants import DEFAULT_TENANT  # noqa: E402
+
+BASE_URL = "http://cliniko.test/v1"
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def fake():
+    return FakeCliniko(patient_count=20, appointment_count=30, practitioner_count=3, days=2, seed=1)
+
+@pytest.fixture
+def cliniko(fake):
+    """The fake Cliniko app; app.state.stats counts the requests it served"""
+    return create_app(fake=fake)
+
+def make_client(app, transport: httpx.AsyncBaseTransport = None, **kwargs) -> ClinikoClient:
+    kwargs.setdefault("limiter", TokenBucket(rate=10000, capacity=10000))
+    kwargs.setdefault("validators", ValidatorStore(spill_path=""))
+    return ClinikoClient(base_url=BASE_URL, transport=transport or httpx.ASGITransport(app=app), **kwargs)
+
+@pytest.fixture
+async def client(cliniko):
+    async with make_client(cliniko) as client:
+        yield client
+
+@pytest.fixture
+def server(client, monkeypatch):
+    """main.py with the default tenant's client on the fake Cliniko and an in-memory patient index"""
+    import main
+    clients = ClinikoClients()
+    clients._clients[DEFAULT_TENANT] = client
+    monkeypatch.setattr(cliniko_client, "_clients", clients)
+    index = PatientIndex(":memory:")
+    monkeypatch.setattr(main, "get_patient_index", lambda: index)
+    yield main
+    index.close()
+
+def posts(app, resource: str) -> int:
+    return app.state.stats["calls"][f"POST /{resource}"]
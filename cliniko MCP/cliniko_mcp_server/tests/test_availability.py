@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+
+import asyncio
+import gc
+
+from availability import BookingConflict, appointment_interval, format_datetime
+from cliniko_client import linked_id
+
+pytestmark = pytest.mark.anyio
+
+def booking(fake, start, minutes: int = 30, practitioner_id=None) -> dict:
+    return {
+        "patient_id": "1", "practitioner_id": practitioner_id or fake.practitioner_ids[0],
+        "business_id": fake.business_id, "appointment_type_id": "1",
+        "appointment_start": format_datetime(start), "appointment_end": format_datetime(start + timedelta(minutes=minutes)),
+    }
+
+def booked(fake) -> dict:
+    """Any existing appointment, as a booking payload for the same practitioner and slot"""
+    appointment = next(iter(fake.records["appointments"].values()))
+    start, _, appointment_id = appointment_interval(appointment)
+    return appointment_id, booking(fake, start, practitioner_id=linked_id(appointment, "practitioner"))
+
+async def test_overlapping_booking_is_refused_before_posting(client, cliniko, fake):
+    appointment_id, payload = booked(fake)
+    with pytest.raises(BookingConflict) as refused:
+        await client.create_appointment(payload, check_conflicts=True)
+    assert [conflict["appointment_id"] for conflict in refused.value.details()] == [appointment_id]
+    assert cliniko.state.stats["calls"]["POST /appointments"] == 0
+
+async def test_free_slot_is_booked_and_then_blocks_the_next_booking(client, cliniko, fake):
+    _, payload = booked(fake)
+    # The fake books nothing after 17:00 UTC
+    evening = appointment_interval({"appointment_start": payload["appointment_start"][:11] + "20:00:00Z",
+                                    "appointment_end": payload["appointment_start"][:11] + "20:30:00Z"})[0]
+    record = await client.create_appointment(booking(fake, evening, practitioner_id=payload["practitioner_id"]),
+                                             check_conflicts=True)
+    with pytest.raises(BookingConflict) as refused:
+        await client.create_appointment(booking(fake, evening + timedelta(minutes=15),
+                                                practitioner_id=payload["practitioner_id"]), check_conflicts=True)
+    assert [conflict["appointment_id"] for conflict in refused.value.details()] == [record["id"]]
+
+async def test_check_conflicts_off_books_deliberately(client, cliniko, fake):
+    _, payload = booked(fake)
+    await client.create_appointment(payload, check_conflicts=False)
+    assert cliniko.state.stats["calls"]["POST /appointments"] == 1
+
+async def test_deleted_appointment_frees_its_slot(client, fake):
+    appointment_id, payload = booked(fake)
+    with pytest.raises(BookingConflict):
+        await client.create_appointment(payload, check_conflicts=True)
+    await client.delete_appointment(appointment_id)
+    assert (await client.create_appointment(payload, check_conflicts=True))["id"]
+
+@pytest.mark.parametrize("business", ["elsewhere", None])
+async def test_practitioner_is_checked_across_businesses(client, cliniko, fake, business):
+    appointment_id, payload = booked(fake)
+    payload["business_id"] = "999" if business else None
+    if not business:
+        del payload["business_id"]
+    with pytest.raises(BookingConflict) as refused:
+        await client.create_appointment(payload, check_conflicts=True)
+    assert [conflict["appointment_id"] for conflict in refused.value.details()] == [appointment_id]
+    assert cliniko.state.stats["calls"]["POST /appointments"] == 0
+
+async def test_booking_locks_are_released(client, fake):
+    _, payload = booked(fake)
+    evening = appointment_interval({"appointment_start": payload["appointment_start"][:11] + "20:00:00Z",
+                                    "appointment_end": payload["appointment_start"][:11] + "20:30:00Z"})[0]
+    bookings = [booking(fake, evening + timedelta(hours=1) * (i // 3), practitioner_id=practitioner_id)
+                for i, practitioner_id in enumerate(fake.practitioner_ids * 3)]
+    results = await asyncio.gather(*(client.create_appointment(item, check_conflicts=True) for item in bookings),
+                                   return_exceptions=True)
+    assert not any(isinstance(result, BookingConflict) for result in results)
+    gc.collect()
+    assert client.schedules.stats()["booking_locks"] == 0
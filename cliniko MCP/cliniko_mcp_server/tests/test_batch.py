@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from batch import run_batch
+from benchmarks.mock_cliniko import FakeCliniko
+from conftest import posts
+
+pytestmark = pytest.mark.anyio
+
+# The batch tools check for 19-digit Cliniko IDs
+ID_BASE = 1_752_849_000_000_000_000
+
+@pytest.fixture
+def fake():
+    return FakeCliniko(patient_count=5, id_base=ID_BASE)
+
+async def test_one_bad_item_does_not_fail_the_batch(server, cliniko):
+    missing = str(ID_BASE + 999)
+    ids = [str(ID_BASE + 1), "abc", missing, str(ID_BASE + 2)]
+    batch = await server.get_patients(ids)
+    results = batch["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["ok"] for result in results] == [True, False, False, True]
+    assert [results[i]["result"]["id"] for i in (0, 3)] == [ids[0], ids[3]]
+    # Rejected by validation without a request; the missing one failed upstream
+    assert results[1]["error"]["error"] == "Invalid patient_id format. Must be a string of digits."
+    assert "404 Not Found" in results[2]["error"]
+    assert (batch["succeeded"], batch["failed"]) == (2, 2)
+    assert cliniko.state.stats["calls"]["GET /patients/{id}"] == 3
+
+async def test_invalid_creates_are_not_sent(server, cliniko):
+    batch = await server.create_patients([
+        {"first_name": "Ada", "last_name": "Lovelace"},
+        {"first_name": "Grace"},
+        {"first_name": "Alan", "last_name": "Turing", "email": "not-an-email"},
+    ])
+    assert [result["ok"] for result in batch["results"]] == [True, False, False]
+    assert batch["results"][1]["error"]["error"] == "Missing required fields: last_name"
+    assert batch["results"][2]["error"]["validation_errors"] == ["Invalid email format"]
+    assert posts(cliniko, "patients") == 1
+
+async def test_concurrency_is_bounded():
+    in_flight = peak = 0
+
+    async def worker(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if item % 4 == 0:
+            raise ValueError(f"item {item} failed")
+        return item * 2
+
+    batch = await run_batch(list(range(12)), worker, concurrency=3)
+    assert peak == 3
+    assert [result.get("result") for result in batch["results"]] == [None if i % 4 == 0 else i * 2 for i in range(12)]
+    assert batch["results"][8] == {"index": 8, "ok": False, "error": "item 8 failed"}
+    assert (batch["succeeded"], batch["failed"]) == (9, 3)
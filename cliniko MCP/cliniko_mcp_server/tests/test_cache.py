@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+
+from cache import RecordCache
+from conftest import make_client
+
+pytestmark = pytest.mark.anyio
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class GatedTransport(httpx.ASGITransport):
+    """Holds GET responses for `path` until `release` is set"""
+
+    def __init__(self, app, path: str):
+        super().__init__(app=app)
+        self.path = path
+        self.arrived = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def handle_async_request(self, request):
+        response = await super().handle_async_request(request)
+        if request.method == "GET" and request.url.path.endswith(self.path):
+            self.arrived.set()
+            await self.release.wait()
+        return response
+
+def record_gets(app, resource: str) -> int:
+    return app.state.stats["calls"][f"GET /{resource}/{{id}}"]
+
+async def test_entries_expire_after_the_resource_ttl(cliniko):
+    clock = Clock()
+    async with make_client(cliniko, cache=RecordCache({"patients": 60}, clock=clock)) as client:
+        first = await client.get_patient("1")
+        clock.now += 59
+        assert await client.get_patient("1") == first
+        assert record_gets(cliniko, "patients") == 1
+        clock.now += 1
+        await client.get_patient("1")
+        assert record_gets(cliniko, "patients") == 2
+        assert client.cache.stats()["expirations"] == 1
+
+async def test_resources_without_a_ttl_are_not_cached(cliniko):
+    async with make_client(cliniko, cache=RecordCache({"patients": 60})) as client:
+        await client.get_practitioner("1")
+        await client.get_practitioner("1")
+        assert record_gets(cliniko, "practitioners") == 2
+        assert len(client.cache) == 0
+
+async def test_least_recently_used_entry_is_evicted(cliniko):
+    async with make_client(cliniko, cache=RecordCache({"patients": 60}, max_entries=2)) as client:
+        for patient_id in ("1", "2", "1", "3"):
+            await client.get_patient(patient_id)
+        assert record_gets(cliniko, "patients") == 3
+        # 2 was least recently used when 3 arrived
+        await client.get_patient("1")
+        await client.get_patient("3")
+        assert record_gets(cliniko, "patients") == 3
+        await client.get_patient("2")
+        assert record_gets(cliniko, "patients") == 4
+        assert client.cache.stats()["evictions"] == 2
+
+async def test_write_invalidates_the_cached_record(cliniko):
+    async with make_client(cliniko, cache=RecordCache({"patients": 60})) as client:
+        await client.get_patient("1")
+        await client.update_patient("1", {"last_name": "Byron"})
+        assert (await client.get_patient("1"))["last_name"] == "Byron"
+        assert record_gets(cliniko, "patients") == 2
+
+async def test_read_racing_a_write_does_not_cache_the_old_record(cliniko):
+    # The GET is answered before the PUT but lands after it has invalidated the key
+    transport = GatedTransport(cliniko, "/patients/1")
+    async with make_client(cliniko, transport=transport, cache=RecordCache({"patients": 60})) as client:
+        read = asyncio.create_task(client.get_patient("1"))
+        await transport.arrived.wait()
+        await client.update_patient("1", {"last_name": "Byron"})
+        transport.release.set()
+        assert (await read)["last_name"] != "Byron"
+        assert client.cache.get_record("patients", "1") is None
+        assert (await client.get_patient("1"))["last_name"] == "Byron"
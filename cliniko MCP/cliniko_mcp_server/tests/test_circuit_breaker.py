@@ -0,0 +1,69 @@
+import httpx
+import pytest
+
+from benchmarks.mock_cliniko import create_app
+from cache import STALE_MARKER, RecordCache
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreakers, CircuitOpenError
+from conftest import make_client
+from rate_limiter import RetryPolicy
+
+pytestmark = pytest.mark.anyio
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+async def test_breaker_opens_serves_stale_and_closes_after_a_half_open_probe(fake):
+    app = create_app(fake=fake, seed=1)
+    clock = Clock()
+    breakers = CircuitBreakers(min_calls=4, failure_rate=0.5, open_seconds=15, half_open_calls=2, clock=clock)
+    async with make_client(app, cache=RecordCache({"patients": 60}, clock=clock), breakers=breakers) as client:
+        client.read_retry = RetryPolicy(max_retries=0)
+        breaker = breakers.get("patients")
+        cached = await client.get_patient("1")
+        clock.now += 120
+
+        # Every request now fails; the fourth failure reaches the threshold
+        app.state.faults["error_rate"] = 1.0
+        for patient_id in ("2", "3", "4", "5"):
+            assert breaker.state == CLOSED
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get_patient(patient_id)
+        assert breaker.state == OPEN
+
+        # While open, nothing is sent: the expired copy comes back marked stale, a miss fails fast
+        requests = app.state.stats["requests"]
+        stale = await client.get_patient("1")
+        assert stale[STALE_MARKER] is True and stale["_stale_age_seconds"] == 120
+        assert {key: value for key, value in stale.items() if not key.startswith("_")} == cached
+        with pytest.raises(CircuitOpenError):
+            await client.get_patient("2")
+        assert app.state.stats["requests"] == requests
+
+        # After the cooldown, good probes close it again
+        app.state.faults["error_rate"] = 0.0
+        clock.now += 16
+        await client.get_patient("2")
+        assert breaker.state == HALF_OPEN
+        await client.get_patient("3")
+        assert breaker.state == CLOSED
+        assert STALE_MARKER not in await client.get_patient("1")
+
+async def test_failed_half_open_probe_reopens(fake):
+    app = create_app(fake=fake, error_rate=1.0)
+    clock = Clock()
+    breakers = CircuitBreakers(min_calls=2, failure_rate=0.5, open_seconds=15, half_open_calls=1, clock=clock)
+    async with make_client(app, breakers=breakers) as client:
+        client.read_retry = RetryPolicy(max_retries=0)
+        for patient_id in ("1", "2"):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get_patient(patient_id)
+        clock.now += 16
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_patient("3")
+        assert breakers.get("patients").state == OPEN
+        with pytest.raises(CircuitOpenError):
+            await client.get_patient("3")
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from fastmcp import Client
+
+import deadline
+from benchmarks.mock_cliniko import create_app
+from cache import STALE_MARKER, RecordCache
+from circuit_breaker import CLOSED
+from conftest import make_client
+from deadline import DeadlineExceeded, deadline_scope
+from rate_limiter import RetryPolicy, TokenBucket
+
+pytestmark = pytest.mark.anyio
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_inner_scope_never_extends_the_outer_deadline():
+    with deadline_scope(0.5):
+        with deadline_scope(60):
+            assert deadline.remaining() <= 0.5
+        with deadline_scope(0.1):
+            assert deadline.remaining() <= 0.1
+        assert 0.1 < deadline.remaining() <= 0.5
+    assert deadline.remaining() is None
+
+async def test_slow_response_is_cut_off_at_the_deadline_without_tripping_the_breaker(fake):
+    app = create_app(fake=fake, latency=1.0)
+    async with make_client(app) as client:
+        started = time.monotonic()
+        with deadline_scope(0.1), pytest.raises(DeadlineExceeded):
+            await client.get_patient("1")
+        assert time.monotonic() - started < 0.5
+        breaker = client.breakers.get("patients")
+        assert breaker.state == CLOSED and breaker.stats()["window_calls"] == 0
+
+async def test_backoff_longer_than_the_budget_is_not_slept(fake, monkeypatch):
+    app = create_app(fake=fake, error_rate=1.0)
+    async with make_client(app) as client:
+        client.read_retry = RetryPolicy(max_retries=3)
+        monkeypatch.setattr(client.read_retry, "delay", lambda attempt, retry_after=None: 10)
+        started = time.monotonic()
+        with deadline_scope(1.0), pytest.raises(DeadlineExceeded):
+            await client.get_patient("1")
+        assert time.monotonic() - started < 0.5
+        assert app.state.stats["requests"] == 1
+
+async def test_rate_limit_wait_counts_against_the_deadline(cliniko):
+    bucket = TokenBucket(rate=100, capacity=100)
+    bucket.paused_until = bucket.clock() + 10
+    async with make_client(cliniko, limiter=bucket) as client:
+        with deadline_scope(0.1), pytest.raises(DeadlineExceeded):
+            await client.get_patient("1")
+    assert cliniko.state.stats["requests"] == 0
+
+async def test_expired_cache_entry_is_served_stale_when_time_runs_out(fake):
+    app = create_app(fake=fake)
+    clock = Clock()
+    async with make_client(app, cache=RecordCache({"patients": 60}, clock=clock)) as client:
+        cached = await client.get_patient("1")
+        clock.now += 90
+        app.state.faults["latency"] = 1.0
+        with deadline_scope(0.1):
+            stale = await client.get_patient("1")
+    assert stale == {**cached, STALE_MARKER: True, "_stale_age_seconds": 90}
+
+async def test_list_returns_partial_results_and_a_resume_cursor(fake):
+    app = create_app(fake=fake, latency=0.05)
+    async with make_client(app) as client:
+        # Pages of 5 from the cursor; the budget covers some of them but not all four
+        with deadline_scope(0.18):
+            records, cursor, partial = await client.list_page("patients", limit=20, cursor="1:0:5")
+        assert partial is True
+        assert 0 < len(records) < 20 and len(records) % 5 == 0
+        assert cursor == f"{len(records) // 5 + 1}:0:5"
+        rest, next_cursor, partial = await client.list_page("patients", limit=20, cursor=cursor)
+        assert (next_cursor, partial) == (None, False)
+        everything, _, _ = await client.list_page("patients", limit=20)
+    assert records + rest == everything
+
+async def test_no_records_before_the_deadline_is_an_error(fake):
+    app = create_app(fake=fake, latency=1.0)
+    async with make_client(app) as client:
+        with deadline_scope(0.1), pytest.raises(DeadlineExceeded):
+            await client.list_page("patients", limit=20)
+
+async def test_tool_call_gets_its_budget_from_tool_deadlines(server, cliniko, monkeypatch):
+    monkeypatch.setitem(deadline.TOOL_DEADLINES, "list_patients", 0.18)
+    cliniko.state.faults["latency"] = 0.05
+    async with Client(server.app) as mcp:
+        result = await mcp.call_tool("list_patients", {"limit": 20, "cursor": "1:0:5"})
+    assert result.structured_content["partial"] is True
+    assert 0 < len(result.structured_content["patients"]) < 20
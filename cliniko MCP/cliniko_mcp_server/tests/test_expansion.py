@@ -0,0 +1,47 @@
+import pytest
+
+from config.constants import EXPANDABLE_LINKS, PROJECTION_PROFILES
+from expansion import expand_fields, expand_records, parse_expand
+from projection import project
+
+pytestmark = pytest.mark.anyio
+
+def test_parse_expand_all_and_unknown():
+    assert parse_expand("appointments", "all") == ["patient", "practitioner", "appointment_type", "business"]
+    assert parse_expand("appointments", "patient, patient") == ["patient"]
+    with pytest.raises(ValueError):
+        parse_expand("appointments", "invoice")
+
+async def test_expand_inlines_each_linked_record_once(client, cliniko, fake):
+    appointments = list(fake.records["appointments"].values())
+    expanded = await expand_records(client, "appointments", appointments, ["patient", "practitioner"])
+    for original, record in zip(appointments, expanded):
+        patient_id = original["patient"]["links"]["self"].rsplit("/", 1)[-1]
+        assert record["patient"]["id"] == patient_id
+        assert record["patient"]["first_name"] == fake.records["patients"][patient_id]["first_name"]
+    distinct = {(name, record[name]["id"]) for record in expanded for name in ("patient", "practitioner")}
+    assert sum(count for call, count in cliniko.state.stats["calls"].items() if call.endswith("/{id}")) == len(distinct)
+
+async def test_expand_keeps_the_inlined_record_through_projection(client, fake):
+    appointment = next(iter(fake.records["appointments"].values()))
+    [record] = await expand_records(client, "appointments", [appointment], ["patient"])
+    projected = project(record, "appointments", expand_fields("appointments", "id,starts_at", ["patient"]))
+    assert set(projected) == {"id", "starts_at", "patient"}
+    assert projected["patient"]["first_name"]
+
+@pytest.mark.parametrize("resource, profile", [
+    (resource, profile) for resource in EXPANDABLE_LINKS for profile in PROJECTION_PROFILES.get(resource, {})
+])
+@pytest.mark.parametrize("expand", ["patient", "practitioner,business", "all"])
+async def test_expand_survives_every_projection_profile(client, fake, resource, profile, expand):
+    names = parse_expand(resource, expand)
+    record = next(iter(fake.records[resource].values()))
+    [expanded] = await expand_records(client, resource, [record], names)
+    projected = project(expanded, resource, expand_fields(resource, profile, names))
+    for name in names:
+        linked = fake.records[EXPANDABLE_LINKS[resource][name]][projected[name]["id"]]
+        assert projected[name] == linked
+    unexpanded = project(record, resource, profile)
+    for key, value in unexpanded.items():
+        if key not in names:
+            assert projected[key] == value
@@ -0,0 +1,102 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+import cliniko_client
+from benchmarks.mock_cliniko import create_app
+from conftest import make_client
+from export import export_pages, export_to_file, resume_cursor
+from serialization import loads
+
+pytestmark = pytest.mark.anyio
+
+class DropAfter(httpx.AsyncBaseTransport):
+    """Serves `requests` requests, then fails every one like a lost connection"""
+
+    def __init__(self, app, requests: int):
+        self.inner = httpx.ASGITransport(app=app)
+        self.requests = requests
+
+    async def handle_async_request(self, request):
+        if self.requests <= 0:
+            raise RuntimeError("connection lost")
+        self.requests -= 1
+        return await self.inner.handle_async_request(request)
+
+def ids(path: str) -> list:
+    with open(path, "rb") as f:
+        return [loads(line)["id"] for line in f]
+
+async def test_streamed_export_resumes_after_the_records_received(client, fake):
+    received = []
+    async for chunk, records, _ in export_pages(client, "patients", per_page=7):
+        received.extend(loads(line)["id"] for line in chunk.splitlines())
+        if len(received) >= 10:
+            break
+    # Only the first 9 records arrived intact
+    received = received[:9]
+    async for chunk, _, _ in export_pages(client, "patients", cursor=resume_cursor(9, per_page=7)):
+        received.extend(loads(line)["id"] for line in chunk.splitlines())
+    assert received == list(fake.records["patients"])
+
+async def test_interrupted_file_export_resumes_from_its_checkpoint(cliniko, fake, tmp_path):
+    path = str(tmp_path / "patients.ndjson")
+    async with make_client(cliniko, DropAfter(cliniko, requests=2)) as broken:
+        with pytest.raises(RuntimeError):
+            await export_to_file(broken, "patients", path=path, per_page=6)
+    # Half a page written after the last checkpoint is cut off on resume
+    with open(path, "ab") as f:
+        f.write(b'{"id": "torn')
+    async with make_client(cliniko) as client:
+        checkpoint = await export_to_file(client, "patients", path=path, per_page=6)
+    assert checkpoint["resumed_from"] and checkpoint["complete"]
+    assert checkpoint["records"] == len(fake.records["patients"])
+    assert ids(path) == list(fake.records["patients"])
+    assert os.path.getsize(path) == checkpoint["bytes"]
+
+async def test_csv_export_has_one_header(client, fake, tmp_path):
+    path = str(tmp_path / "patients.csv")
+    await export_to_file(client, "patients", "csv", path=path, per_page=6)
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith("id,first_name")
+    assert len(lines) == len(fake.records["patients"]) + 1
+
+async def get_export(server, path: str, token: str = "export-token") -> httpx.Response:
+    transport = httpx.ASGITransport(app=server.app.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as http:
+        return await http.get(path, headers={"Authorization": f"Bearer {token}"})
+
+async def test_http_export_is_off_by_default_and_needs_a_token(server, monkeypatch):
+    assert (await get_export(server, "/export/patients")).status_code == 404
+    monkeypatch.setattr(server, "EXPORT_HTTP_ENABLED", True)
+    # Enabled, but with no access tokens configured there is nothing to authenticate against
+    assert (await get_export(server, "/export/patients")).status_code == 403
+    cliniko_client.get_clients().tokens = {"export-token": "default"}
+    assert (await get_export(server, "/export/patients", token="guess")).status_code == 401
+    assert (await get_export(server, "/export/patients")).status_code == 200
+
+@pytest.mark.parametrize("per_page, status, used", [("0", 200, "1"), ("-5", 200, "1"), ("1000", 200, "100"),
+                                                    ("abc", 400, None)])
+async def test_http_export_per_page_is_clamped(server, monkeypatch, per_page, status, used):
+    monkeypatch.setattr(server, "EXPORT_HTTP_ENABLED", True)
+    cliniko_client.get_clients().tokens = {"export-token": "default"}
+    response = await get_export(server, f"/export/patients?per_page={per_page}")
+    assert response.status_code == status
+    assert response.headers.get("X-Export-Per-Page") == used
+
+async def test_concurrent_exports_to_one_file_do_not_interleave(fake, tmp_path):
+    # Latency keeps both exports mid-listing at the same time; their output differs, so any mixing shows
+    app = create_app(fake=fake, latency=0.01)
+    path = str(tmp_path / "patients.ndjson")
+    async with make_client(app) as client:
+        first, second = await asyncio.gather(export_to_file(client, "patients", fields="id", path=path, per_page=4),
+                                             export_to_file(client, "patients", path=path, per_page=4))
+    assert first["complete"] and second["complete"]
+    # The second waited for the first, then started over with its own query
+    with open(path, "rb") as f:
+        records = [loads(line) for line in f]
+    assert [record["id"] for record in records] == list(fake.records["patients"])
+    assert all("first_name" in record for record in records)
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from conftest import make_client, posts
+from idempotency import REPLAY_MARKER, IdempotencyConflict, IdempotencyStore
+
+pytestmark = pytest.mark.anyio
+
+PATIENT = {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com"}
+
+async def test_retry_with_key_replays_the_first_record(client, cliniko):
+    first = await client.create_patient(PATIENT, "key-1")
+    retry = await client.create_patient(PATIENT, "key-1")
+    assert posts(cliniko, "patients") == 1
+    assert retry["id"] == first["id"]
+    assert retry[REPLAY_MARKER] is True
+    assert REPLAY_MARKER not in first
+
+async def test_concurrent_retries_share_one_post(client, cliniko):
+    results = await asyncio.gather(*(client.create_patient(PATIENT, "key-1") for _ in range(5)))
+    assert posts(cliniko, "patients") == 1
+    assert len({record["id"] for record in results}) == 1
+
+async def test_key_reused_with_another_payload_is_refused(client, cliniko):
+    await client.create_patient(PATIENT, "key-1")
+    with pytest.raises(IdempotencyConflict):
+        await client.create_patient({**PATIENT, "first_name": "Grace"}, "key-1")
+    assert posts(cliniko, "patients") == 1
+
+async def test_distinct_keys_create_distinct_records(client, cliniko):
+    first = await client.create_patient(PATIENT, "key-1")
+    second = await client.create_patient(PATIENT, "key-2")
+    assert posts(cliniko, "patients") == 2
+    assert first["id"] != second["id"]
+
+async def test_identical_creates_without_a_key_are_all_sent(client, cliniko):
+    first = await client.create_patient(PATIENT)
+    second = await client.create_patient(PATIENT)
+    assert posts(cliniko, "patients") == 2
+    assert first["id"] != second["id"] and REPLAY_MARKER not in second
+
+async def test_payload_dedupe_only_merges_within_its_window(cliniko):
+    now = [0.0]
+    store = IdempotencyStore(window=600, payload_window=30, clock=lambda: now[0])
+    async with make_client(cliniko, idempotency=store) as client:
+        first = await client.create_patient(PATIENT)
+        assert (await client.create_patient(PATIENT))["id"] == first["id"]
+        now[0] += 31
+        assert (await client.create_patient(PATIENT))["id"] != first["id"]
+    assert posts(cliniko, "patients") == 2
+
+async def test_deleted_record_is_never_replayed(cliniko, fake):
+    store = IdempotencyStore(window=600, payload_window=30)
+    async with make_client(cliniko, idempotency=store) as client:
+        for key in ("key-1", None):
+            first = await client.create_patient(PATIENT, key)
+            await client.delete_patient(first["id"])
+            second = await client.create_patient(PATIENT, key)
+            assert REPLAY_MARKER not in second
+            assert second["id"] in fake.records["patients"]
+    assert posts(cliniko, "patients") == 4
+    assert store.invalidations == 2
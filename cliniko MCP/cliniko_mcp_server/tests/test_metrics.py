@@ -0,0 +1,72 @@
+"""
+Metric types in the /metrics exposition (cumulative collector samples are
+counters, current levels gauges), and the labels a caller can influence:
+tool names and tenants.
+"""
+
+import re
+
+import httpx
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+
+import cliniko_client
+from metrics import TOOL_CALLS, UNKNOWN_TOOL, Metric, Registry, client_collector, warmer_collector
+
+pytestmark = pytest.mark.anyio
+
+def types(text: str) -> dict:
+    return dict(re.findall(r"^# TYPE (\S+) (\S+)$", text, re.MULTILINE))
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        Metric("cliniko_test", "abstract")
+
+async def test_client_counters_typed_counter(client):
+    await client.get_patient("1")
+    registry = Registry()
+    registry.add_collector("cliniko", "client", client_collector(client))
+    typed = types(registry.render())
+    assert typed["cliniko_cache_hits_total"] == "counter"
+    assert typed["cliniko_rate_limiter_acquired_total"] == "counter"
+    assert typed["cliniko_idempotency_creates_total"] == "counter"
+    assert typed["cliniko_cache_entries"] == "gauge"
+    assert typed["cliniko_cache_hit_ratio"] == "gauge"
+    assert typed["cliniko_rate_limiter_tokens"] == "gauge"
+    assert all(kind == "counter" for name, kind in typed.items() if name.endswith("_total"))
+    assert all(kind == "gauge" for name, kind in typed.items() if not name.endswith("_total"))
+
+def test_warmer_runs_typed_counter():
+    class Warmer:
+        def status(self):
+            return {"runs": 3, "hits_since_warm": {"patients": {"hit_ratio": 0.5}}}
+    registry = Registry()
+    registry.add_collector("cliniko_warmer", "warmer", warmer_collector(Warmer()))
+    text = registry.render()
+    assert types(text) == {"cliniko_warmer_runs_total": "counter", "cliniko_warmer_hit_ratio": "gauge"}
+    assert "cliniko_warmer_runs_total 3\n" in text
+
+async def test_unregistered_tool_names_share_one_label(server):
+    async with Client(server.app) as mcp:
+        await mcp.call_tool("get_patient", {"patient_id": 1})
+        for name in ("made_up_1", "made_up_2"):
+            with pytest.raises(ToolError):
+                await mcp.call_tool(name, {})
+    tools = {labels[0] for labels in TOOL_CALLS._values}
+    assert "get_patient" in tools and UNKNOWN_TOOL in tools
+    assert not tools & {"made_up_1", "made_up_2"}
+
+@pytest.mark.parametrize("token, shown", [(None, set()), ("guess", set()), ("north-token", {"north"}),
+                                          ("default-token", {"north", "sydney"})])
+async def test_tenant_names_need_a_bearer_token(server, client, token, shown):
+    clients = cliniko_client.get_clients()
+    clients._clients.update(north=client, sydney=client)
+    clients.tokens = {"north-token": "north", "sydney-token": "sydney", "default-token": "default"}
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    transport = httpx.ASGITransport(app=server.app.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as http:
+        health = (await http.get("/health", headers=headers)).json()
+        metrics = (await http.get("/metrics", headers=headers)).text
+    assert set(health["tenants"]) == shown
+    assert set(re.findall(r'tenant="(\w+)"', metrics)) == shown
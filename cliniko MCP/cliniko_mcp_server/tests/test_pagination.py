@@ -0,0 +1,58 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+async def all_ids(client) -> list:
+    records, next_cursor, _ = await client.list_page("patients", limit=100)
+    assert next_cursor is None
+    return [record["id"] for record in records]
+
+async def walk(client, limits) -> list:
+    """Follow next_cursor with the given limit for each call; (page sizes, ids, last cursor)"""
+    sizes, ids, cursor = [], [], ""
+    for limit in limits:
+        records, cursor, partial = await client.list_page("patients", limit=limit, cursor=cursor)
+        assert not partial
+        sizes.append(len(records))
+        ids.extend(record["id"] for record in records)
+        if cursor is None:
+            break
+    return sizes, ids, cursor
+
+@pytest.mark.parametrize("limit, sizes", [
+    (3, [3, 3, 3, 3, 3, 3, 2]),
+    (7, [7, 7, 6]),
+    (10, [10, 10]),
+    (20, [20]),
+    (30, [20]),
+])
+async def test_cursor_walk_returns_every_record_once(client, limit, sizes):
+    got_sizes, ids, cursor = await walk(client, [limit] * 10)
+    assert got_sizes == sizes
+    assert ids == await all_ids(client)
+    assert cursor is None
+
+async def test_limit_may_change_between_cursors(client):
+    # The cursor keeps the first call's per_page; later limits only change how much is returned
+    sizes, ids, cursor = await walk(client, [7, 5, 4, 10])
+    assert sizes == [7, 5, 4, 4]
+    assert ids == await all_ids(client)
+    assert cursor is None
+
+async def test_cursor_mid_page_resumes_at_the_offset(client):
+    _, cursor, _ = await client.list_page("patients", limit=4)
+    records, cursor, _ = await client.list_page("patients", limit=2, cursor=cursor)
+    assert cursor == "2:2:4"
+    assert [record["id"] for record in records] == (await all_ids(client))[4:6]
+
+@pytest.mark.parametrize("cursor", ["abc", "1:0", "0:0:10", "1:-1:10", "1:0:0", "1:0:1000", "1:a:10"])
+async def test_malformed_cursor_is_a_tool_error(server, cursor):
+    result = await server.list_patients(cursor=cursor)
+    assert result == {"error": f"Invalid cursor: {cursor!r}", "patients": []}
+
+@pytest.mark.parametrize("prefetch", [False, True])
+async def test_iter_pages_flags_the_last_page(client, cliniko, prefetch):
+    pages = [(page, len(records), has_next)
+             async for page, records, has_next in client.iter_pages("patients", per_page=7, prefetch=prefetch)]
+    assert pages == [(1, 7, True), (2, 7, True), (3, 6, False)]
+    assert cliniko.state.stats["calls"]["GET /patients"] == 3
@@ -0,0 +1,51 @@
+import pytest
+
+import cliniko_client
+from benchmarks.mock_cliniko import FakeCliniko
+from tenants import DEFAULT_TENANT, tenant_scope
+
+pytestmark = pytest.mark.anyio
+
+# The batch tools check for 19-digit Cliniko IDs
+ID_BASE = 1_752_849_000_000_000_000
+
+PATIENT = {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com"}
+
+@pytest.fixture
+def fake():
+    return FakeCliniko(patient_count=5, id_base=ID_BASE)
+
+def indexed_ids(server, query: str) -> list:
+    return [patient["id"] for patient in server.get_patient_index().search(query)]
+
+async def test_created_patient_is_found_in_the_index(server):
+    record = await server.create_patient(PATIENT)
+    assert indexed_ids(server, "Lovelace") == [record["id"]]
+    assert (await server.search_patients("ada@example.com")).structured_content["source"] == "index"
+
+async def test_update_replaces_the_indexed_patient(server):
+    record = await server.create_patient(PATIENT)
+    await server.update_patient(int(record["id"]), {"last_name": "Byron"})
+    assert indexed_ids(server, "Lovelace") == []
+    assert indexed_ids(server, "Byron") == [record["id"]]
+
+async def test_deleted_patient_leaves_the_index(server):
+    record = await server.create_patient(PATIENT)
+    await server.delete_patient(int(record["id"]))
+    assert indexed_ids(server, "Lovelace") == []
+
+async def test_batch_writes_are_indexed(server):
+    created = await server.create_patients([PATIENT, {**PATIENT, "first_name": "Grace", "email": "grace@example.com"}])
+    ids = [result["result"]["id"] for result in created["results"]]
+    updated = await server.update_patients([{"patient_id": ids[1], "patient": {"last_name": "Hopper"}}])
+    assert updated["results"][0]["ok"]
+    assert indexed_ids(server, "Lovelace") == [ids[0]]
+    assert indexed_ids(server, "Hopper") == [ids[1]]
+
+async def test_other_tenants_are_not_indexed(server):
+    clients = cliniko_client.get_clients()
+    clients.tenants["north"] = {"api_key": "north-key"}
+    clients._clients["north"] = clients.get(DEFAULT_TENANT)
+    with tenant_scope("north"):
+        await server.create_patient(PATIENT)
+    assert indexed_ids(server, "Lovelace") == []
@@ -0,0 +1,11 @@
+from projection import _compile, compile_fields, project
+
+def test_compiled_field_trees_are_bounded():
+    _compile.cache_clear()
+    for i in range(1000):
+        assert project({"id": "1", f"field{i}": i}, "patients", f"id,field{i}") == {"id": "1", f"field{i}": i}
+    assert _compile.cache_info().currsize == _compile.cache_info().maxsize == 256
+
+def test_compile_fields_nests_dotted_paths():
+    assert compile_fields(["id", "patient.links.self"]) == {"id": None, "patient": {"links": {"self": None}}}
+    assert compile_fields(["patient", "patient.links.self"]) == {"patient": None}
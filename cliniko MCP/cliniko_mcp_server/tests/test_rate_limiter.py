@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.mock_cliniko import create_app
+from conftest import make_client
+from rate_limiter import RetryPolicy, TokenBucket
+
+pytestmark = pytest.mark.anyio
+
+async def test_429_halves_the_rate_pauses_and_successes_win_it_back(fake):
+    app = create_app(fake=fake, rate_limit=1)
+    bucket = TokenBucket(rate=100, capacity=100)
+    async with make_client(app, limiter=bucket) as client:
+        client.read_retry = RetryPolicy(max_retries=1)
+        # Start early in a fake-Cliniko second so both requests land in the same one
+        while time.monotonic() % 1 > 0.5:
+            await asyncio.sleep(0.05)
+        await client.get_patient("1")
+        started = time.monotonic()
+        record = await client.get_patient("2")
+        assert record["id"] == "2"
+        # Retry-After: 1 paused the bucket; the retry went out in the next second
+        assert time.monotonic() - started >= 0.9
+        assert app.state.stats["throttled"] == 1
+        assert bucket.throttled == 1
+        assert bucket.rate == 50 + 100 / 50
+    for _ in range(30):
+        bucket.on_success()
+    assert bucket.rate == 100
+
+async def test_rate_never_drops_below_the_floor():
+    bucket = TokenBucket(rate=100, capacity=10, min_rate=20)
+    for _ in range(5):
+        bucket.on_throttle()
+    assert bucket.rate == 20
+
+async def test_background_reads_wait_for_queued_tool_calls():
+    bucket = TokenBucket(rate=1000, capacity=100, background_reserve=0)
+    bucket.paused_until = bucket.clock() + 0.05
+    order = []
+
+    async def take(label, background=False):
+        await bucket.acquire(background)
+        order.append(label)
+
+    # The background read asks first, but every tool call queued behind the pause goes ahead of it
+    background = asyncio.create_task(take("warm", background=True))
+    await asyncio.sleep(0)
+    await asyncio.gather(*(take(f"tool {n}") for n in range(10)), background)
+    assert order == [f"tool {n}" for n in range(10)] + ["warm"]
+
+async def test_background_reads_leave_the_reserve_for_tool_calls(cliniko):
+    bucket = TokenBucket(rate=0.001, capacity=4, background_reserve=2)
+    async with make_client(cliniko, limiter=bucket) as client:
+        await client.prefetch_record("patients", "1")
+        await client.prefetch_record("patients", "2")
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(client.prefetch_record("patients", "3"), 0.1)
+        # Two tokens are left and a tool call still gets one at once
+        assert round(bucket.tokens) == 2
+        await asyncio.wait_for(client.get_patient("4"), 0.1)
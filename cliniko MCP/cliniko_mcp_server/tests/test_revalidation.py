@@ -0,0 +1,85 @@
+import pytest
+
+from benchmarks.mock_cliniko import create_app
+from cache import RecordCache
+from conftest import make_client
+from revalidation import ValidatorStore
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def app(fake):
+    return create_app(fake=fake, etags=True)
+
+def uncached(app, validators: ValidatorStore):
+    """Every read goes upstream, so only the validators decide what is re-sent"""
+    return make_client(app, cache=RecordCache({}), validators=validators)
+
+async def test_repeat_read_is_a_conditional_get_answered_with_304(app):
+    validators = ValidatorStore(spill_path="")
+    async with uncached(app, validators) as client:
+        first = await client.get_patient("1")
+        assert await client.get_patient("1") == first
+    assert app.state.stats["not_modified"] == 1
+    stats = validators.stats()
+    assert (stats["revalidations"], stats["not_modified"]) == (1, 1)
+    assert stats["bytes_saved"] == validators.get("patients", "1").size > 0
+
+async def test_changed_record_is_sent_again(app, fake):
+    validators = ValidatorStore(spill_path="")
+    async with uncached(app, validators) as client:
+        await client.get_patient("1")
+        fake.records["patients"]["1"]["last_name"] = "Byron"
+        assert (await client.get_patient("1"))["last_name"] == "Byron"
+        assert await client.get_patient("1")
+    assert validators.stats()["revalidations"] == 2
+    assert app.state.stats["not_modified"] == 1
+
+async def test_write_drops_the_validators(app):
+    validators = ValidatorStore(spill_path="")
+    async with uncached(app, validators) as client:
+        await client.get_patient("1")
+        await client.update_patient("1", {"last_name": "Byron"})
+        assert validators.get("patients", "1") is None
+        assert (await client.get_patient("1"))["last_name"] == "Byron"
+    assert validators.stats()["revalidations"] == 0
+
+async def record_size(app) -> int:
+    async with uncached(app, ValidatorStore(spill_path="")) as client:
+        await client.get_patient("1")
+        return client.validators.get("patients", "1").size
+
+async def test_evicted_validators_spill_to_sqlite_and_come_back(app, tmp_path):
+    path = str(tmp_path / "validators.db")
+    # Room for about one record in memory; the rest go to SQLite
+    max_bytes = await record_size(app) * 3 // 2
+    validators = ValidatorStore(max_bytes=max_bytes, spill_path=path)
+    async with uncached(app, validators) as client:
+        for patient_id in ("1", "2", "3", "4"):
+            await client.get_patient(patient_id)
+        assert validators.stats()["entries"] == 1
+        assert validators.stats()["spilled_entries"] == 3
+        await client.get_patient("1")
+    stats = validators.stats()
+    assert (stats["spill_hits"], stats["not_modified"]) == (1, 1)
+    # Promoted back to memory, which pushed 4 out to SQLite in its place
+    assert (stats["entries"], stats["spilled_entries"]) == (1, 3)
+    validators.close()
+
+    # Spilled validators outlive the process
+    validators = ValidatorStore(max_bytes=max_bytes, spill_path=path)
+    async with uncached(app, validators) as client:
+        await client.get_patient("2")
+    assert validators.stats()["not_modified"] == 1
+    validators.close()
+
+async def test_spill_keeps_only_the_newest_entries(app, tmp_path):
+    validators = ValidatorStore(max_bytes=await record_size(app) * 3 // 2,
+                                spill_path=str(tmp_path / "validators.db"), spill_max_entries=2)
+    async with uncached(app, validators) as client:
+        for patient_id in ("1", "2", "3", "4", "5", "6"):
+            await client.get_patient(patient_id)
+    assert validators.stats()["spilled_entries"] == 2
+    assert [validators.get("patients", patient_id) is not None for patient_id in ("1", "2", "3", "4", "5")] == \
+        [False, False, False, True, True]
+    validators.close()
@@ -0,0 +1,56 @@
+import json
+import logging
+from datetime import date
+
+import pytest
+
+from serialization import codec, tool_result
+
+RECORD = {
+    "id": "1764028746571981724",
+    "first_name": "Zoë",
+    "last_name": "Ōtsuka 大塚",
+    "notes": "line one\nline two \"quoted\" \\ tab\t",
+    "balance": -12.5,
+    "visits": 2**53,
+    "archived_at": None,
+    "accepted_privacy_policy": True,
+    "patient_phone_numbers": [{"number": "+44 20 7946 0958", "phone_type": "Mobile"}],
+    "links": {"self": "https://api.uk2.cliniko.com/v1/patients/1764028746571981724"},
+    "empty": {"list": [], "object": {}},
+}
+
+def installed(name: str) -> bool:
+    return codec(name).name == name
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec", "json"])
+def test_round_trip_matches_the_stdlib(name):
+    if not installed(name):
+        pytest.skip(f"{name} is not installed")
+    json_codec = codec(name)
+    text = json_codec.dumps(RECORD)
+    assert json_codec.loads(text) == RECORD
+    assert json_codec.loads(text.encode()) == RECORD
+    # Interchangeable with the fallback in both directions
+    assert json.loads(text) == RECORD
+    assert json_codec.loads(codec("json").dumps(RECORD)) == RECORD
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec", "json"])
+def test_non_json_values_are_stringified_like_the_stdlib(name):
+    if not installed(name):
+        pytest.skip(f"{name} is not installed")
+    value = {"day": date(2025, 9, 5), "ids": ["1", "2"]}
+    assert json.loads(codec(name).dumps(value)) == json.loads(codec("json").dumps(value)) == {
+        "day": "2025-09-05", "ids": ["1", "2"],
+    }
+
+def test_unknown_backend_falls_back_to_the_stdlib(caplog):
+    with caplog.at_level(logging.WARNING, logger="serialization"):
+        assert codec("yaml").name == "json"
+    assert caplog.messages == ["Unknown CLINIKO_JSON_BACKEND 'yaml'"]
+
+def test_tool_result_text_is_the_encoded_structured_content():
+    result = tool_result({"patients": [RECORD], "next_cursor": None}, codec("json"), passthrough=True)
+    assert result.structured_content == {"patients": [RECORD], "next_cursor": None}
+    assert json.loads(result.content[0].text) == result.structured_content
+    assert tool_result({"patients": []}, passthrough=False) == {"patients": []}
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from cliniko_client import ClinikoClient, client_settings
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def fresh_settings():
+    client_settings.cache_clear()
+    yield
+    client_settings.cache_clear()
+
+def test_client_settings_are_read_when_the_first_client_is_created(monkeypatch, fresh_settings):
+    monkeypatch.setenv("CLINIKO_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("CLINIKO_PER_PAGE", "25")
+    client = ClinikoClient(base_url="http://cliniko.test/v1")
+    assert client.limits.max_connections == 7
+    assert client.per_page == 25
+
+def test_importing_main_creates_no_clients_or_files(tmp_path):
+    # A clean environment and an empty working directory: nothing may be configured or written on import
+    check = ("import cliniko_client, main; "
+             "assert cliniko_client._clients is None; "
+             "assert main.get_patient_index.cache_info().currsize == 0")
+    subprocess.run([sys.executable, "-c", check], cwd=tmp_path, check=True,
+                   env={"PATH": os.environ.get("PATH", ""), "PYTHONPATH": SERVER_DIR})
+    assert not os.listdir(tmp_path)
+
+def test_health_probe_with_sync_off_writes_no_files(tmp_path):
+    check = ("import asyncio, httpx, main\n"
+             "async def probe():\n"
+             "    transport = httpx.ASGITransport(app=main.app.http_app())\n"
+             "    async with httpx.AsyncClient(transport=transport, base_url='http://mcp') as http:\n"
+             "        response = await http.get('/health')\n"
+             "    assert response.status_code == 200 and response.json()['sync'] is None\n"
+             "asyncio.run(probe())\n"
+             "assert main.get_patient_index.cache_info().currsize == main.get_record_store.cache_info().currsize == 0")
+    subprocess.run([sys.executable, "-c", check], cwd=tmp_path, check=True,
+                   env={"PATH": os.environ.get("PATH", ""), "PYTHONPATH": SERVER_DIR})
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+from benchmarks.mock_cliniko import create_app
+from conftest import make_client
+
+pytestmark = pytest.mark.anyio
+
+CALLS = {
+    "get_patient": lambda client: client.get_patient("1"),
+    "list_patients": lambda client: client.list_patients(max_records=20),
+}
+
+@pytest.mark.parametrize("call", CALLS)
+@pytest.mark.parametrize("coalesce, hits", [(True, 1), (False, 100)])
+async def test_concurrent_identical_reads(fake, call, coalesce, hits):
+    # Latency keeps all 100 reads in flight together, as a burst of tool calls would be
+    app = create_app(fake=fake, latency=0.02)
+    async with make_client(app, coalesce=coalesce) as client:
+        results = await asyncio.gather(*(CALLS[call](client) for _ in range(100)))
+    assert all(result == results[0] for result in results)
+    assert app.state.stats["requests"] == hits
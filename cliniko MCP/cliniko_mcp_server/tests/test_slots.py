@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from availability import MAX_SLOTS, find_available_slots
+from benchmarks.mock_cliniko import FakeCliniko
+
+pytestmark = pytest.mark.anyio
+
+# A Monday two weeks out, so no slot is in the past
+MONDAY = (datetime.now(timezone.utc) + timedelta(days=14 - datetime.now(timezone.utc).weekday())).replace(
+    hour=0, minute=0, second=0, microsecond=0)
+
+@pytest.fixture
+def fake():
+    return FakeCliniko(patient_count=2, appointment_count=0, practitioner_count=1, seed=1)
+
+def book(fake, hour: float, minutes: int, day: datetime = MONDAY):
+    starts_at = day + timedelta(hours=hour)
+    appointment_id = fake.next_id("appointments")
+    fake._put("appointments", fake.make_appointment(int(appointment_id), "1", fake.practitioner_ids[0], starts_at,
+                                                    starts_at + timedelta(minutes=minutes)))
+
+def at(day: datetime, hour: float) -> str:
+    return (day + timedelta(hours=hour)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+async def test_slots_fill_the_gaps_between_bookings(client, fake):
+    book(fake, 10, 60)
+    book(fake, 11.5, 30)
+    slots = await find_available_slots(client, fake.practitioner_ids[0], MONDAY.date().isoformat(), "consultation")
+    # 09:00 fits before the first booking; 11:00-11:30 is too short for an hour; then every 15 minutes from 12:00
+    assert slots[0] == {"start": at(MONDAY, 9), "end": at(MONDAY, 10)}
+    assert [slot["start"] for slot in slots[1:]] == [at(MONDAY, 12 + quarter / 4) for quarter in range(17)]
+    assert slots[-1]["end"] == at(MONDAY, 17)
+
+async def test_weekends_have_no_slots(client, fake):
+    saturday, sunday = (MONDAY + timedelta(days=n) for n in (5, 6))
+    slots = await find_available_slots(client, fake.practitioner_ids[0], f"{MONDAY.date()}/{sunday.date()}", "240")
+    days = {slot["start"][:10] for slot in slots}
+    assert days == {(MONDAY + timedelta(days=n)).date().isoformat() for n in range(5)}
+    assert await find_available_slots(client, fake.practitioner_ids[0], f"{saturday.date()}/{sunday.date()}", "240") == []
+
+async def test_slots_are_capped_at_max_slots(client, fake):
+    slots = await find_available_slots(client, fake.practitioner_ids[0],
+                                       f"{MONDAY.date()}/{(MONDAY + timedelta(days=11)).date()}", "short")
+    assert len(slots) == MAX_SLOTS
+    assert slots == sorted(slots, key=lambda slot: slot["start"])
+
+async def test_no_slot_starts_in_the_past(client, fake):
+    now = MONDAY + timedelta(hours=10, minutes=7)
+    slots = await find_available_slots(client, fake.practitioner_ids[0], MONDAY.date().isoformat(), "60", now=now)
+    assert slots[0]["start"] == at(MONDAY, 10.25)
+    evening = MONDAY + timedelta(hours=18)
+    assert await find_available_slots(client, fake.practitioner_ids[0], MONDAY.date().isoformat(), "60",
+                                      now=evening) == []
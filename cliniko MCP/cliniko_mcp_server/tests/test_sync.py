@@ -0,0 +1,44 @@
+import pytest
+
+from patient_index import PatientIndex
+from sync import DeltaSync, RecordStore
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def stores():
+    stores = {"patients": PatientIndex(":memory:"), "appointments": RecordStore(":memory:")}
+    yield stores
+    for store in stores.values():
+        store.close()
+
+def by_email(index: PatientIndex, patient_id: str) -> list:
+    return index.find_by_email(f"patient{patient_id}@example.com")
+
+async def test_delta_passes_apply_changes_and_reconcile_drops_deletions(client, fake, stores):
+    index, store = stores["patients"], stores["appointments"]
+    sync = DeltaSync(client, stores, reconcile_every=2)
+    await sync.sync_all()
+    assert index.ids("patients") == set(fake.records["patients"])
+    assert store.ids("appointments") == set(fake.records["appointments"])
+    await client.get_patient(next(iter(fake.records["patients"])))
+    deleted = fake.delete("patients", 3) + [next(iter(fake.records["patients"]))]
+    del fake.records["patients"][deleted[-1]]
+    deleted_appointments = fake.delete("appointments", 4)
+    changed = fake.mutate("patients", 2)[:2]
+
+    # A delta pass applies the changes but never hears of the deletions
+    await sync.sync_all()
+    assert all(by_email(index, patient_id)[0].get("revision") == 1 for patient_id in changed)
+    assert set(deleted) <= index.ids("patients")
+    assert sync.status()["patients"]["removed_total"] == 0
+
+    # The next pass lists everything and drops what Cliniko no longer returns
+    await sync.sync_all()
+    assert index.ids("patients") == set(fake.records["patients"])
+    assert store.ids("appointments") == set(fake.records["appointments"])
+    assert not any(by_email(index, patient_id) for patient_id in deleted)
+    assert all(store.get("appointments", appointment_id) is None for appointment_id in deleted_appointments)
+    assert client.cache.get_record("patients", deleted[-1]) is None
+    assert sync.status()["patients"]["removed_total"] == 4
+    assert sync.status()["appointments"]["removed_total"] == 4
@@ -0,0 +1,107 @@
+import httpx
+import pytest
+from mcp.shared.exceptions import MCPError
+
+import cliniko_client
+import tenants
+from benchmarks.mock_cliniko import FakeCliniko, create_app
+from cliniko_client import ClinikoClients
+from conftest import make_client
+from tenants import (
+    DEFAULT_TENANT, TenantAuthError, TenantMiddleware, UnknownTenantError, current_tenant, load_tenants,
+    resolve_tenant, shard_base_url, tenant_scope, tenant_tokens,
+)
+
+pytestmark = pytest.mark.anyio
+
+TENANTS = ('{"north": {"api_key_env": "NORTH_CLINIKO_KEY", "access_token_env": "NORTH_MCP_TOKEN"},'
+           ' "sydney": {"api_key": "key-au4", "access_token": "sydney-token", "max_connections": 5}}')
+TOKENS = {"north-token": "north", "sydney-token": "sydney", "default-token": DEFAULT_TENANT}
+
+def bearer(token: str, **headers) -> dict:
+    return {"authorization": f"Bearer {token}", **headers}
+
+def test_load_tenants_reads_keys_from_the_environment(monkeypatch):
+    monkeypatch.setenv("NORTH_CLINIKO_KEY", "north-key-uk2")
+    monkeypatch.setenv("NORTH_MCP_TOKEN", "north-token")
+    configured = load_tenants(TENANTS, "")
+    assert configured["north"]["api_key"] == "north-key-uk2"
+    assert tenant_tokens(configured, "default-token") == TOKENS
+    monkeypatch.delenv("NORTH_CLINIKO_KEY")
+    with pytest.raises(ValueError):
+        load_tenants(TENANTS, "")
+
+def test_tenants_without_an_access_token_are_refused():
+    with pytest.raises(ValueError, match="access token"):
+        load_tenants('{"north": {"api_key": "north-key-uk2"}}', "")
+
+def test_each_tenant_gets_its_own_client_on_its_shard(monkeypatch):
+    monkeypatch.setenv("NORTH_CLINIKO_KEY", "north-key-uk2")
+    monkeypatch.setenv("NORTH_MCP_TOKEN", "north-token")
+    clients = ClinikoClients(load_tenants(TENANTS, ""))
+    north, sydney = clients.get("north"), clients.get("sydney")
+    assert north is clients.get("north") and north is not sydney
+    assert sydney.base_url == shard_base_url("key-au4") == "https://api.au4.cliniko.com/v1"
+    assert north.limits.max_connections != sydney.limits.max_connections == 5
+    assert DEFAULT_TENANT in clients
+
+def test_unknown_tenant_is_refused():
+    with pytest.raises(UnknownTenantError):
+        ClinikoClients({}).get("elsewhere")
+
+def test_tenant_scope_is_restored():
+    assert current_tenant() == DEFAULT_TENANT
+    with tenant_scope("north"):
+        assert current_tenant() == "north"
+    assert current_tenant() == DEFAULT_TENANT
+
+def test_tenant_comes_from_the_bearer_token():
+    assert resolve_tenant(bearer("north-token"), TOKENS) == "north"
+    assert resolve_tenant(bearer("default-token"), TOKENS) == DEFAULT_TENANT
+    assert resolve_tenant(bearer("north-token", **{"x-cliniko-tenant": "north"}), TOKENS) == "north"
+    for headers in ({}, {"x-cliniko-tenant": "north"}, bearer("guess"), {"authorization": "Basic north-token"},
+                    bearer("sydney-token", **{"x-cliniko-tenant": "north"})):
+        with pytest.raises(TenantAuthError):
+            resolve_tenant(headers, TOKENS)
+
+def test_without_tokens_only_the_default_tenant_is_served():
+    assert resolve_tenant({}, {}) == DEFAULT_TENANT
+    with pytest.raises(TenantAuthError):
+        resolve_tenant({"x-cliniko-tenant": "north"}, {})
+
+async def test_middleware_acts_for_the_token_tenant(monkeypatch):
+    middleware = TenantMiddleware(lambda: TOKENS)
+
+    async def call_next(context):
+        return current_tenant()
+
+    monkeypatch.setattr(tenants, "get_http_headers", lambda include_all: bearer("sydney-token", host="mcp"))
+    assert await middleware.on_request(None, call_next) == "sydney"
+    monkeypatch.setattr(tenants, "get_http_headers", lambda include_all: {"host": "mcp", "x-cliniko-tenant": "north"})
+    with pytest.raises(MCPError):
+        await middleware.on_request(None, call_next)
+    # stdio: no HTTP request
+    monkeypatch.setattr(tenants, "get_http_headers", lambda include_all: {})
+    assert await middleware.on_request(None, call_next) == DEFAULT_TENANT
+
+@pytest.fixture
+async def north(server):
+    """A second tenant with its own fake Cliniko, and bearer tokens for it and the default tenant"""
+    app = create_app(fake=FakeCliniko(patient_count=5, appointment_count=0, practitioner_count=1, days=1, seed=2))
+    async with make_client(app) as client:
+        clients = cliniko_client.get_clients()
+        clients._clients["north"] = client
+        clients.tokens = TOKENS
+        yield client
+
+async def test_export_uses_the_token_tenant(server, north, monkeypatch):
+    monkeypatch.setattr(server, "EXPORT_HTTP_ENABLED", True)
+    transport = httpx.ASGITransport(app=server.app.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as http:
+        default = await http.get("/export/patients", headers=bearer("default-token"))
+        tenant = await http.get("/export/patients", headers=bearer("north-token"))
+        spoofed = await http.get("/export/patients", headers={"X-Cliniko-Tenant": "north"})
+        mismatched = await http.get("/export/patients", headers=bearer("default-token", **{"X-Cliniko-Tenant": "north"}))
+    assert len(default.text.splitlines()) == 20
+    assert len(tenant.text.splitlines()) == 5
+    assert spoofed.status_code == mismatched.status_code == 401
@@ -0,0 +1,54 @@
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+
+from tracing import InMemoryExporter, tracer
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_ratio", 1.0)
+    return exporter
+
+def tool_trace(exporter, tool: str) -> list:
+    """The one trace rooted at the tool span; warm-up and index work record their own"""
+    [spans] = [spans for spans in exporter.traces().values() if spans[0].name == f"tool {tool}"]
+    return spans
+
+def tree(spans) -> list:
+    """(name, parent name, status) per span, in start order"""
+    names = {span.span_id: span.name for span in spans}
+    return [(span.name, names.get(span.parent_id), span.status) for span in spans]
+
+async def test_tool_call_records_one_trace_down_to_each_attempt(server, client, exporter):
+    async with Client(server.app) as mcp:
+        client.cache.invalidate_record("patients", 1)
+        await mcp.call_tool("get_patient", {"patient_id": 1})
+    spans = tool_trace(exporter, "get_patient")
+    assert tree(spans) == [
+        ("tool get_patient", None, "ok"),
+        ("cliniko.request", "tool get_patient", "ok"),
+        ("cliniko.attempt", "cliniko.request", "ok"),
+    ]
+    root, request, attempt = spans
+    assert root.attributes["tool"] == "get_patient"
+    assert request.attributes == {"method": "GET", "resource": "patients", "background": False}
+    assert attempt.attributes["status_code"] == 200
+    assert root.start_ns <= request.start_ns <= attempt.start_ns <= attempt.end_ns <= request.end_ns <= root.end_ns
+
+async def test_failed_call_marks_the_whole_path_as_error(server, exporter):
+    async with Client(server.app) as mcp:
+        with pytest.raises(ToolError):
+            await mcp.call_tool("get_patient", {"patient_id": 999})
+    spans = tool_trace(exporter, "get_patient")
+    assert tree(spans) == [
+        ("tool get_patient", None, "error"),
+        ("cliniko.request", "tool get_patient", "error"),
+        ("cliniko.attempt", "cliniko.request", "error"),
+    ]
+    assert spans[-1].attributes["status_code"] == 404
+    assert spans[-1].attributes["error"].startswith("HTTPStatusError")
+    assert "404 Not Found" in spans[0].attributes["error"]
@@ -0,0 +1,76 @@
+import pytest
+
+from tools.validators import (
+    PAYLOAD_SCHEMAS, appointment_create_error, appointment_update_error, id_error, list_schema,
+    patient_create_error, patient_update_error, validate_many,
+)
+
+ID = "1764028746571981724"
+START, END = "2025-09-05T10:00:00Z", "2025-09-05T11:00:00Z"
+IDS = {"patient_id": ID, "practitioner_id": ID, "appointment_type_id": ID, "business_id": ID}
+
+PAYLOADS = {
+    patient_create_error: [
+        {"first_name": "Ada", "last_name": "Lovelace"},
+        {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com", "date_of_birth": "1815-12-10"},
+        {"first_name": "Ada", "last_name": "Lovelace", "email": "", "date_of_birth": None},
+        {"first_name": "Ada"},
+        {"first_name": "", "last_name": "Lovelace"},
+        {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@"},
+        {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com\n"},
+        {"first_name": "Ada", "last_name": "Lovelace", "date_of_birth": "10/12/1815"},
+        {"first_name": "Ada", "last_name": "Lovelace", "date_of_birth": "１８１５-12-10"},
+    ],
+    patient_update_error: [
+        {},
+        {"last_name": "Byron"},
+        {"email": "ada@example.com"},
+        {"email": "not-an-email"},
+        {"date_of_birth": "1815-12-1"},
+    ],
+    appointment_create_error: [
+        {**IDS, "appointment_start": START, "appointment_end": END},
+        {**IDS, "starts_at": START, "ends_at": END},
+        {**IDS, "appointment_start": START, "appointment_end": END, "starts_at": "soon", "ends_at": END},
+        {**IDS, "appointment_start": START, "starts_at": START, "ends_at": END},
+        {**IDS, "appointment_start": START},
+        {**IDS, "starts_at": "2025-09-05 10:00:00", "ends_at": END},
+        {**IDS, "patient_id": "12345", "starts_at": START, "ends_at": END},
+        {**IDS, "patient_id": "١٧٦٤٠٢٨٧٤٦٥٧١٩٨١٧٢٤", "starts_at": START, "ends_at": END},
+        {"patient_id": ID, "starts_at": START, "ends_at": END},
+    ],
+    appointment_update_error: [
+        {},
+        {"notes": "Moved"},
+        {"starts_at": START, "ends_at": END},
+        {"starts_at": "2025-09-05T10:00:00+00:00"},
+    ],
+}
+
+@pytest.mark.parametrize("check", list(PAYLOADS), ids=lambda check: check.__name__)
+def test_screening_schema_agrees_with_the_error_function(check):
+    items = PAYLOADS[check]
+    expected = [check(item) for item in items]
+    # Each list has both outcomes, so the schema is exercised on accepts and rejects
+    assert None in expected and any(expected)
+    assert validate_many(items, check, list_schema(PAYLOAD_SCHEMAS[check])) == expected
+
+def test_rejected_item_gets_the_error_functions_response():
+    items = [{"first_name": "Ada", "last_name": "Lovelace"}, {"first_name": "Ada", "last_name": ""}]
+    assert validate_many(items, patient_create_error, list_schema(PAYLOAD_SCHEMAS[patient_create_error])) == [
+        None, patient_create_error(items[1]),
+    ]
+    assert validate_many(items, patient_create_error)[1]["error"] == "Missing required fields: last_name"
+
+@pytest.mark.parametrize("value, valid", [
+    (ID, True),
+    ("1234567890", False),
+    ("abc", False),
+    (1764028746571981724, False),
+    (None, False),
+])
+def test_id_error(value, valid):
+    error = id_error("patient_id", value)
+    assert (error is None) == valid
+    if not valid:
+        assert error["received"] == value
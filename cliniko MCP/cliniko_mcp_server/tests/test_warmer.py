@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.mock_cliniko import FakeCliniko
+from warmer import CacheWarmer
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def fake():
+    return FakeCliniko(patient_count=2, appointment_count=0, practitioner_count=1, seed=1)
+
+async def test_appointment_running_into_the_window_is_seeded(client, cliniko, fake):
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    practitioner_id = fake.practitioner_ids[0]
+    overnight = fake.make_appointment(int(fake.next_id("appointments")), "1", practitioner_id,
+                                      today - timedelta(hours=1), today + timedelta(hours=1))
+    fake._put("appointments", overnight)
+    fake._put("appointments", fake.make_appointment(int(fake.next_id("appointments")), "1", practitioner_id,
+                                                    today - timedelta(hours=3), today - timedelta(hours=2)))
+    summary = await CacheWarmer(client, days=1, business_ids=[], ttl=None).warm(today.date())
+    assert summary["appointments"] == 1
+    lists = cliniko.state.stats["calls"]["GET /appointments"]
+    indexes = await client.schedules.day_indexes(client, practitioner_id, today.date(), today.date())
+    # Served from the seeded day, which holds the overnight booking
+    assert cliniko.state.stats["calls"]["GET /appointments"] == lists
+    assert overnight["id"] in indexes[today.date()].ids
@@ -0,0 +1,291 @@
+"""
+Cliniko MCP Server - Validators
+Per-item payload validation shared by the single and batch tools.
+Each *_error function returns the tool's error response, or None when valid.
+
+Batches are screened first by compiled pydantic schemas that validate the
+whole list in one pass (see validate_many); only the items a schema rejects
+go through the *_error function for their detailed response.
+"""
+
+from config.constants import DEFAULT_PRACTITIONER_ID, DEFAULT_APPOINTMENT_TYPE_ID, DEFAULT_BUSINESS_ID
+from typing import Annotated, Any, Callable, List, Literal, Optional, Union
+import re
+
+from pydantic import ConfigDict, StringConstraints, TypeAdapter, ValidationError
+from typing_extensions import Required, TypedDict
+
+ISO_DATETIME_PATTERN = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$'
+DATE_PATTERN = r'^\d{4}-\d{2}-\d{2}$'
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+ISO_DATETIME_RE = re.compile(ISO_DATETIME_PATTERN)
+DATE_RE = re.compile(DATE_PATTERN)
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+
+def validate_id_format(id_str: str) -> bool:
+    """Validate ID is a string of digits"""
+    return isinstance(id_str, str) and id_str.isdigit() and len(id_str) > 10
+
+def validate_iso_datetime(datetime_str: str) -> bool:
+    """Validate ISO datetime format: YYYY-MM-DDTHH:MM:SSZ"""
+    return isinstance(datetime_str, str) and ISO_DATETIME_RE.match(datetime_str) is not None
+
+def validate_date_format(date_str: str) -> bool:
+    """Validate date format: YYYY-MM-DD"""
+    return isinstance(date_str, str) and DATE_RE.match(date_str) is not None
+
+def validate_email_format(email: str) -> bool:
+    """Basic email validation"""
+    return isinstance(email, str) and EMAIL_RE.match(email) is not None
+
+def patient_create_error(patient: dict) -> Optional[dict]:
+    """Check a create_patient payload"""
+    # Validate required fields
+    required_fields = ["first_name", "last_name"]
+    missing_fields = [f for f in required_fields if f not in patient or not patient[f]]
+    
+    if missing_fields:
+        return {
+            "error": f"Missing required fields: {', '.join(missing_fields)}",
+            "required_fields": required_fields,
+            "minimal_example": {
+                "first_name": "John",
+                "last_name": "Smith"
+            },
+            "complete_example": {
+                "first_name": "John",
+                "last_name": "Smith",
+                "email": "john.smith@email.com",
+                "date_of_birth": "1985-03-15",
+                "title": "Mr",
+                "sex": "Male",
+                "address_1": "123 Main Street",
+                "city": "London",
+                "country": "United Kingdom",
+                "post_code": "SW1A 1AA",
+                "occupation": "Software Engineer"
+            }
+        }
+    
+    # Validate optional fields if provided
+    validation_errors = []
+    
+    if "email" in patient and patient["email"]:
+        if not validate_email_format(patient["email"]):
+            validation_errors.append("Invalid email format")
+    
+    if "date_of_birth" in patient and patient["date_of_birth"]:
+        if not validate_date_format(patient["date_of_birth"]):
+            validation_errors.append("Invalid date_of_birth format. Use YYYY-MM-DD")
+    
+    # Check for empty required fields
+    for field in required_fields:
+        if not isinstance(patient[field], str):
+            validation_errors.append(f"{field} must be a string")
+        elif not patient[field].strip():
+            validation_errors.append(f"{field} cannot be empty")
+    
+    if validation_errors:
+        return {
+            "error": "Validation failed",
+            "validation_errors": validation_errors,
+            "email_format": "user@example.com",
+            "date_format": "1985-03-15 (YYYY-MM-DD)"
+        }
+    
+    return None
+
+def patient_update_error(patient: dict) -> Optional[dict]:
+    """Check an update_patient payload"""
+    # Validate fields if provided
+    validation_errors = []
+    
+    if "email" in patient and patient["email"]:
+        if not validate_email_format(patient["email"]):
+            validation_errors.append("Invalid email format")
+    
+    if "date_of_birth" in patient and patient["date_of_birth"]:
+        if not validate_date_format(patient["date_of_birth"]):
+            validation_errors.append("Invalid date_of_birth format. Use YYYY-MM-DD")
+    
+    if validation_errors:
+        return {
+            "error": "Validation failed",
+            "validation_errors": validation_errors
+        }
+    
+    return None
+
+def appointment_create_error(appointment: dict) -> Optional[dict]:
+    """Check a create_appointment payload (either time field convention)"""
+    # Check for required fields (supporting both naming conventions)
+    required_base_fields = ["patient_id", "practitioner_id", "appointment_type_id", "business_id"]
+    missing_base = [f for f in required_base_fields if f not in appointment]
+    
+    # Check for time fields (either convention)
+    has_appointment_time = "appointment_start" in appointment and "appointment_end" in appointment
+    has_starts_ends_time = "starts_at" in appointment and "ends_at" in appointment
+    
+    if missing_base:
+        return {
+            "error": f"Missing required fields: {', '.join(missing_base)}",
+            "required_fields": required_base_fields + ["appointment_start", "appointment_end"],
+            "working_example": {
+                "patient_id": "1764028746571981724",
+                "practitioner_id": DEFAULT_PRACTITIONER_ID,
+                "appointment_type_id": DEFAULT_APPOINTMENT_TYPE_ID,
+                "business_id": DEFAULT_BUSINESS_ID,
+                "appointment_start": "2025-09-05T10:00:00Z",
+                "appointment_end": "2025-09-05T11:00:00Z",
+                "notes": "Optional notes"
+            },
+            "defaults": {
+                "practitioner_id": DEFAULT_PRACTITIONER_ID,
+                "appointment_type_id": DEFAULT_APPOINTMENT_TYPE_ID,
+                "business_id": DEFAULT_BUSINESS_ID
+            }
+        }
+    
+    if not has_appointment_time and not has_starts_ends_time:
+        return {
+            "error": "Missing time fields. Provide either (appointment_start + appointment_end) OR (starts_at + ends_at)",
+            "option1": "appointment_start and appointment_end",
+            "option2": "starts_at and ends_at",
+            "format": "ISO datetime: YYYY-MM-DDTHH:MM:SSZ",
+            "example": "2025-09-05T10:00:00Z"
+        }
+    
+    # Validate ID formats
+    for field in ["patient_id", "practitioner_id", "appointment_type_id", "business_id"]:
+        if field in appointment and not validate_id_format(appointment[field]):
+            return {
+                "error": f"Invalid {field} format. Must be string of digits.",
+                "received": appointment[field],
+                "example": "1764028746571981724"
+            }
+    
+    # Validate datetime formats
+    datetime_fields = []
+    if has_appointment_time:
+        datetime_fields = ["appointment_start", "appointment_end"]
+    elif has_starts_ends_time:
+        datetime_fields = ["starts_at", "ends_at"]
+    
+    for field in datetime_fields:
+        if not validate_iso_datetime(appointment[field]):
+            return {
+                "error": f"Invalid {field} format. Must be ISO datetime with Z suffix.",
+                "received": appointment[field],
+                "required_format": "YYYY-MM-DDTHH:MM:SSZ",
+                "example": "2025-09-05T10:00:00Z"
+            }
+    
+    return None
+
+def appointment_update_error(appointment: dict) -> Optional[dict]:
+    """Check an update_appointment payload"""
+    # Validate datetime formats if provided
+    validation_errors = []
+    for field in ["starts_at", "ends_at"]:
+        if field in appointment and not validate_iso_datetime(appointment[field]):
+            validation_errors.append(f"Invalid {field} format. Must be ISO datetime with Z suffix.")
+    
+    if validation_errors:
+        return {
+            "error": "Validation failed",
+            "validation_errors": validation_errors,
+            "required_format": "YYYY-MM-DDTHH:MM:SSZ",
+            "example": "2025-09-07T14:00:00Z",
+            "correct_update_example": {
+                "starts_at": "2025-09-07T14:00:00Z",
+                "ends_at": "2025-09-07T15:00:00Z",
+                "notes": "Updated appointment time"
+            }
+        }
+    
+    return None
+
+def id_error(field: str, id_str) -> Optional[dict]:
+    """Check a single ID argument"""
+    if validate_id_format(id_str):
+        return None
+    return {
+        "error": f"Invalid {field} format. Must be a string of digits.",
+        "received": id_str,
+        "example": "1764041171115451305"
+    }
+
+# Screening schemas. Each accepts only payloads its *_error function accepts
+# (it may reject more, e.g. a trailing newline that re.match lets through);
+# whatever it rejects is re-checked item by item for the exact response.
+# pydantic's regex engine has its own Unicode tables, so digits are ASCII-only
+# here and str.strip()'s extra separators (\x1c-\x1f) don't count as text.
+Id = Annotated[str, StringConstraints(pattern=r'^[0-9]{11,}$')]
+IsoDatetime = Annotated[str, StringConstraints(pattern=ISO_DATETIME_PATTERN.replace(r'\d', '[0-9]'))]
+Date = Annotated[str, StringConstraints(pattern=DATE_PATTERN.replace(r'\d', '[0-9]'))]
+Email = Annotated[str, StringConstraints(pattern=EMAIL_PATTERN)]
+NonBlank = Annotated[str, StringConstraints(pattern=r'[^\s\x1c-\x1f]')]
+# Matches no value, so the key must be absent
+Absent = Annotated[str, StringConstraints(min_length=1, max_length=0)]
+# Optional fields are only checked when truthy
+Empty = Union[Literal[""], None]
+
+class PatientUpdate(TypedDict, total=False):
+    email: Union[Email, Empty]
+    date_of_birth: Union[Date, Empty]
+
+class PatientCreate(PatientUpdate, total=False):
+    first_name: Required[NonBlank]
+    last_name: Required[NonBlank]
+
+class _AppointmentIds(TypedDict):
+    patient_id: Id
+    practitioner_id: Id
+    appointment_type_id: Id
+    business_id: Id
+
+class _AppointmentStartEnd(_AppointmentIds):
+    appointment_start: IsoDatetime
+    appointment_end: IsoDatetime
+
+class _AppointmentStartsEndsAt(_AppointmentIds, total=False):
+    starts_at: Required[IsoDatetime]
+    ends_at: Required[IsoDatetime]
+    # With both appointment_* fields present those are the ones checked
+    appointment_end: Absent
+
+AppointmentCreate = Union[_AppointmentStartEnd, _AppointmentStartsEndsAt]
+
+class AppointmentUpdate(TypedDict, total=False):
+    starts_at: IsoDatetime
+    ends_at: IsoDatetime
+
+PAYLOAD_SCHEMAS = {
+    patient_create_error: PatientCreate,
+    patient_update_error: PatientUpdate,
+    appointment_create_error: AppointmentCreate,
+    appointment_update_error: AppointmentUpdate,
+}
+
+def list_schema(schema: Any) -> TypeAdapter:
+    """Compile `schema` into a validator for a whole list of payloads"""
+    return TypeAdapter(List[schema], config=ConfigDict(strict=True))
+
+def validate_many(items: List[Any], check: Callable[[Any], Optional[dict]],
+                  schema: TypeAdapter = None) -> List[Optional[dict]]:
+    """
+    check(item) for every item, as a list of error responses (None when valid).
+
+    With a compiled list `schema`, the list is validated in one pass and only
+    the items it rejects are passed to `check`.
+    """
+    if schema is None:
+        return [check(item) for item in items]
+    try:
+        schema.validate_python(items)
+        return [None] * len(items)
+    except ValidationError as e:
+        rejected = {error["loc"][0] for error in e.errors(include_url=False, include_context=False,
+                                                           include_input=False)}
+    return [check(item) if index in rejected else None for index, item in enumerate(items)]
@@ -0,0 +1,230 @@
+"""
+Cliniko MCP Server - Tracing
+Span-based tracing from the MCP tool call down to each Cliniko HTTP attempt.
+
+Trace and span IDs use the W3C/OpenTelemetry formats, and finished traces go
+to a pluggable exporter: in-memory (tests), logging, or the OpenTelemetry SDK
+when it is installed. Sampling is decided once per trace at the root span, so
+unsampled calls only pay for a context variable lookup.
+"""
+
+import contextvars
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+from fastmcp.server.middleware import Middleware
+
+from config.settings import env
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTER = env("TRACING_EXPORTER", "none").lower()  # none, memory, logging, otel
+TRACING_SAMPLE_RATIO = float(env("TRACING_SAMPLE_RATIO", "0.1"))
+MAX_BUFFERED_TRACES = 1000
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status")
+    sampled = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+            "parent_id": self.parent_id, "start_ns": self.start_ns, "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms, "attributes": self.attributes, "status": self.status,
+        }
+
+class _NoopSpan:
+    """Stands in for spans of unsampled traces; every operation is free"""
+    sampled = False
+    trace_id = span_id = parent_id = None
+
+    def set_attribute(self, key: str, value):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+_current: contextvars.ContextVar = contextvars.ContextVar("cliniko_current_span", default=None)
+
+def current_span():
+    """The active span (NOOP_SPAN inside an unsampled trace), or None outside any trace"""
+    return _current.get()
+
+class _SpanScope:
+    __slots__ = ("tracer", "name", "attributes", "span", "token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        parent = _current.get()
+        if parent is not None:
+            self.span = Span(self.name, parent.trace_id, parent.span_id, self.attributes)
+        elif random.random() < self.tracer.sample_ratio:
+            self.span = Span(self.name, f"{random.getrandbits(128):032x}", None, self.attributes)
+        else:
+            self.span = NOOP_SPAN
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self.token)
+        span = self.span
+        if span.sampled:
+            span.end_ns = time.time_ns()
+            if exc is not None:
+                span.status = "error"
+                span.attributes["error"] = f"{exc_type.__name__}: {exc}"
+            self.tracer.finish(span)
+        return False
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SCOPE = _NoopScope()
+
+class Tracer:
+    """
+    Creates spans and hands finished traces to `exporter`.
+
+    Spans are buffered per trace and exported together when the root span
+    ends, so exporters always see complete trees.
+    """
+
+    def __init__(self, exporter=None, sample_ratio: float = TRACING_SAMPLE_RATIO):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio if exporter is not None else 0.0
+        self._pending: Dict[str, List[Span]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and self.sample_ratio > 0
+
+    def span(self, name: str, **attributes):
+        """Context manager opening a child of the current span (or a new sampled-or-not root)"""
+        if not self.enabled:
+            return _NOOP_SCOPE
+        parent = _current.get()
+        if parent is not None and not parent.sampled:
+            return _NOOP_SCOPE
+        return _SpanScope(self, name, attributes)
+
+    def finish(self, span: Span):
+        spans = self._pending.setdefault(span.trace_id, [])
+        spans.append(span)
+        if span.parent_id is not None:
+            if len(self._pending) > MAX_BUFFERED_TRACES:
+                # A root that never ended (cancelled task); drop the oldest trace
+                self._pending.pop(next(iter(self._pending)))
+            return
+        del self._pending[span.trace_id]
+        try:
+            self.exporter.export(sorted(spans, key=lambda s: s.start_ns))
+        except Exception as e:
+            logger.warning("Trace export failed: %s", e)
+
+class InMemoryExporter:
+    """Keeps finished spans in a list; for tests and ad-hoc debugging"""
+
+    def __init__(self, max_spans: int = 10_000):
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]):
+        self.spans.extend(spans)
+        del self.spans[:-self.max_spans]
+
+    def traces(self) -> Dict[str, List[Span]]:
+        grouped: Dict[str, List[Span]] = {}
+        for span in self.spans:
+            grouped.setdefault(span.trace_id, []).append(span)
+        return grouped
+
+    def clear(self):
+        self.spans.clear()
+
+class LoggingExporter:
+    """Logs one line per span, indented under its parent"""
+
+    def __init__(self, log: logging.Logger = logger):
+        self.log = log
+
+    def export(self, spans: List[Span]):
+        depth = {None: -1}
+        for span in spans:
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1
+            attributes = " ".join(f"{k}={v}" for k, v in span.attributes.items())
+            self.log.info("trace=%s %s%s %.2fms %s %s", span.trace_id, "  " * depth[span.span_id],
+                          span.name, span.duration_ms, span.status, attributes)
+
+class OpenTelemetryExporter:
+    """
+    Replays finished traces onto the OpenTelemetry SDK's configured tracer
+    provider (pip install opentelemetry-sdk), preserving timings and nesting.
+    """
+
+    def __init__(self, tracer_name: str = "cliniko-mcp-server"):
+        from opentelemetry import trace
+        self._trace = trace
+        self._tracer = trace.get_tracer(tracer_name)
+
+    def export(self, spans: List[Span]):
+        started = {}
+        for span in spans:
+            parent = started.get(span.parent_id)
+            context = self._trace.set_span_in_context(parent) if parent is not None else None
+            otel_span = self._tracer.start_span(span.name, context=context, start_time=span.start_ns,
+                                                attributes={k: v for k, v in span.attributes.items()
+                                                            if isinstance(v, (str, bool, int, float))})
+            if span.status == "error":
+                otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+            started[span.span_id] = otel_span
+        for span in spans:
+            started[span.span_id].end(end_time=span.end_ns)
+
+def exporter_from_env(name: str = TRACING_EXPORTER):
+    if name == "memory":
+        return InMemoryExporter()
+    if name == "logging":
+        return LoggingExporter()
+    if name == "otel":
+        try:
+            return OpenTelemetryExporter()
+        except ImportError:
+            logger.warning("TRACING_EXPORTER=otel but opentelemetry is not installed; tracing disabled")
+    return None
+
+tracer = Tracer(exporter_from_env())
+
+class TracingMiddleware(Middleware):
+    """Opens the root span of each tools/call"""
+
+    async def on_call_tool(self, context, call_next):
+        with tracer.span(f"tool {context.message.name}", tool=context.message.name):
+            return await call_next(context)
@@ -0,0 +1,188 @@
+"""
+Cliniko MCP Server - Cache Warmer
+Preloads the coming days' appointments for each business, with the patients
+and practitioners they link to, into the read cache before clinic hours, so
+calls about upcoming bookings are answered without a Cliniko round trip. When
+every business is warmed, the same pages seed each practitioner's schedule
+days for booking conflict checks.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from availability import appointment_interval, format_datetime
+from cliniko_client import linked_id
+from config.constants import BUSINESS_HOURS, DEFAULT_TIMEZONE
+from config.settings import env
+
+logger = logging.getLogger(__name__)
+
+# Days of appointments preloaded, starting today (0 disables the warmer)
+WARM_DAYS = int(env("WARM_DAYS", "1"))
+# Daily warm-up time in DEFAULT_TIMEZONE, "HH:MM"; empty means an hour before BUSINESS_HOURS start
+WARM_AT = env("WARM_AT", "")
+# Businesses to warm (comma-separated IDs); empty means every business on the account
+WARM_BUSINESS_IDS = [business_id.strip() for business_id in env("WARM_BUSINESS_IDS", "").split(",")
+                     if business_id.strip()]
+# Seconds warmed records stay cached, when delta sync is there to invalidate the ones that change
+WARM_TTL = float(env("WARM_TTL", str(12 * 3600)))
+WARM_CONCURRENCY = int(env("WARM_CONCURRENCY", "5"))
+
+# Resources the warmer loads, and whose cache hit rates it reports
+WARM_RESOURCES = ("appointments", "patients", "practitioners")
+
+def default_warm_at() -> dt_time:
+    opens = datetime.combine(date.today(), dt_time.fromisoformat(BUSINESS_HOURS["start"]))
+    return (opens - timedelta(hours=1)).time()
+
+class CacheWarmer:
+    """
+    Warms `client`'s read cache once on startup and then daily at `at`.
+
+    Appointment pages are listed per business and the linked patients and
+    practitioners fetched with at most `concurrency` requests in flight, all
+    on spare rate-limit tokens (background=True) like DeltaSync. Warmed
+    records (and, when no business_ids narrow the warm-up, the schedule days of
+    every practitioner booked in the window) are cached for `ttl` seconds, or the resource's CACHE_TTLS entry
+    (SCHEDULE_CACHE_TTL) when `ttl` is None. Hit rates are counted from the end of the last warm-up.
+    """
+
+    def __init__(self, client, days: int = WARM_DAYS, business_ids: List[str] = None,
+                 ttl: Optional[float] = WARM_TTL, concurrency: int = WARM_CONCURRENCY, at: str = WARM_AT):
+        self.client = client
+        self.days = days
+        self.business_ids = list(business_ids if business_ids is not None else WARM_BUSINESS_IDS)
+        self.ttl = ttl
+        self.at = dt_time.fromisoformat(at) if at else default_warm_at()
+        self.zone = ZoneInfo(DEFAULT_TIMEZONE)
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._status: dict = {"runs": 0}
+        # Cache hits/misses per resource when the last warm-up finished
+        self._baseline: Dict[str, tuple] = {}
+
+    async def _businesses(self) -> List[str]:
+        if self.business_ids:
+            return self.business_ids
+        ids = []
+        async for _, records, _ in self.client.iter_pages("businesses", background=True):
+            ids.extend(str(record["id"]) for record in records)
+        return ids
+
+    async def _warm_business(self, business_id: str, window_start: datetime, window_end: datetime,
+                             token: int) -> List[dict]:
+        filters = [
+            f"business_id:={business_id}",
+            # Appointments that started before the window but run into it are booked time too
+            f"ends_at:>{format_datetime(window_start)}",
+            f"starts_at:<{format_datetime(window_end)}",
+        ]
+        appointments = []
+        async with self._semaphore:
+            async for _, records, _ in self.client.iter_pages("appointments", filters, background=True):
+                for appointment in records:
+                    self.client.cache.put_record("appointments", appointment["id"], appointment, token, self.ttl)
+                appointments.extend(records)
+        return appointments
+
+    def _seed_schedules(self, appointments: List[dict], window_start: datetime, window_end: datetime) -> int:
+        """Cache each booked practitioner's days in the window; returns the number of days cached"""
+        booked = defaultdict(list)
+        for appointment in appointments:
+            interval = appointment_interval(appointment)
+            practitioner_id = linked_id(appointment, "practitioner")
+            if interval is not None and practitioner_id:
+                booked[practitioner_id].append(interval)
+        days = [window_start.date() + timedelta(days=n) for n in range((window_end.date() - window_start.date()).days)]
+        for practitioner_id, intervals in booked.items():
+            self.client.schedules.put_days(practitioner_id, days, intervals, self.ttl)
+        return len(days) * len(booked)
+
+    async def _prefetch(self, resource: str, record_id: str) -> Optional[bool]:
+        """True if fetched, False if already cached, None if the fetch failed"""
+        async with self._semaphore:
+            try:
+                return await self.client.prefetch_record(resource, record_id, self.ttl)
+            except Exception as e:
+                logger.debug("Warming %s %s failed: %s", resource, record_id, e)
+                return None
+
+    async def warm(self, first_day: date = None) -> dict:
+        """Preload `days` days of appointments from `first_day` (today); returns the run's summary"""
+        started_wall, started = time.time(), time.perf_counter()
+        first_day = first_day or datetime.now(self.zone).date()
+        window_start = datetime.combine(first_day, dt_time.min, self.zone)
+        window_end = datetime.combine(first_day + timedelta(days=self.days), dt_time.min, self.zone)
+        # Writes made while we load win over what we load
+        token = self.client.cache.read_token()
+        try:
+            pages = await asyncio.gather(*(self._warm_business(business_id, window_start, window_end, token)
+                                           for business_id in await self._businesses()))
+            appointments = [appointment for page in pages for appointment in page]
+            # A schedule day must hold the practitioner's bookings at every business
+            schedule_days = 0 if self.business_ids else self._seed_schedules(appointments, window_start, window_end)
+            linked = {
+                resource: {record_id for record_id in (linked_id(appointment, name) for appointment in appointments)
+                           if record_id}
+                for resource, name in (("patients", "patient"), ("practitioners", "practitioner"))
+            }
+            jobs = [(resource, record_id) for resource, ids in linked.items() for record_id in sorted(ids)]
+            outcomes = await asyncio.gather(*(self._prefetch(resource, record_id) for resource, record_id in jobs))
+        except Exception as e:
+            self._status["last_error"] = str(e)
+            raise
+        fetched = {resource: 0 for resource in linked}
+        for (resource, _), outcome in zip(jobs, outcomes):
+            fetched[resource] += bool(outcome)
+        summary = {
+            "window": f"{first_day.isoformat()}/{(first_day + timedelta(days=self.days - 1)).isoformat()}",
+            "appointments": len(appointments),
+            "patients": fetched["patients"],
+            "practitioners": fetched["practitioners"],
+            "schedule_days": schedule_days,
+            "already_cached": sum(1 for outcome in outcomes if outcome is False),
+            "failed": sum(1 for outcome in outcomes if outcome is None),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        cache = self.client.cache
+        self._baseline = {resource: (cache.resource_hits[resource], cache.resource_misses[resource])
+                          for resource in WARM_RESOURCES}
+        self._status.update(runs=self._status["runs"] + 1, last_run=started_wall, last=summary, last_error=None)
+        logger.info("Cache warm-up: %s", summary)
+        return summary
+
+    def seconds_until_next(self, now: datetime = None) -> float:
+        now = now or datetime.now(self.zone)
+        next_run = datetime.combine(now.date(), self.at, self.zone)
+        if next_run <= now:
+            next_run = datetime.combine(now.date() + timedelta(days=1), self.at, self.zone)
+        return (next_run - now).total_seconds()
+
+    async def run(self):
+        """Warm now, then every day at `at`"""
+        while True:
+            try:
+                await self.warm()
+            except Exception as e:
+                logger.warning("Cache warm-up failed: %s", e)
+            await asyncio.sleep(self.seconds_until_next())
+
+    def hit_rates(self) -> Dict[str, dict]:
+        """get_appointment / get_patient / get_practitioner cache hits since the last warm-up"""
+        cache = self.client.cache
+        rates = {}
+        for resource in WARM_RESOURCES:
+            base_hits, base_misses = self._baseline.get(resource, (0, 0))
+            hits = cache.resource_hits[resource] - base_hits
+            misses = cache.resource_misses[resource] - base_misses
+            rates[resource] = {"hits": hits, "misses": misses,
+                               "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0}
+        return rates
+
+    def status(self) -> dict:
+        return {**self._status, "hits_since_warm": self.hit_rates(),
+                "next_run_in_seconds": round(self.seconds_until_next())}